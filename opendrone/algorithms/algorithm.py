@@ -1,16 +1,46 @@
+from shm_control import ControlBlockWriter
+
 
 class Algorithm:
     """
     Reads in video stream and applies algorithm over it
     """
 
+    def __init__(self, control_block=None, video=None):
+        # When running on the same host as server.py, publish channels through
+        # shared memory instead of gRPC (see shm_control.py)
+        self.control = ControlBlockWriter(control_block) if control_block else None
+        # A running video pipeline (e.g. VideoStreamController(headless=True))
+        self.video = video
+        self.last_frame_id = 0
+
+    def read_stream(self):
+        """Newest frame not seen yet as a FrameRef (frame_id, timestamp, slot, image), or None.
+
+        image is a read-only view into the pipeline's frame ring, valid until
+        the ring wraps around; copy it to keep it.
+        """
+        if self.video is None:
+            return None
+        ref = self.video.read_frame(self.last_frame_id)
+        if ref is not None:
+            self.last_frame_id = ref.frame_id
+        return ref
+
+    def publish_channels(self, channels):
+        """Hand a 16-channel vector to the server's TX loop"""
+        if self.control is None:
+            raise RuntimeError("Algorithm was created without a control block")
+        self.control.publish(channels)
 
-    def read_stream():
-        pass
+    def close(self):
+        if self.control:
+            self.control.close()
+            self.control = None
 
 
 class Navigation(Algorithm):
     """
     Reads in video stream and outputs throttle, roll, pitch and yaw
     """
-    pass
\ No newline at end of file
+    pass
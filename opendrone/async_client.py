@@ -0,0 +1,294 @@
+import asyncio
+import os
+import time
+
+import grpc
+
+# Generated protobuf imports
+import drone_control_pb2
+import drone_control_pb2_grpc
+from google.protobuf import empty_pb2
+
+
+class AsyncDroneClient:
+    """
+    asyncio counterpart of DroneClient built on grpc.aio.
+
+    All RPCs are coroutines, so a control loop can await status and channel
+    updates concurrently. send_channels_nowait() sends channel updates
+    without waiting for replies. One setChannels call is outstanding at a
+    time, so the server applies vectors in the order they were set; while it
+    is, only the newest vector is kept and sent as soon as the call returns.
+    """
+
+    def __init__(self, host='localhost', port=50051, serial_port='/dev/ttyUSB0', baud_rate=420000,
+                 unix_socket=None):
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket  # Preferred over TCP when set (server on the same host)
+        self.target = None
+        self.serial_port = serial_port
+        self.baud_rate = baud_rate
+        self.channel = None
+        self.stub = None
+        self.connected = False
+
+        self.channels = [1024, 1024, 0, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024]  # 16 channels
+        self.armed = False
+        self.update_id = 0  # Sent with every setChannels to correlate server latency traces
+
+        self.MAX_VALUE = 2047
+        self.MIN_VALUE = 0
+        self.MID_VALUE = 1024
+
+        # Fire-and-forget channel updates. Concurrent calls could be applied out of
+        # order and leave a stale vector on the server, so only one is in flight.
+        self._in_flight = None
+        self._pending = None  # Newest vector waiting for the call in flight
+        self.sent = 0
+        self.superseded = 0   # Vectors replaced by a newer one before they were sent
+        self.send_errors = 0
+        self.last_error = None
+
+    async def __aenter__(self):
+        if not await self.connect():
+            raise ConnectionError(f"Could not connect to drone server at {self.host}:{self.port}")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.disconnect()
+
+    def _targets(self):
+        """Candidate server addresses in order of preference"""
+        targets = []
+        if self.unix_socket and os.path.exists(self.unix_socket):
+            targets.append(f'unix:{self.unix_socket}')
+        targets.append(f'{self.host}:{self.port}')
+        return targets
+
+    async def connect(self, timeout=10):
+        """Establish gRPC connection to drone server, preferring the unix socket if configured"""
+        for target in self._targets():
+            self.channel = grpc.aio.insecure_channel(target)
+            try:
+                await asyncio.wait_for(self.channel.channel_ready(), timeout)
+                self.stub = drone_control_pb2_grpc.DroneControlStub(self.channel)
+                self.target = target
+                self.connected = True
+                print(f"Connected to drone server at {target}")
+                return True
+            except asyncio.TimeoutError:
+                print(f"Connection error: Failed to connect to {target} - server not available")
+            except grpc.RpcError as e:
+                print(f"Failed to connect to server at {target}: {e}")
+            await self.channel.close()
+            self.channel = None
+        return False
+
+    async def disconnect(self):
+        """Wait for queued updates, then close the gRPC connection"""
+        await self.flush()
+        if self.channel:
+            await self.channel.close()
+        self.connected = False
+        print("Disconnected from server")
+
+    async def start_link(self):
+        """Initialize drone communication link via gRPC"""
+        if not self.connected:
+            print("Not connected to server")
+            return False
+
+        try:
+            request = drone_control_pb2.StartLinkReq(
+                port=self.serial_port,
+                baud_rate=self.baud_rate
+            )
+            response = await self.stub.startLink(request)
+            if not response.success:
+                print(f"Server error: {response.message}")
+                return False
+            print(f"Started drone link on {self.serial_port} at {self.baud_rate} baud")
+            return True
+        except grpc.RpcError as e:
+            print(f"Failed to start link: {e}")
+            return False
+
+    async def stop_link(self):
+        """Stop drone communication link"""
+        if not self.connected:
+            return
+
+        try:
+            await self.stub.stopLink(empty_pb2.Empty())
+            print("Stopped drone link")
+        except grpc.RpcError as e:
+            print(f"Failed to stop link: {e}")
+
+    async def send_channels(self):
+        """Send current channel values and wait for the server to apply them"""
+        if not self.connected:
+            return False
+
+        try:
+            await self.stub.setChannels(self._channels_request(self.channels))
+            self.sent += 1
+            return True
+        except grpc.RpcError as e:
+            self.send_errors += 1
+            self.last_error = e
+            return False
+
+    def send_channels_nowait(self):
+        """Queue the current channel values without waiting for a reply. Never blocks."""
+        if not self.connected:
+            return
+        if self._in_flight is None:
+            self._launch(list(self.channels))
+        else:
+            if self._pending is not None:
+                self.superseded += 1
+            self._pending = list(self.channels)
+
+    def _channels_request(self, channels):
+        self.update_id += 1
+        return drone_control_pb2.SetChannelsReq(
+            channels=channels,
+            update_id=self.update_id,
+            client_send_ns=time.monotonic_ns()
+        )
+
+    def _launch(self, channels):
+        call = self.stub.setChannels(self._channels_request(channels))
+        task = asyncio.ensure_future(call)
+        self._in_flight = task
+        task.add_done_callback(self._on_sent)
+
+    def _on_sent(self, task):
+        self._in_flight = None
+        if task.cancelled():
+            pass
+        elif task.exception() is not None:
+            self.send_errors += 1
+            self.last_error = task.exception()
+        else:
+            self.sent += 1
+
+        if self._pending is not None and self.connected:
+            channels, self._pending = self._pending, None
+            self._launch(channels)
+
+    @property
+    def in_flight(self):
+        return 0 if self._in_flight is None else 1
+
+    async def flush(self):
+        """Wait until every queued update has completed"""
+        while self._in_flight is not None:
+            await asyncio.gather(self._in_flight, return_exceptions=True)
+
+    async def arm_drone(self):
+        """Arm the drone"""
+        if not self.connected:
+            print("Not connected to server")
+            return
+
+        try:
+            await self.stub.armDrone(empty_pb2.Empty())
+            self.armed = True
+            self.channels[4] = 2047  # Set Aux1 high
+            print("Drone ARMED")
+        except grpc.RpcError as e:
+            print(f"Failed to arm drone: {e}")
+
+    async def disarm_drone(self):
+        """Disarm the drone"""
+        if not self.connected:
+            print("Not connected to server")
+            return
+
+        try:
+            await self.stub.disarmDrone(empty_pb2.Empty())
+            self.armed = False
+            self.channels[4] = 1024  # Set Aux1 low
+            print("Drone DISARMED")
+        except grpc.RpcError as e:
+            print(f"Failed to disarm drone: {e}")
+
+    async def reset_controls(self):
+        """Reset all controls to center position"""
+        if not self.connected:
+            return
+
+        try:
+            await self.stub.resetControls(empty_pb2.Empty())
+            self.channels[0] = self.MID_VALUE  # Roll
+            self.channels[1] = self.MID_VALUE  # Pitch
+            self.channels[3] = self.MID_VALUE  # Yaw
+            print("Controls reset to center")
+        except grpc.RpcError as e:
+            print(f"Failed to reset controls: {e}")
+
+    async def get_status(self):
+        """Get current drone status"""
+        if not self.connected:
+            return None
+
+        try:
+            response = await self.stub.getStatus(empty_pb2.Empty())
+            return {
+                'armed': response.armed,
+                'connected': response.connected,
+                'channels': list(response.channels),
+                'timestamp': response.timestamp
+            }
+        except grpc.RpcError as e:
+            self.last_error = e
+            return None
+
+
+    async def get_metrics(self, recent_updates=0):
+        """Get server-side control latency percentiles (and optionally recent per-update traces)"""
+        if not self.connected:
+            return None
+
+        try:
+            response = await self.stub.getMetrics(drone_control_pb2.MetricsReq(recent_updates=recent_updates))
+            return {
+                'latencies': {
+                    stat.stage: {
+                        'count': stat.count,
+                        'p50_us': stat.p50_us,
+                        'p99_us': stat.p99_us,
+                        'p999_us': stat.p999_us,
+                        'max_us': stat.max_us
+                    }
+                    for stat in response.latencies
+                },
+                'recent': [
+                    (t.update_id, t.client_send_ns, t.server_receive_ns, t.frame_encoded_ns, t.serial_written_ns)
+                    for t in response.recent
+                ],
+                'timestamp': response.timestamp
+            }
+        except grpc.RpcError as e:
+            self.last_error = e
+            return None
+
+# Example usage: a 100 Hz asyncio control loop that polls status concurrently
+async def _example():
+    async with AsyncDroneClient(host='localhost', port=50051) as client:
+        for i in range(500):
+            client.channels[0] = 1024 + (i % 100)
+            client.send_channels_nowait()
+            if i % 10 == 0:
+                status = await client.get_status()
+                if status:
+                    print(f"armed={status['armed']} in_flight={client.in_flight}")
+            await asyncio.sleep(0.01)
+        await client.flush()
+        print(f"sent={client.sent} superseded={client.superseded} errors={client.send_errors}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_example())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Input-to-wire latency of the RadioMaster -> CRSF passthrough.
+
+A paced fake HID device feeds RadioMasterReader at the radio's report rate;
+RadioPassthrough writes each report through a DroneControlServicer to a
+pseudo-terminal standing in for the CRSF serial port (a drain thread reads
+the other end). Reported stages are measured from the moment the HID read
+returned, on the same monotonic clock the server uses:
+
+    radio_to_encode   unpack + tick mapping + state publish + CRSF encode
+    radio_to_write    ... + serial write() and flush()
+
+USB polling (1 ms at full speed) and the link itself come on top of this.
+
+Usage: python bench_passthrough_latency.py [--reports 5000] [--rate 500]
+"""
+
+import argparse
+import os
+import pty
+import threading
+import time
+
+import serial
+
+from controllers.radiomaster_controller import RadioMasterReader, REPORT
+from passthrough import RadioPassthrough, to_ticks
+from server import DroneControlServicer
+
+
+class PacedHidDevice:
+    """Returns a report every 1/rate seconds, like the radio's interrupt endpoint"""
+
+    def __init__(self, reports, rate):
+        self.remaining = reports
+        self.period = 1.0 / rate
+        self.next_report = time.perf_counter()
+        self.sequence = 0
+        self.done = threading.Event()
+
+    def read(self, size, timeout_ms=0):
+        if self.remaining == 0:
+            self.done.set()
+            time.sleep(timeout_ms / 1000)
+            return b''
+        delay = self.next_report - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_report += self.period
+        self.remaining -= 1
+        self.sequence = (self.sequence + 1) & 0xFFFF
+        stick = (self.sequence % 200) * 300 - 30000
+        return REPORT.pack(1, self.sequence, 0, stick, -stick, stick, 0, *([0] * 12))
+
+
+def drain(fd, stop):
+    while not stop.is_set():
+        try:
+            os.read(fd, 4096)
+        except OSError:
+            return
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reports', type=int, default=5000, help='HID reports to pass through')
+    parser.add_argument('--rate', type=int, default=500, help='Report rate in Hz')
+    parser.add_argument('--baud', type=int, default=420000, help='Baud rate of the pseudo-terminal link')
+    args = parser.parse_args()
+
+    master, slave = pty.openpty()
+    stop = threading.Event()
+    threading.Thread(target=drain, args=(master, stop), daemon=True).start()
+
+    servicer = DroneControlServicer()
+    servicer.serial_connection = serial.Serial(os.ttyname(slave), args.baud)
+    device = PacedHidDevice(args.reports, args.rate)
+    passthrough = RadioPassthrough(servicer, RadioMasterReader(device=device))
+    passthrough.start()
+    device.done.wait()
+    passthrough.stop()
+    stop.set()
+    servicer.serial_connection.close()
+
+    # The tick mapping on its own
+    channels = [i / 16 - 0.5 for i in range(16)]
+    loops = 100000
+    t0 = time.perf_counter_ns()
+    for _ in range(loops):
+        to_ticks(channels)
+    map_ns = (time.perf_counter_ns() - t0) / loops
+
+    summary = servicer.latency.summary()
+    print("=" * 72)
+    print(f"RadioMaster passthrough, {passthrough.frames} frames at {args.rate} Hz "
+          f"(dropped {passthrough.reader.dropped})")
+    print("=" * 72)
+    print(f"{'stage':<18} {'p50 us':>10} {'p99 us':>10} {'p999 us':>10} {'max us':>10}")
+    for stage in ('radio_to_encode', 'radio_to_write'):
+        count, p50, p99, p999, max_ns = summary[stage]
+        print(f"{stage:<18} {p50 / 1e3:>10.1f} {p99 / 1e3:>10.1f} {p999 / 1e3:>10.1f} {max_ns / 1e3:>10.1f}")
+    print(f"to_ticks (16 channels): {map_ns / 1e3:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Contention benchmark for DroneControlServicer.getStatus.
+
+Compares the old design (getStatus takes the same lock setChannels holds
+during serial.write/flush) with the snapshot design (getStatus reads an
+immutable DroneState without locking). A fake serial port sleeps in write()
+to emulate a slow USB link. No gRPC server or hardware is needed.
+
+Usage: python bench_state_contention.py [--write-ms 2.0] [--readers 4] [--read-ms 1.0] [--seconds 3]
+"""
+
+import argparse
+import builtins
+import threading
+import time
+
+from google.protobuf import empty_pb2
+
+import drone_control_pb2
+from server import DroneControlServicer
+
+
+class SlowSerial:
+    """Serial stand-in whose write() blocks for a fixed time"""
+
+    def __init__(self, write_delay):
+        self.write_delay = write_delay
+        self.is_open = True
+
+    def write(self, data):
+        time.sleep(self.write_delay)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+class LockedStatusServicer(DroneControlServicer):
+    """Reproduces the previous getStatus, which waited on the serial lock"""
+
+    def getStatus(self, request, context):
+        with self.lock:
+            return super().getStatus(request, context)
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * pct / 100.0))
+    return ordered[index]
+
+
+def run(servicer_cls, write_delay, readers, seconds, read_interval):
+    servicer = servicer_cls()
+    servicer.serial_connection = SlowSerial(write_delay)
+    running = True
+    latencies = [[] for _ in range(readers)]
+    writes = [0]
+
+    def writer():
+        request = drone_control_pb2.SetChannelsReq(channels=[1024] * 16)
+        while running:
+            servicer.setChannels(request, None)
+            writes[0] += 1
+
+    def reader(samples):
+        request = empty_pb2.Empty()
+        while running:
+            t0 = time.perf_counter()
+            servicer.getStatus(request, None)
+            samples.append(time.perf_counter() - t0)
+            time.sleep(read_interval)
+
+    threads = [threading.Thread(target=writer, daemon=True)]
+    threads += [threading.Thread(target=reader, args=(latencies[i],), daemon=True) for i in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    running = False
+    for t in threads:
+        t.join(timeout=1.0)
+
+    samples = [s for per_reader in latencies for s in per_reader]
+    return {
+        'reads_per_s': len(samples) / seconds,
+        'writes_per_s': writes[0] / seconds,
+        'p50_us': percentile(samples, 50) * 1e6,
+        'p99_us': percentile(samples, 99) * 1e6,
+        'max_us': max(samples) * 1e6 if samples else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--write-ms', type=float, default=2.0, help='Simulated serial write time (ms)')
+    parser.add_argument('--readers', type=int, default=4, help='Concurrent getStatus threads')
+    parser.add_argument('--read-ms', type=float, default=1.0, help='Pause between getStatus calls per reader (ms)')
+    parser.add_argument('--seconds', type=float, default=3.0, help='Duration of each run')
+    args = parser.parse_args()
+
+    # The servicer prints on every update; silence it for the benchmark
+    real_print = builtins.print
+    builtins.print = lambda *a, **k: None
+    params = (args.write_ms / 1000.0, args.readers, args.seconds, args.read_ms / 1000.0)
+    try:
+        results = [
+            ("locked getStatus", run(LockedStatusServicer, *params)),
+            ("snapshot getStatus", run(DroneControlServicer, *params)),
+        ]
+    finally:
+        builtins.print = real_print
+
+    print("=" * 78)
+    print(f"getStatus contention: {args.readers} readers, 1 writer, {args.write_ms} ms serial write")
+    print("=" * 78)
+    print(f"{'design':<20} {'reads/s':>12} {'writes/s':>10} {'p50 us':>10} {'p99 us':>10} {'max us':>10}")
+    for name, r in results:
+        print(f"{name:<20} {r['reads_per_s']:>12.0f} {r['writes_per_s']:>10.0f} "
+              f"{r['p50_us']:>10.1f} {r['p99_us']:>10.1f} {r['max_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
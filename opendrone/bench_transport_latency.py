@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+setChannels round-trip latency over TCP loopback vs a unix domain socket.
+
+Starts an in-process DroneControlServicer listening on both transports (no
+serial link is opened, so only the gRPC path is measured) and times
+sequential setChannels calls from a DroneClient on each.
+
+Usage: python bench_transport_latency.py [--calls 5000] [--port 50061]
+"""
+
+import argparse
+import builtins
+import os
+import tempfile
+import time
+from concurrent import futures
+
+import grpc
+
+import drone_control_pb2_grpc
+from client import DroneClient
+from server import DroneControlServicer
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * pct / 100.0))
+    return ordered[index]
+
+
+def measure(client, calls, warmup=200):
+    for _ in range(warmup):
+        client.send_channels()
+    samples = []
+    for i in range(calls):
+        client.channels[0] = 1000 + (i % 48)
+        t0 = time.perf_counter_ns()
+        client.send_channels()
+        samples.append(time.perf_counter_ns() - t0)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=5000, help='setChannels calls per transport')
+    parser.add_argument('--port', type=int, default=50061, help='TCP port for the benchmark server')
+    args = parser.parse_args()
+
+    socket_path = os.path.join(tempfile.mkdtemp(), 'opendrone_bench.sock')
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    drone_control_pb2_grpc.add_DroneControlServicer_to_server(DroneControlServicer(), server)
+    server.add_insecure_port(f'127.0.0.1:{args.port}')
+    server.add_insecure_port(f'unix:{socket_path}')
+    server.start()
+
+    # The servicer and client print on every update; silence them while measuring
+    real_print = builtins.print
+    builtins.print = lambda *a, **k: None
+    results = []
+    try:
+        for name, unix_socket in (("tcp loopback", None), ("unix socket", socket_path)):
+            client = DroneClient(host='127.0.0.1', port=args.port, unix_socket=unix_socket)
+            client.connect()
+            results.append((name, measure(client, args.calls)))
+            client.disconnect()
+    finally:
+        builtins.print = real_print
+        server.stop(0)
+
+    print("=" * 72)
+    print(f"setChannels round trip, {args.calls} sequential calls")
+    print("=" * 72)
+    print(f"{'transport':<14} {'calls/s':>10} {'p50 us':>10} {'p99 us':>10} {'p999 us':>10}")
+    for name, samples in results:
+        print(f"{name:<14} {len(samples) / (sum(samples) / 1e9):>10.0f} "
+              f"{percentile(samples, 50) / 1e3:>10.1f} {percentile(samples, 99) / 1e3:>10.1f} "
+              f"{percentile(samples, 99.9) / 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
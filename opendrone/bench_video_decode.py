@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+CPU cost of decoding the video feed for different consumer sizes and colours.
+
+Each JPEG is decoded the way VideoStreamOpenCV._decode_frame does it: at
+the largest DCT scale that still covers the consumer's frame size
+(IMREAD_REDUCED_*), in grayscale when asked, and then resized into the
+frame ring. The first row is the old path, a full-size colour decode
+followed by a resize, for comparison. CPU time is process time, so threads
+used by resize are included.
+
+Frames come from a recording (start_recording() / MjpegRecorder) or, by
+default, are synthesised at --source resolution.
+
+Usage: python bench_video_decode.py [--recording flight.mjpeg] [--source 1280x960] [--frames 300]
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from controllers.recorder import frame_count, read_frame
+from controllers.view import VideoStreamOpenCV
+
+CONSUMERS = [
+    # (label, width, height, grayscale)
+    ('colour 640x480', 640, 480, False),
+    ('gray 640x480', 640, 480, True),
+    ('colour 320x240', 320, 240, False),
+    ('gray 320x240', 320, 240, True),
+    ('gray 160x120', 160, 120, True),
+]
+
+
+def synthetic_jpegs(width, height, count, quality=85):
+    """Camera-like frames: smooth texture with a moving block, so the JPEGs are not trivially compressible"""
+    rng = np.random.default_rng(0)
+    texture = cv2.GaussianBlur(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), (0, 0), 3)
+    jpegs = []
+    for i in range(count):
+        image = np.roll(texture, i * 7, axis=1)
+        x = (i * 13) % max(1, width - 100)
+        cv2.rectangle(image, (x, height // 3), (x + 100, height // 3 + 100), (40, 200, 40), -1)
+        jpegs.append(cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes())
+    return jpegs
+
+
+def recorded_jpegs(path, count):
+    return [read_frame(path, n) for n in range(min(count, frame_count(path)))]
+
+
+def decode_then_resize(jpeg_data, width, height):
+    """The old path: full-resolution colour decode, then resize"""
+    frame = cv2.imdecode(np.frombuffer(jpeg_data, np.uint8), cv2.IMREAD_COLOR)
+    return cv2.resize(frame, (width, height))
+
+
+def measure(decode, jpegs, rounds):
+    """(CPU ms per frame, wall ms per frame), best of rounds"""
+    best = None
+    for _ in range(rounds):
+        cpu, wall = time.process_time(), time.perf_counter()
+        for jpeg_data in jpegs:
+            decode(jpeg_data)
+        result = ((time.process_time() - cpu) * 1000 / len(jpegs), (time.perf_counter() - wall) * 1000 / len(jpegs))
+        best = result if best is None or result[0] < best[0] else best
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recording', help="MJPEG recording to decode instead of synthetic frames")
+    parser.add_argument('--source', default='1280x960', help="Synthetic frame size, WxH")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.recording:
+        jpegs = recorded_jpegs(args.recording, args.frames)
+    else:
+        width, height = (int(v) for v in args.source.lower().split('x'))
+        jpegs = synthetic_jpegs(width, height, args.frames)
+    source = cv2.imdecode(np.frombuffer(jpegs[0], np.uint8), cv2.IMREAD_COLOR).shape
+    print(f"{len(jpegs)} frames, {source[1]}x{source[0]}, {sum(map(len, jpegs)) / len(jpegs) / 1024:.0f} KiB average")
+
+    baseline, _ = measure(lambda jpeg_data: decode_then_resize(jpeg_data, 640, 480), jpegs, args.rounds)
+    print(f"{'consumer':<26} {'cpu ms/frame':>12} {'wall ms/frame':>14} {'vs old':>8}")
+    print(f"{'old: full + resize 640x480':<26} {baseline:>12.2f} {'':>14} {'1.00x':>8}")
+    for label, width, height, grayscale in CONSUMERS:
+        video = VideoStreamOpenCV(headless=True, frame_width=width, frame_height=height, grayscale=grayscale)
+        cpu, wall = measure(video._decode_frame, jpegs, args.rounds)
+        print(f"{label:<26} {cpu:>12.2f} {wall:>14.2f} {baseline / cpu:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Throughput and per-frame latency of the video decoder backends on recorded MJPEG.
+
+Every JPEG of each recording goes through VideoStreamOpenCV._decode_frame
+with each backend in turn (decoder_backends.BACKENDS), the same step the
+DecodeWorker runs: decode at the consumer's size and colour, then write the
+frame into the ring. Reported per backend:
+
+    fps        frames decoded per second, one after another
+    p50/p99    time from handing over the JPEG to the frame being in the ring
+    cpu/frame  process CPU plus, for ffmpeg, the CPU of the ffmpeg process
+
+Backends that are not installed (no ffmpeg binary) are listed and skipped.
+Without recordings, frames from bench_video_decode.synthetic_jpegs are
+recorded to a temporary file first.
+
+Usage: python bench_video_decoders.py [flight.mjpeg ...] [--size 640x480] [--gray] [--frames 300]
+"""
+
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+from bench_video_decode import synthetic_jpegs
+from controllers.decoder_backends import BACKENDS, FFmpegPipeDecoder
+from controllers.recorder import MjpegRecorder, frame_count, read_frame
+from controllers.view import VideoStreamOpenCV
+from latency import LatencyHistogram
+
+WARMUP_FRAMES = 10
+
+
+def record_synthetic(width, height, count):
+    path = os.path.join(tempfile.mkdtemp(), 'synthetic.mjpeg')
+    recorder = MjpegRecorder(path)
+    for i, jpeg_data in enumerate(synthetic_jpegs(width, height, count)):
+        recorder.write(i + 1, jpeg_data, i / 30)
+    recorder.close()
+    return path
+
+
+def children_cpu():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_backend(name, jpegs, width, height, grayscale):
+    video = VideoStreamOpenCV(headless=True, frame_width=width, frame_height=height, grayscale=grayscale,
+                              decoder=name)
+    for jpeg_data in jpegs[:WARMUP_FRAMES]:  # ffmpeg start-up is not part of the per-frame cost
+        video._decode_frame(jpeg_data)
+
+    latency = LatencyHistogram(name)
+    failed = 0
+    cpu, child_cpu = time.process_time(), children_cpu()
+    start = time.perf_counter()
+    for jpeg_data in jpegs:
+        t0 = time.perf_counter_ns()
+        if video._decode_frame(jpeg_data) is None:
+            failed += 1
+        latency.record(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - start
+    video.backend.close()  # Reaps ffmpeg, so its CPU shows up in RUSAGE_CHILDREN
+    cpu = time.process_time() - cpu + children_cpu() - child_cpu
+    return {
+        'fps': len(jpegs) / elapsed,
+        'p50_ms': latency.percentile(50) / 1e6,
+        'p99_ms': latency.percentile(99) / 1e6,
+        'max_ms': latency.max / 1e6,
+        'cpu_ms': cpu * 1000 / len(jpegs),
+        'failed': failed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('recordings', nargs='*', help="MJPEG recordings (start_recording() / MjpegRecorder)")
+    parser.add_argument('--size', default='640x480', help="Consumer frame size, WxH")
+    parser.add_argument('--gray', action='store_true', help="Decode to grayscale")
+    parser.add_argument('--frames', type=int, default=300, help="Frames per recording")
+    parser.add_argument('--source', default='1280x960', help="Synthetic frame size when no recording is given")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    recordings = args.recordings
+    if not recordings:
+        source_width, source_height = (int(v) for v in args.source.lower().split('x'))
+        recordings = [record_synthetic(source_width, source_height, args.frames)]
+
+    backends = [name for name in BACKENDS if name != 'ffmpeg' or FFmpegPipeDecoder.available()]
+    for name in BACKENDS:
+        if name not in backends:
+            print(f"{name}: not installed, skipped")
+
+    for path in recordings:
+        jpegs = [read_frame(path, n) for n in range(min(args.frames, frame_count(path)))]
+        print(f"\n{path}: {len(jpegs)} frames -> {width}x{height} {'gray' if args.gray else 'colour'}")
+        print(f"{'backend':<8} {'fps':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'cpu/frame':>10} {'failed':>7}")
+        for name in backends:
+            r = run_backend(name, jpegs, width, height, args.gray)
+            print(f"{name:<8} {r['fps']:>8.1f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['max_ms']:>8.2f} "
+                  f"{r['cpu_ms']:>8.2f}ms {r['failed']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 import grpc
+import os
+import random
+import threading
 import time
 
 # Generated protobuf imports
@@ -6,10 +9,16 @@ import drone_control_pb2
 import drone_control_pb2_grpc
 from google.protobuf import empty_pb2
 
+from config import load_config
+
 class DroneClient:
-    def __init__(self, host='localhost', port=50051, serial_port='/dev/ttyUSB0', baud_rate=420000):
+    def __init__(self, host='localhost', port=50051, serial_port='/dev/ttyUSB0', baud_rate=420000, unix_socket=None,
+                 connect_timeout=2.0, rpc_timeout=0.5, link_timeout=5.0, auto_reconnect=True,
+                 backoff_initial=0.1, backoff_max=5.0, on_state_change=None):
         self.host = host
         self.port = port
+        self.unix_socket = unix_socket  # Preferred over TCP when set (server on the same host)
+        self.target = None
         self.serial_port = serial_port
         self.baud_rate = baud_rate
         self.channel = None
@@ -19,40 +28,182 @@ class DroneClient:
         
         self.channels = [1024, 1024, 0, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024]  # 16 channels
         self.armed = False
+        self.update_id = 0  # Sent with every setChannels to correlate server latency traces
         
         self.MAX_VALUE = 2047
         self.MIN_VALUE = 0
         self.MID_VALUE = 1024
 
+        # Deadlines (seconds). startLink opens the serial port, so it gets longer.
+        self.connect_timeout = connect_timeout
+        self.rpc_timeout = rpc_timeout
+        self.link_timeout = link_timeout
+
+        # Reconnect with full-jitter exponential backoff after the server drops
+        self.auto_reconnect = auto_reconnect
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.on_state_change = on_state_change  # Called with (old_state, new_state) names
+        self._channel_lock = threading.Lock()
+        self._reconnect_thread = None
+        self._closing = False
+        self._disconnected_at = None
+
+        self.metrics = {
+            'state': 'IDLE',
+            'transitions': {},         # 'OLD->NEW' -> count
+            'disconnects': 0,
+            'reconnects': 0,
+            'reconnect_attempts': 0,
+            'last_reconnect_s': None,  # Time from losing the server to being READY again
+            'max_reconnect_s': 0.0,
+            'fast_failed': 0,          # Calls skipped because the server was unreachable
+            'deadline_exceeded': 0,
+        }
+
+    @classmethod
+    def from_config(cls, config=None, host='localhost', **kwargs):
+        """Build from the loaded config.yml: the server section's port and unix socket"""
+        server_config = (config or load_config())['server']
+        return cls(
+            host=host,
+            port=int(server_config['bind_address'].rsplit(':', 1)[1]),
+            unix_socket=server_config['unix_socket'],
+            **kwargs
+        )
+
+    def _targets(self):
+        """Candidate server addresses in order of preference"""
+        targets = []
+        if self.unix_socket and os.path.exists(self.unix_socket):
+            targets.append(f'unix:{self.unix_socket}')
+        targets.append(f'{self.host}:{self.port}')
+        return targets
+
+    def _open_channel(self, verbose=True):
+        """Try each target once; on success install the new channel and stub (caller sets connected)"""
+        for target in self._targets():
+            channel = grpc.insecure_channel(target)
+            try:
+                grpc.channel_ready_future(channel).result(timeout=self.connect_timeout)
+            except grpc.FutureTimeoutError:
+                if verbose:
+                    print(f"Connection error: Failed to connect to {target} - server not available")
+                channel.close()
+                continue
+            except Exception as e:
+                if verbose:
+                    print(f"Connection error: {e}")
+                channel.close()
+                continue
+
+            with self._channel_lock:
+                old_channel = self.channel
+                self.channel = channel
+                self.stub = drone_control_pb2_grpc.DroneControlStub(channel)
+                self.target = target
+            if old_channel is not None:
+                old_channel.close()
+            channel.subscribe(lambda state, channel=channel: self._on_connectivity(channel, state))
+            return True
+        return False
+
     def connect(self):
-        """Establish gRPC connection to drone server"""
-        try:
-            self.channel = grpc.insecure_channel(f'{self.host}:{self.port}')
-            grpc.channel_ready_future(self.channel).result(timeout=10)
-            self.stub = drone_control_pb2_grpc.DroneControlStub(self.channel)
+        """Establish gRPC connection to drone server, preferring the unix socket if configured"""
+        self._closing = False
+        if self._open_channel():
+            self._set_state('READY')
             self.connected = True
-            print(f"Connected to drone server at {self.host}:{self.port}")
+            print(f"Connected to drone server at {self.target}")
             return True
-        except grpc.RpcError as e:
-            print(f"Failed to connect to server: {e}")
-            return False
-        except Exception as e:
-            if str(e) == "":
-                print(f"Connection error: Failed to connect to {self.host}:{self.port} - server not available")
-            else:
-                print(f"Connection error: {e}")
-            return False
+        return False
 
     def disconnect(self):
         """Close gRPC connection"""
-        if self.channel:
-            self.channel.close()
-        self.connected = False
+        self._closing = True
+        with self._channel_lock:
+            channel, self.channel = self.channel, None
+            self.connected = False
+        if channel:
+            channel.close()
+        if self._reconnect_thread and self._reconnect_thread is not threading.current_thread():
+            self._reconnect_thread.join(timeout=self.connect_timeout + self.backoff_max)
+        self._set_state('SHUTDOWN')
         print("Disconnected from server")
 
+    def connection_metrics(self):
+        """Snapshot of connection-state metrics"""
+        metrics = dict(self.metrics)
+        metrics['transitions'] = dict(self.metrics['transitions'])
+        return metrics
+
+    def _set_state(self, state):
+        old_state = self.metrics['state']
+        if state == old_state:
+            return
+        self.metrics['state'] = state
+        key = f'{old_state}->{state}'
+        self.metrics['transitions'][key] = self.metrics['transitions'].get(key, 0) + 1
+        if self.on_state_change:
+            self.on_state_change(old_state, state)
+
+    def _on_connectivity(self, channel, connectivity):
+        """gRPC connectivity callback for the current channel"""
+        if channel is not self.channel or self._closing:
+            return
+        if connectivity in (grpc.ChannelConnectivity.TRANSIENT_FAILURE, grpc.ChannelConnectivity.SHUTDOWN):
+            self._mark_disconnected()
+
+    def _mark_disconnected(self):
+        """Enter fast-fail mode and start re-establishing the channel"""
+        with self._channel_lock:
+            if not self.connected or self._closing:
+                return
+            self.connected = False
+        self._disconnected_at = time.monotonic()
+        self.metrics['disconnects'] += 1
+        self._set_state('TRANSIENT_FAILURE')
+        print("Lost connection to drone server")
+
+        if self.auto_reconnect:
+            self._reconnect_thread = threading.Thread(target=self._reconnect_loop, daemon=True)
+            self._reconnect_thread.start()
+
+    def _reconnect_loop(self):
+        delay = self.backoff_initial
+        while not self._closing:
+            self._set_state('CONNECTING')
+            self.metrics['reconnect_attempts'] += 1
+            if self._open_channel(verbose=False):
+                elapsed = time.monotonic() - self._disconnected_at
+                self.metrics['reconnects'] += 1
+                self.metrics['last_reconnect_s'] = elapsed
+                self.metrics['max_reconnect_s'] = max(self.metrics['max_reconnect_s'], elapsed)
+                self._set_state('READY')
+                self.connected = True
+                print(f"Reconnected to drone server at {self.target} after {elapsed:.2f}s")
+                return
+            self._set_state('TRANSIENT_FAILURE')
+            time.sleep(random.uniform(0, delay))
+            delay = min(self.backoff_max, delay * 2)
+
+    def _rpc_failed(self, e):
+        """Classify an RPC error; returns True if it was a connectivity problem"""
+        code = e.code() if hasattr(e, 'code') else None
+        if code == grpc.StatusCode.DEADLINE_EXCEEDED:
+            self.metrics['deadline_exceeded'] += 1
+        if code == grpc.StatusCode.UNAVAILABLE:
+            self._mark_disconnected()
+            return True
+        return False
+
+    def _fast_fail(self):
+        self.metrics['fast_failed'] += 1
+
     def start_link(self):
         """Initialize drone communication link via gRPC"""
         if not self.connected:
+            self._fast_fail()
             print("Not connected to server")
             return False
         
@@ -61,87 +212,104 @@ class DroneClient:
                 port=self.serial_port,
                 baud_rate=self.baud_rate
             )
-            response = self.stub.startLink(request)
+            response = self.stub.startLink(request, timeout=self.link_timeout)
             if not response.success:
                 print(f"Server error: {response.message}")
                 return False
             print(f"Started drone link on {self.serial_port} at {self.baud_rate} baud")
             return True
         except grpc.RpcError as e:
-            print(f"Failed to start link: {e}")
+            if not self._rpc_failed(e):
+                print(f"Failed to start link: {e}")
             return False
 
     def stop_link(self):
         """Stop drone communication link"""
         if not self.connected:
+            self._fast_fail()
             return
         
         try:
-            response = self.stub.stopLink(empty_pb2.Empty())
+            response = self.stub.stopLink(empty_pb2.Empty(), timeout=self.rpc_timeout)
             print("Stopped drone link")
         except grpc.RpcError as e:
-            print(f"Failed to stop link: {e}")
+            if not self._rpc_failed(e):
+                print(f"Failed to stop link: {e}")
 
     def send_channels(self):
         """Send current channel values to drone via gRPC"""
         if not self.connected:
+            self._fast_fail()
             return
         
         try:
-            request = drone_control_pb2.SetChannelsReq(channels=self.channels)
-            response = self.stub.setChannels(request)
+            self.update_id += 1
+            request = drone_control_pb2.SetChannelsReq(
+                channels=self.channels,
+                update_id=self.update_id,
+                client_send_ns=time.monotonic_ns()
+            )
+            response = self.stub.setChannels(request, timeout=self.rpc_timeout)
         except grpc.RpcError as e:
-            print(f"Failed to send channels: {e}")
+            if not self._rpc_failed(e):
+                print(f"Failed to send channels: {e}")
 
     def arm_drone(self):
         """Arm the drone"""
         if not self.connected:
+            self._fast_fail()
             print("Not connected to server")
             return
         
         try:
-            response = self.stub.armDrone(empty_pb2.Empty())
+            response = self.stub.armDrone(empty_pb2.Empty(), timeout=self.rpc_timeout)
             self.armed = True
             self.channels[4] = 2047  # Set Aux1 high
             print("Drone ARMED")
         except grpc.RpcError as e:
-            print(f"Failed to arm drone: {e}")
+            if not self._rpc_failed(e):
+                print(f"Failed to arm drone: {e}")
 
     def disarm_drone(self):
         """Disarm the drone"""
         if not self.connected:
+            self._fast_fail()
             print("Not connected to server")
             return
         
         try:
-            response = self.stub.disarmDrone(empty_pb2.Empty())
+            response = self.stub.disarmDrone(empty_pb2.Empty(), timeout=self.rpc_timeout)
             self.armed = False
             self.channels[4] = 1024  # Set Aux1 low
             print("Drone DISARMED")
         except grpc.RpcError as e:
-            print(f"Failed to disarm drone: {e}")
+            if not self._rpc_failed(e):
+                print(f"Failed to disarm drone: {e}")
 
     def reset_controls(self):
         """Reset all controls to center position"""
         if not self.connected:
+            self._fast_fail()
             return
         
         try:
-            response = self.stub.resetControls(empty_pb2.Empty())
+            response = self.stub.resetControls(empty_pb2.Empty(), timeout=self.rpc_timeout)
             self.channels[0] = self.MID_VALUE  # Roll
             self.channels[1] = self.MID_VALUE  # Pitch
             self.channels[3] = self.MID_VALUE  # Yaw
             print("Controls reset to center")
         except grpc.RpcError as e:
-            print(f"Failed to reset controls: {e}")
+            if not self._rpc_failed(e):
+                print(f"Failed to reset controls: {e}")
 
     def get_status(self):
         """Get current drone status"""
         if not self.connected:
+            self._fast_fail()
             return None
         
         try:
-            response = self.stub.getStatus(empty_pb2.Empty())
+            response = self.stub.getStatus(empty_pb2.Empty(), timeout=self.rpc_timeout)
             return {
                 'armed': response.armed,
                 'connected': response.connected,
@@ -149,10 +317,44 @@ class DroneClient:
                 'timestamp': response.timestamp
             }
         except grpc.RpcError as e:
-            print(f"Failed to get status: {e}")
+            if not self._rpc_failed(e):
+                print(f"Failed to get status: {e}")
             return None
 
 
+    def get_metrics(self, recent_updates=0):
+        """Get server-side control latency percentiles (and optionally recent per-update traces)"""
+        if not self.connected:
+            self._fast_fail()
+            return None
+        
+        try:
+            response = self.stub.getMetrics(
+                drone_control_pb2.MetricsReq(recent_updates=recent_updates),
+                timeout=self.rpc_timeout
+            )
+            return {
+                'latencies': {
+                    stat.stage: {
+                        'count': stat.count,
+                        'p50_us': stat.p50_us,
+                        'p99_us': stat.p99_us,
+                        'p999_us': stat.p999_us,
+                        'max_us': stat.max_us
+                    }
+                    for stat in response.latencies
+                },
+                'recent': [
+                    (t.update_id, t.client_send_ns, t.server_receive_ns, t.frame_encoded_ns, t.serial_written_ns)
+                    for t in response.recent
+                ],
+                'timestamp': response.timestamp
+            }
+        except grpc.RpcError as e:
+            if not self._rpc_failed(e):
+                print(f"Failed to get metrics: {e}")
+            return None
+
     def start(self):
         """Start the drone client"""
         if not self.connect():
@@ -200,9 +402,7 @@ class DroneClient:
 
 # Example usage
 if __name__ == "__main__":
-    client = DroneClient(
-        host='localhost',
-        port=50051,
+    client = DroneClient.from_config(
         serial_port='/dev/ttyUSB0',
         baud_rate=420000
     )
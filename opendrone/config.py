@@ -0,0 +1,90 @@
+import copy
+import os
+
+import yaml
+
+# Repo-level config.yml (one directory above this package)
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.yml')
+
+# Defaults used for any key missing from config.yml
+DEFAULTS = {
+    'active_controllers': {
+        'keyboard': False,
+        'gamepad': False,
+        'radio': False,
+        'programatic': None,
+    },
+    'mixer': {
+        'tick_hz': 100,
+        'max_send_hz': 50,
+        'priority': ['radio', 'gamepad', 'programatic', 'keyboard'],
+        'axes': {},
+        'stale_after_s': {'radio': 0.1, 'gamepad': None, 'programatic': 0.5, 'keyboard': None},
+        'takeover_deadband': {'radio': 0, 'gamepad': 0, 'programatic': 0, 'keyboard': 0},
+    },
+    'server': {
+        'bind_address': '[::]:50051',
+        'unix_socket': None,
+        'shm_control': None,
+        'tx_rate_hz': 1000,
+        'max_workers': 10,
+        'max_concurrent_rpcs': None,
+        'max_concurrent_streams': 100,
+        'max_message_bytes': 4 * 1024 * 1024,
+        'compression': 'none',
+        'keepalive': {
+            'time_ms': 10000,
+            'timeout_ms': 5000,
+            'permit_without_calls': True,
+            'min_ping_interval_ms': 5000,
+            'max_pings_without_data': 0,
+        },
+        'metrics': {
+            'enabled': False,
+            'host': '127.0.0.1',
+            'port': 9108,
+        },
+        'tracing': {
+            'enabled': False,
+            'capacity': 65536,
+            'dump_path': '/tmp/opendrone_trace.json',
+        },
+        'radio_passthrough': {
+            'enabled': False,
+            'port': '/dev/ttyUSB0',
+            'baud_rate': 420000,
+        },
+        'http2': {
+            'bdp_probe': True,
+            'lookahead_bytes': 65536,
+            'write_buffer_bytes': 0,
+            'max_frame_bytes': 16384,
+        },
+    },
+}
+
+
+def _merge(base, override):
+    """Recursively merge override into a copy of base"""
+    merged = copy.deepcopy(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_config(path=None):
+    """Load the 'drone' section of config.yml merged over DEFAULTS"""
+    path = path or DEFAULT_CONFIG_PATH
+    loaded = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            loaded = (yaml.safe_load(f) or {}).get('drone', {})
+    return _merge(DEFAULTS, loaded)
+
+
+def dump_config(config):
+    """Render a config dict in the same layout as config.yml"""
+    return yaml.safe_dump({'drone': config}, default_flow_style=False, sort_keys=False)
@@ -0,0 +1,6 @@
+# Modules in this directory import each other flat (`import drone_control_pb2`, `from server import ...`).
+# Put it ahead of the repo root, whose drone_control_pb2.py predates the current proto.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
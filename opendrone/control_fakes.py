@@ -0,0 +1,77 @@
+"""
+Stand-ins for the client, the serial link and the radio's HID device, shared
+by the control path tests.
+"""
+
+import threading
+import time
+
+
+class FakeClient:
+    """Shaped like DroneClient; records every vector sent instead of calling the server"""
+    MAX_VALUE = 2047
+    MIN_VALUE = 0
+    MID_VALUE = 1024
+
+    def __init__(self):
+        self.channels = [1024, 1024, 0, 1024] + [1024] * 12
+        self.armed = False
+        self.sent = []
+
+    def send_channels(self):
+        self.sent.append(list(self.channels))
+
+    # Local channel changes as DroneClient makes them after each RPC
+    def arm_drone(self):
+        self.armed = True
+        self.channels[4] = 2047  # Aux1 high
+
+    def disarm_drone(self):
+        self.armed = False
+        self.channels[4] = 1024  # Aux1 low
+
+    def reset_controls(self):
+        self.channels[0] = self.channels[1] = self.channels[3] = self.MID_VALUE
+
+    def stop(self):
+        pass
+
+
+class RecordingSerial:
+    """An always-open serial port that keeps every frame written to it"""
+    is_open = True
+
+    def __init__(self):
+        self.frames = []
+
+    def write(self, data):
+        self.frames.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+class FakeHidDevice:
+    """Plays back reports like hid.device.read(): list of ints, empty on timeout. done is set once they run out."""
+
+    def __init__(self, reports, interval=0.0):
+        self.reports = list(reports)
+        self.interval = interval
+        self.closed = False
+        self.done = threading.Event()
+
+    def read(self, size, timeout_ms=0):
+        if not self.reports:
+            self.done.set()
+            time.sleep(timeout_ms / 1000)
+            return []
+        if self.interval:
+            time.sleep(self.interval)
+        return list(self.reports.pop(0)[:size])
+
+    def close(self):
+        self.closed = True
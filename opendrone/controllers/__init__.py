@@ -1,4 +1,8 @@
 from .keyboard_controller import KeyboardController
+from .gamepad_controller import GamepadController
+from .mixer import InputMixer
+from .radiomaster_controller import RadioMasterReader, ControlState
 from .view import VideoStreamController, MockVideoStreamController
+from .replay import ReplayVideoStream
 
-__all__ = ['KeyboardController', 'VideoStreamController', 'MockVideoStreamController']
\ No newline at end of file
+__all__ = ['KeyboardController', 'GamepadController', 'RadioMasterReader', 'InputMixer', 'ControlState', 'VideoStreamController', 'MockVideoStreamController', 'ReplayVideoStream']
\ No newline at end of file
@@ -0,0 +1,50 @@
+# What each RPC writes into the server's channel vector, by channel index
+ARM_CHANNELS = {4: 2047}                       # Aux1 high
+DISARM_CHANNELS = {4: 1024, 2: 0}              # Aux1 low, throttle zero
+RESET_CHANNELS = {0: 1024, 1: 1024, 3: 1024}   # Roll, pitch, yaw centered
+
+
+class ChannelCoalescer:
+    """Turns a controller tick into at most one setChannels call.
+
+    Controllers change client.channels freely during a tick and call flush()
+    once at the end. The vector is only sent if it differs from the last one
+    sent and at least 1/max_rate_hz has passed; a deferred change goes out on
+    the first tick after the cap allows it, so nothing is lost.
+    """
+
+    def __init__(self, client, max_rate_hz=50):
+        self.client = client
+        self.min_interval = 1.0 / max_rate_hz if max_rate_hz else 0.0
+        self.last_sent = list(client.channels)
+        self.last_send_time = float('-inf')
+
+        # Counters
+        self.sent = 0
+        self.unchanged = 0   # Ticks with nothing new to send
+        self.deferred = 0    # Ticks held back by the rate cap
+
+    def flush(self, now, force=False):
+        """Send the client's channels if they changed and the rate cap allows (or force). Returns True if sent."""
+        channels = self.client.channels
+        if channels == self.last_sent:
+            self.unchanged += 1
+            return False
+        if not force and now - self.last_send_time < self.min_interval:
+            self.deferred += 1
+            return False
+        self.client.send_channels()
+        self.last_sent = list(channels)
+        self.last_send_time = now
+        self.sent += 1
+        return True
+
+    def mark_applied(self, changes):
+        """Record channels an RPC set on the server, e.g. DISARM_CHANNELS after disarmDrone.
+
+        Flush with force=True before the RPC so nothing is still deferred;
+        any channel whose local value differs from what the RPC set is then
+        sent again on the next flush.
+        """
+        for index, value in changes.items():
+            self.last_sent[index] = value
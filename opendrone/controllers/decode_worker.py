@@ -0,0 +1,154 @@
+import threading
+import time
+
+from latency import LatencyHistogram
+from .frame_ring import FrameTimes
+
+
+class LatestFrameSlot:
+    """One-slot handoff: put() replaces a frame nobody has taken yet, so a slow consumer only ever sees the newest"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._closed = False
+        self.dropped = 0  # Items replaced before they were taken
+
+    def put(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Take the pending item, waiting up to timeout. None if there was nothing or the slot was closed."""
+        with self._cond:
+            if self._item is None and not self._closed:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reopen(self):
+        with self._cond:
+            self._closed = False
+            self._item = None
+
+
+class DecodeWorker:
+    """
+    Decodes JPEGs off the reader thread, newest frame first.
+
+    The reader calls submit() and never waits: frames go into a
+    LatestFrameSlot, so if decoding falls behind the stale frames are dropped
+    instead of queueing up latency. With several workers (cv2.imdecode
+    releases the GIL) a frame that finishes after a newer one is dropped too,
+    so on_frame(frame_id, frame, times) always sees increasing ids. times is
+    a FrameTimes with the stamps given to submit() and the decode-done time.
+    """
+
+    def __init__(self, decode, on_frame, workers=1):
+        self.decode = decode      # jpeg bytes -> decoded frame (or ring slot) for on_frame, None on failure
+        self.on_frame = on_frame  # Called on a worker thread with (frame_id, frame, times)
+        self.workers = workers
+        self.slot = LatestFrameSlot()
+        self.running = False
+        self.worker_threads = []
+        self._lock = threading.Lock()          # Counters and stats()
+        self._deliver_lock = threading.Lock()  # Keeps ids reaching on_frame in order
+        self._next_id = 0
+        self._last_delivered = 0
+
+        # Counters
+        self.received = 0
+        self.decoded = 0
+        self.failed = 0  # JPEGs the decoder rejected
+        self.late = 0    # Decoded after a newer frame was already delivered
+        self.decode_time = LatencyHistogram('decode')  # ns per decode
+
+    @property
+    def dropped(self):
+        return self.slot.dropped + self.late
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.slot.reopen()
+        self.worker_threads = [
+            threading.Thread(target=self._worker_loop, name=f"jpeg-decode-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self.worker_threads:
+            thread.start()
+
+    def stop(self):
+        self.running = False
+        self.slot.close()
+        for thread in self.worker_threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=1.0)
+        self.worker_threads = []
+
+    def submit(self, jpeg_data, frame_id=None, first_byte_ns=0, end_marker_ns=0):
+        """Hand a complete JPEG to the workers. Never blocks. Returns its frame id.
+
+        frame_id defaults to the next number in sequence; ids passed in must increase.
+        first_byte_ns/end_marker_ns are the frame's receive times (monotonic_ns), passed on in its FrameTimes.
+        """
+        self._next_id = self._next_id + 1 if frame_id is None else frame_id
+        self.received += 1
+        self.slot.put((self._next_id, jpeg_data, first_byte_ns, end_marker_ns))
+        return self._next_id
+
+    def _worker_loop(self):
+        while self.running:
+            item = self.slot.get(timeout=0.1)
+            if item is None:
+                continue
+            self._decode(*item)
+
+    def decode_now(self, jpeg_data, frame_id, first_byte_ns=0, end_marker_ns=0):
+        """Decode on the caller's thread and deliver, with the same counters; for sources that can wait (replay)"""
+        self._next_id = frame_id
+        self.received += 1
+        self._decode(frame_id, jpeg_data, first_byte_ns, end_marker_ns)
+
+    def _decode(self, frame_id, jpeg_data, first_byte_ns, end_marker_ns):
+        start = time.perf_counter_ns()
+        frame = self.decode(jpeg_data)
+        elapsed = time.perf_counter_ns() - start
+        decoded_ns = time.monotonic_ns()
+        with self._lock:
+            self.decode_time.record(elapsed)
+            if frame is None:
+                self.failed += 1
+                return
+        # on_frame runs under the delivery lock only, so subscribers may call stats(); keep it cheap
+        with self._deliver_lock:
+            if frame_id < self._last_delivered:
+                with self._lock:
+                    self.late += 1
+                return
+            self._last_delivered = frame_id
+            with self._lock:
+                self.decoded += 1
+            self.on_frame(frame_id, frame, FrameTimes(first_byte_ns, end_marker_ns, decoded_ns, 0))
+
+    def stats(self):
+        with self._lock:
+            decode_time = self.decode_time
+            return {
+                'received': self.received,
+                'decoded': self.decoded,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'decode_p50_ms': decode_time.percentile(50) / 1e6,
+                'decode_p99_ms': decode_time.percentile(99) / 1e6,
+                'decode_max_ms': decode_time.max / 1e6,
+            }
@@ -0,0 +1,226 @@
+import abc
+import queue
+import shutil
+import subprocess
+import threading
+
+import cv2
+import numpy as np
+
+from .jpeg_decode import decode_flag, jpeg_size, reduced_scale
+
+
+class DecoderBackend(abc.ABC):
+    """
+    Turns one complete JPEG into an image for the frame ring.
+
+    decode(jpeg_data) returns a height x width (x 3 unless grayscale) uint8
+    image, or None if the JPEG could not be decoded. The image may come back
+    larger than asked for (VideoStreamOpenCV resizes it into the ring slot),
+    and it may be called from several DecodeWorker threads at once.
+    """
+    name = None
+
+    def __init__(self, width, height, grayscale=False):
+        self.width = width
+        self.height = height
+        self.grayscale = grayscale
+
+    @abc.abstractmethod
+    def decode(self, jpeg_data):
+        pass
+
+    def close(self):
+        """Release any process or thread; decode() may start them again"""
+        pass
+
+
+class OpenCVDecoder(DecoderBackend):
+    """In-process cv2.imdecode at the largest DCT scale that still covers the target size (see jpeg_decode.py)"""
+    name = 'opencv'
+
+    MAX_CACHED_SIZES = 16  # Damaged headers can report any size; don't let them grow the cache
+
+    def __init__(self, width, height, grayscale=False):
+        super().__init__(width, height, grayscale)
+        self.flags = {}  # imdecode flag per source size
+
+    def flag_for(self, source_size):
+        """imdecode flag for a JPEG of source_size; safe to call from several decode threads"""
+        flag = self.flags.get(source_size)
+        if flag is None:
+            if len(self.flags) >= self.MAX_CACHED_SIZES:
+                self.flags = {}
+            # Threads racing here compute the same flag, so either store wins
+            flag = self.flags[source_size] = decode_flag(source_size, (self.width, self.height), self.grayscale)
+        return flag
+
+    def decode(self, jpeg_data):
+        flag = self.flag_for(jpeg_size(jpeg_data))
+        return cv2.imdecode(np.frombuffer(jpeg_data, np.uint8), flag)
+
+
+def _flush_image():
+    """16x16 with white top-left and bottom-right quadrants, each a whole 8x8 JPEG block so it decodes cleanly"""
+    image = np.zeros((16, 16, 3), dtype=np.uint8)
+    image[:8, :8] = image[8:, 8:] = 255
+    return image
+
+
+# Tiny JPEG sent after every frame, padded past ffmpeg's 4 KiB pipe read (see FFmpegPipeDecoder)
+FLUSH_JPEG = cv2.imencode('.jpg', _flush_image())[1].tobytes()
+FLUSH_PADDING = bytes(4096)
+FLUSH_QUADRANTS = np.array([[255, 0], [0, 255]], dtype=np.int16)
+
+
+class FFmpegPipeDecoder(DecoderBackend):
+    """
+    Decodes in a long-running ffmpeg process: JPEGs go in on stdin and raw
+    width x height BGR (or gray) frames come back on stdout, read by a
+    thread of their own so neither pipe can fill up and stall the other.
+    The JPEG DCT scale is picked like OpenCVDecoder's (ffmpeg's -lowres),
+    so the process is restarted when the camera resolution changes.
+
+    ffmpeg's jpeg pipe demuxer only passes a JPEG on once it has seen the
+    next one's start marker and filled a 4 KiB read, so every frame would
+    come out one frame late. Each JPEG is therefore followed by a small
+    padded flush JPEG, whose decoded output is skipped on the next call.
+    Flush frames are recognised by their quadrant pattern rather than by
+    position: a damaged JPEG can come out as no frame or as several, and any
+    frame still queued ahead of the previous flush is dropped, so one bad
+    JPEG costs at most that call. Calls are serialised: one process decodes one frame at a time, so use
+    decode_workers=1 with this backend. Needs FFmpeg 5.1 or newer.
+    """
+    name = 'ffmpeg'
+
+    def __init__(self, width, height, grayscale=False, binary='ffmpeg', timeout=0.5):
+        super().__init__(width, height, grayscale)
+        self.binary = shutil.which(binary) or binary
+        self.timeout = timeout  # Seconds to wait for a decoded frame before restarting ffmpeg
+        self.shape = (height, width) if grayscale else (height, width, 3)
+        self.frame_bytes = width * height * (1 if grayscale else 3)
+        self.process = None
+        self.frames = None  # Decoded frames from the reader thread
+        self._source_size = None
+        self._flush_pending = False
+        self._lock = threading.Lock()
+        self.restarts = 0
+        self.discarded = 0  # Extra frames ffmpeg made out of a damaged JPEG
+        # Quadrant centres, where the scaled flush image is flat at any -lowres
+        self._flush_rows = np.array([height // 4, 3 * height // 4])
+        self._flush_cols = np.array([width // 4, 3 * width // 4])
+
+    @staticmethod
+    def available(binary='ffmpeg'):
+        return shutil.which(binary) is not None
+
+    def command(self, lowres=0):
+        return [
+            self.binary, '-hide_banner', '-loglevel', 'error',
+            # Start decoding straight away instead of probing the input
+            '-probesize', '32', '-analyzeduration', '0', '-fflags', 'nobuffer', '-flags', 'low_delay',
+            '-threads', '1', '-lowres', str(lowres), '-reinit_filter', '0', '-f', 'jpeg_pipe', '-i', 'pipe:0',
+            '-vf', f'scale={self.width}:{self.height}', '-fps_mode', 'passthrough',
+            '-pix_fmt', 'gray' if self.grayscale else 'bgr24', '-f', 'rawvideo', 'pipe:1',
+        ]
+
+    def _start(self, source_size):
+        self._stop()
+        lowres = 0
+        if source_size is not None:
+            lowres = reduced_scale(source_size, (self.width, self.height)).bit_length() - 1
+        self.process = subprocess.Popen(self.command(lowres), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, bufsize=0)
+        self.frames = queue.Queue()
+        threading.Thread(target=self._read_loop, args=(self.process, self.frames),
+                         name="ffmpeg-reader", daemon=True).start()
+        # ffmpeg swallows the first JPEG while it sets up the input; make it this one
+        self.process.stdin.write(FLUSH_JPEG)
+        self._source_size = source_size
+        self._flush_pending = False
+
+    def _read_loop(self, process, frames):
+        """Read whole raw frames off ffmpeg's stdout until it exits"""
+        with process.stdout:
+            while True:
+                frame = np.empty(self.shape, dtype=np.uint8)
+                view = memoryview(frame).cast('B')
+                got = 0
+                while got < self.frame_bytes:
+                    n = process.stdout.readinto(view[got:])
+                    if not n:
+                        frames.put(None)
+                        return
+                    got += n
+                frames.put(frame)
+
+    def _next_frame(self):
+        frame = self.frames.get(timeout=self.timeout)
+        if frame is None:
+            raise EOFError("ffmpeg exited")
+        return frame
+
+    def is_flush(self, frame):
+        """True if frame is a decoded FLUSH_JPEG"""
+        samples = frame[np.ix_(self._flush_rows, self._flush_cols)].astype(np.int16)
+        if not self.grayscale:
+            samples = samples.transpose(2, 0, 1)
+        return bool((np.abs(samples - FLUSH_QUADRANTS) <= 48).all())
+
+    def decode(self, jpeg_data):
+        source_size = jpeg_size(jpeg_data)
+        with self._lock:
+            try:
+                if self.process is None or (source_size is not None and source_size != self._source_size):
+                    self._start(source_size)
+                self.process.stdin.write(jpeg_data)
+                self.process.stdin.write(FLUSH_JPEG + FLUSH_PADDING)
+                if self._flush_pending:
+                    # Skip to the previous call's flush frame, dropping anything left over before it
+                    while not self.is_flush(self._next_frame()):
+                        self.discarded += 1
+                # This JPEG's frame, even if it happens to look like a flush: ffmpeg holds
+                # this call's own flush back until the next JPEG, so one is always pending now
+                frame = self._next_frame()
+                self._flush_pending = True
+                return frame
+            except (OSError, EOFError, queue.Empty) as e:
+                # Broken pipe, ffmpeg died or a frame never came: start afresh on the next JPEG
+                print(f"FFmpeg decoder error: {str(e) or type(e).__name__}")
+                self._stop()
+                self.restarts += 1
+                return None
+
+    def _stop(self):
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def close(self):
+        with self._lock:
+            self._stop()
+
+
+BACKENDS = {
+    'opencv': OpenCVDecoder,
+    'ffmpeg': FFmpegPipeDecoder,
+}
+
+
+def make_decoder(name, width, height, grayscale=False):
+    """Backend by name; 'ffmpeg' falls back to OpenCV when the binary is not installed"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown video decoder '{name}', expected one of {', '.join(BACKENDS)}")
+    if name == 'ffmpeg' and not FFmpegPipeDecoder.available():
+        print("ffmpeg not found, decoding video with OpenCV")
+        name = 'opencv'
+    return BACKENDS[name](width, height, grayscale)
@@ -0,0 +1,90 @@
+import threading
+from array import array
+from typing import NamedTuple
+
+import numpy as np
+
+
+class FrameTimes(NamedTuple):
+    """time.monotonic_ns() at each pipeline stage of a frame; 0 where the source has no such stage"""
+    first_byte: int  # Read that returned the frame's start marker
+    end_marker: int  # Extractor found the end marker
+    decoded: int     # Decoder returned
+    delivered: int   # Committed to the ring and handed to subscribers
+
+
+class FrameRef(NamedTuple):
+    """A delivered frame: a read-only view into a FrameRing slot"""
+    frame_id: int
+    timestamp: float  # time.monotonic() when the frame was committed
+    slot: int
+    image: np.ndarray
+    times: FrameTimes = None
+
+
+class FrameRing:
+    """
+    Fixed ring of preallocated height x width x channels frame buffers
+    (height x width for channels=1, as cv2 gives grayscale images).
+
+    The producer takes the next slot with acquire(), writes the frame into it
+    and publishes it with commit(). Consumers get FrameRefs whose image is a
+    read-only view of the slot, so nothing is allocated or copied per frame.
+    A slot is reused `slots` frames later; a consumer that holds a frame
+    longer than that should copy it, or check is_current() after using it.
+    """
+
+    def __init__(self, height, width, channels=3, slots=8):
+        self.height = height
+        self.width = width
+        self.channels = channels
+        self.slots = slots
+        shape = (slots, height, width) if channels == 1 else (slots, height, width, channels)
+        self.frames = np.zeros(shape, dtype=np.uint8)
+
+        # Views are made once: writable ones for the producer, read-only for consumers
+        self._writable = [self.frames[i] for i in range(slots)]
+        self._readonly = []
+        for i in range(slots):
+            view = self.frames[i].view()
+            view.flags.writeable = False
+            self._readonly.append(view)
+
+        self.ids = array('q', bytes(8 * slots))  # Frame id in each slot, 0 while being written
+        self.timestamps = array('d', bytes(8 * slots))
+        self._refs = [None] * slots
+        self._lock = threading.Lock()
+        self._next = 0
+        self._latest = None
+
+    def acquire(self):
+        """Take the next slot for writing: returns (slot, writable image)"""
+        with self._lock:
+            slot = self._next
+            self._next = (slot + 1) % self.slots
+            self.ids[slot] = 0
+        return slot, self._writable[slot]
+
+    def commit(self, slot, frame_id, timestamp, times=None):
+        """Publish a written slot; returns its FrameRef"""
+        self.timestamps[slot] = timestamp
+        self.ids[slot] = frame_id
+        ref = FrameRef(frame_id, timestamp, slot, self._readonly[slot], times)
+        self._refs[slot] = ref
+        self._latest = ref
+        return ref
+
+    def latest(self):
+        """Most recently committed frame, or None"""
+        return self._latest
+
+    def find(self, frame_id):
+        """FrameRef of frame_id if it is still in the ring, else None"""
+        for ref in self._refs:
+            if ref is not None and ref.frame_id == frame_id and self.ids[ref.slot] == frame_id:
+                return ref
+        return None
+
+    def is_current(self, ref):
+        """False once ref's slot has been reused for a newer frame"""
+        return self.ids[ref.slot] == ref.frame_id
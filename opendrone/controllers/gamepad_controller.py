@@ -0,0 +1,264 @@
+import errno
+import fcntl
+import glob
+import os
+import selectors
+import struct
+import threading
+import time
+from array import array
+
+from .coalescer import ARM_CHANNELS, DISARM_CHANNELS, RESET_CHANNELS, ChannelCoalescer
+from .stick_curves import StickShaper, ROLL, PITCH, THROTTLE, YAW
+
+# struct input_event from <linux/input.h>: timeval, type, code, value
+INPUT_EVENT = struct.Struct('llHHi')
+# struct input_absinfo: value, minimum, maximum, fuzz, flat, resolution
+ABS_INFO = struct.Struct('6i')
+
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_ABS = 0x03
+SYN_REPORT = 0
+SYN_DROPPED = 3
+
+ABS_X, ABS_Y, ABS_Z, ABS_RX, ABS_RY, ABS_RZ = 0x00, 0x01, 0x02, 0x03, 0x04, 0x05
+BTN_SELECT, BTN_START = 0x13a, 0x13b
+
+
+def eviocgabs(code):
+    """EVIOCGABS(code) = _IOR('E', 0x40 + code, struct input_absinfo)"""
+    return (2 << 30) | (ABS_INFO.size << 16) | (ord('E') << 8) | (0x40 + code)
+
+
+def find_gamepad():
+    """First joystick-class event device, or None"""
+    devices = sorted(glob.glob('/dev/input/by-id/*-event-joystick'))
+    return devices[0] if devices else None
+
+
+class GamepadController:
+    """
+    Gamepad/joystick control straight from a Linux evdev node.
+
+    /dev/input/event* is opened non-blocking and waited on with a selector;
+    every read drains all pending input_event records. Axis events update a
+    compact array of raw stick ticks (0..2047), and on each SYN_REPORT the
+    sticks are shaped and the channels sent through the same ChannelCoalescer
+    path as KeyboardController. Only read access to the event node is needed
+    (the 'input' group), not root.
+
+    Default layout (Xbox-style pad, mode 2): right trigger is throttle, so
+    letting go cuts it; left stick X yaw; right stick roll/pitch. START
+    arms/disarms, SELECT resets controls.
+    """
+
+    # channel -> (ABS code, inverted)
+    AXIS_MAP = {
+        ROLL: (ABS_RX, False),
+        PITCH: (ABS_RY, True),
+        THROTTLE: (ABS_RZ, False),
+        YAW: (ABS_X, False),
+    }
+    ARM_BUTTON = BTN_START
+    RESET_BUTTON = BTN_SELECT
+    DEFAULT_RANGE = (-32768, 32767)       # Used when the device can't report its axis ranges
+    TRIGGER_RANGE = (0, 255)
+    READ_SIZE = INPUT_EVENT.size * 64
+
+    def __init__(self, client, device=None, max_send_hz=50, curves=None, tick=0.01):
+        self.client = client
+        self.device = device
+        self.fd = None
+        self.running = False
+        self.gamepad_thread = None
+        self.TICK = tick  # Longest wait for input; deferred sends go out on this tick
+
+        # Raw stick positions in ticks, shaped into client.channels on each report
+        self.sticks = array('H', client.channels[:4])
+        self.shaper = StickShaper(curves)
+        self.updates = ChannelCoalescer(client, max_send_hz)
+
+        # ABS code -> (channel, minimum, span, inverted), filled from the device's ranges
+        self._axes = {}
+        self._partial = b''
+        self._dropping = False  # After SYN_DROPPED, ignore events up to the next SYN_REPORT
+
+        # Counters
+        self.events = 0
+        self.reports = 0
+        self.resyncs = 0  # SYN_DROPPED: the kernel buffer overflowed
+
+    def open(self):
+        """Open the event device non-blocking and read its axis ranges"""
+        path = self.device or find_gamepad()
+        if path is None:
+            print("No gamepad found under /dev/input/by-id")
+            return False
+        try:
+            self.fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        except OSError as e:
+            print(f"Failed to open gamepad {path}: {e}")
+            return False
+        self.device = path
+        for channel, (code, inverted) in self.AXIS_MAP.items():
+            _, minimum, maximum = self._axis_info(code)
+            self._axes[code] = (channel, minimum, max(1, maximum - minimum), inverted)
+        print(f"Opened gamepad {path}")
+        return True
+
+    def _axis_info(self, code):
+        """(value, minimum, maximum) of an axis, or None for value if the device can't say"""
+        try:
+            info = ABS_INFO.unpack(fcntl.ioctl(self.fd, eviocgabs(code), bytes(ABS_INFO.size)))
+            return info[0], info[1], info[2]
+        except OSError:
+            # Not an evdev node (e.g. a recorded stream on a pipe)
+            minimum, maximum = self.TRIGGER_RANGE if code in (ABS_Z, ABS_RZ) else self.DEFAULT_RANGE
+            return None, minimum, maximum
+
+    def _set_axis(self, code, value):
+        axis = self._axes.get(code)
+        if axis is not None:
+            channel, minimum, span, inverted = axis
+            # Rounded integer scale to 0..2047, no float math per event
+            tick = (2 * (value - minimum) * 2047 + span) // (2 * span)
+            tick = 0 if tick < 0 else 2047 if tick > 2047 else tick
+            self.sticks[channel] = 2047 - tick if inverted else tick
+
+    def _resync(self):
+        """Re-read the axis positions after events were dropped"""
+        for code in self._axes:
+            value, _, _ = self._axis_info(code)
+            if value is not None:
+                self._set_axis(code, value)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def start(self):
+        """Start gamepad control in a separate thread"""
+        if self.gamepad_thread and self.gamepad_thread.is_alive():
+            return True
+        if self.fd is None and not self.open():
+            return False
+        self.running = True
+        self.gamepad_thread = threading.Thread(target=self._gamepad_loop, daemon=True)
+        self.gamepad_thread.start()
+        return True
+
+    def stop(self):
+        """Stop gamepad control"""
+        self.running = False
+        if self.gamepad_thread and self.gamepad_thread is not threading.current_thread():
+            self.gamepad_thread.join(timeout=1.0)
+        self.close()
+
+    def handle_events(self, data, now):
+        """Apply a chunk of raw input_event bytes. A trailing partial event is kept for the next chunk."""
+        if self._partial:
+            data = self._partial + data
+        usable = len(data) - len(data) % INPUT_EVENT.size
+        self._partial = data[usable:]
+
+        client = self.client
+        set_axis = self._set_axis
+        for _, _, ev_type, code, value in INPUT_EVENT.iter_unpack(memoryview(data)[:usable]):
+            self.events += 1
+            if self._dropping:
+                if ev_type == EV_SYN and code == SYN_REPORT:
+                    self._dropping = False
+                    self._resync()
+                    self._apply_report(now)
+                continue
+            if ev_type == EV_ABS:
+                set_axis(code, value)
+            elif ev_type == EV_KEY:
+                if value == 1:  # Press; ignore release (0) and auto-repeat (2)
+                    if code == self.ARM_BUTTON:
+                        # The RPC works on the server's vector, so get any deferred change there first
+                        self.updates.flush(now, force=True)
+                        if client.armed:
+                            client.disarm_drone()
+                            # disarmDrone zeroed throttle on the server; it stays there until the trigger moves
+                            self.sticks[THROTTLE] = client.MIN_VALUE
+                            client.channels[THROTTLE] = DISARM_CHANNELS[THROTTLE]
+                            self.updates.mark_applied(DISARM_CHANNELS)
+                        else:
+                            client.arm_drone()
+                            self.updates.mark_applied(ARM_CHANNELS)
+                    elif code == self.RESET_BUTTON:
+                        self.updates.flush(now, force=True)
+                        client.reset_controls()
+                        self.updates.mark_applied(RESET_CHANNELS)
+            elif ev_type == EV_SYN:
+                if code == SYN_REPORT:
+                    self._apply_report(now)
+                elif code == SYN_DROPPED:
+                    self.resyncs += 1
+                    self._dropping = True
+
+    def _shape_sticks(self):
+        tables = self.shaper.tables
+        sticks = self.sticks
+        channels = self.client.channels
+        channels[ROLL] = tables[ROLL][sticks[ROLL]]
+        channels[PITCH] = tables[PITCH][sticks[PITCH]]
+        channels[THROTTLE] = tables[THROTTLE][sticks[THROTTLE]]
+        channels[YAW] = tables[YAW][sticks[YAW]]
+
+    def _apply_report(self, now):
+        self._shape_sticks()
+        self.reports += 1
+        self.updates.flush(now)
+
+    def _release_sticks(self, now):
+        """The pad is gone: send zero throttle and centred axes rather than leave its last input applied"""
+        sticks = self.sticks
+        sticks[ROLL] = sticks[PITCH] = sticks[YAW] = self.client.MID_VALUE
+        sticks[THROTTLE] = self.client.MIN_VALUE
+        self._shape_sticks()
+        self.updates.flush(now, force=True)
+
+    def _gamepad_loop(self):
+        """Wait for gamepad input and send commands via client"""
+        print("Gamepad control active. Use:")
+        print(" Right trigger: Throttle")
+        print(" Left stick X: Yaw")
+        print(" Right stick: Roll/Pitch")
+        print(" START: Arm/Disarm")
+        print(" SELECT: Reset controls")
+
+        selector = selectors.DefaultSelector()
+        selector.register(self.fd, selectors.EVENT_READ)
+        try:
+            while self.running:
+                ready = selector.select(self.TICK)
+                now = time.monotonic()
+                if ready:
+                    eof = False
+                    try:
+                        while True:
+                            data = os.read(self.fd, self.READ_SIZE)
+                            if not data:
+                                eof = True  # Writer closed (recorded stream finished)
+                                break
+                            self.handle_events(data, now)
+                    except BlockingIOError:
+                        pass  # Drained
+                    except OSError as e:
+                        if e.errno == errno.ENODEV:
+                            print("Gamepad disconnected")
+                        else:
+                            print(f"Gamepad read error: {e}")
+                        eof = True
+                    if eof:
+                        self._release_sticks(now)
+                        self.running = False
+                        break
+                # Let a send held back by the rate cap go out
+                self.updates.flush(now)
+        finally:
+            selector.close()
@@ -0,0 +1,51 @@
+import cv2
+
+# imdecode flags per DCT scale: libjpeg decodes straight to 1/2, 1/4 or 1/8 size,
+# skipping most of the IDCT and colour conversion instead of resizing afterwards
+REDUCED_COLOR = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+                 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+REDUCED_GRAYSCALE = {1: cv2.IMREAD_GRAYSCALE, 2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+                     4: cv2.IMREAD_REDUCED_GRAYSCALE_4, 8: cv2.IMREAD_REDUCED_GRAYSCALE_8}
+
+# Start-of-frame markers (SOF0-SOF15 less DHT, JPG and DAC), which carry the image size
+SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+SOS = 0xDA
+
+
+def jpeg_size(jpeg_data):
+    """(width, height) from the JPEG's frame header, or None. Only walks the header segments."""
+    i = 2  # After SOI
+    end = len(jpeg_data) - 9
+    while i < end:
+        if jpeg_data[i] != 0xFF:
+            return None
+        marker = jpeg_data[i + 1]
+        if marker == 0xFF:  # Fill byte
+            i += 1
+            continue
+        if marker in SOF_MARKERS:
+            height = (jpeg_data[i + 5] << 8) | jpeg_data[i + 6]
+            width = (jpeg_data[i + 7] << 8) | jpeg_data[i + 8]
+            return width, height
+        if marker == SOS:
+            return None
+        i += 2 + ((jpeg_data[i + 2] << 8) | jpeg_data[i + 3])
+    return None
+
+
+def reduced_scale(source_size, target_size):
+    """Largest DCT scale (1, 2, 4 or 8) that still decodes to at least target_size"""
+    source_width, source_height = source_size
+    width, height = target_size
+    for scale in (8, 4, 2):
+        if source_width // scale >= width and source_height // scale >= height:
+            return scale
+    return 1
+
+
+def decode_flag(source_size, target_size, grayscale=False):
+    """imdecode flag for decoding a source_size JPEG for a target_size consumer"""
+    flags = REDUCED_GRAYSCALE if grayscale else REDUCED_COLOR
+    if source_size is None:
+        return flags[1]
+    return flags[reduced_scale(source_size, target_size)]
@@ -0,0 +1,89 @@
+SOI = b'\xff\xd8'  # JPEG start of image
+EOI = b'\xff\xd9'  # JPEG end of image
+
+
+class JpegFrameExtractor:
+    """
+    Splits a byte stream (serial MJPEG) into complete JPEG frames.
+
+    feed() appends the new bytes and returns every JPEG completed by them,
+    each exactly once. The scan resumes where the previous one stopped, so a
+    byte is looked at about once no matter how many reads a frame spans.
+    Consumed bytes are dropped from the front of the buffer in place, keeping
+    any bytes of the next frame. A frame that grows past max_frame_bytes
+    without an end marker is discarded, and the search resumes at the next
+    start marker, so a lost EOI can't make the buffer grow without bound.
+
+    feed(data, now) also leaves in start_times, for each returned frame, the
+    `now` of the feed() that found its start marker (first byte received).
+    """
+
+    def __init__(self, max_frame_bytes=512 * 1024):
+        self.max_frame_bytes = max_frame_bytes
+        self.buffer = bytearray()
+        self._start = -1  # Offset of the current frame's SOI, -1 while looking for one
+        self._scan = 0    # Where the next marker search starts
+        self._start_time = 0
+        self.start_times = []  # now of the feed() that found each returned frame's SOI
+
+        # Counters
+        self.frames = 0
+        self.oversized = 0        # Frames dropped for exceeding max_frame_bytes
+        self.discarded_bytes = 0  # Bytes outside any frame (noise, partial frames)
+
+    def feed(self, data, now=0):
+        """Append data (read at time now); returns the list of complete JPEGs (bytes) it finished"""
+        buffer = self.buffer
+        buffer.extend(data)
+        frames = []
+        self.start_times = start_times = []
+        consumed = 0
+
+        while True:
+            if self._start < 0:
+                # Back up one byte in case a marker was split across reads
+                start = buffer.find(SOI, max(consumed, self._scan - 1))
+                if start < 0:
+                    # Nothing to keep except a trailing 0xFF that may begin a marker
+                    keep = 1 if buffer and buffer[-1] == 0xFF else 0
+                    self.discarded_bytes += len(buffer) - keep - consumed
+                    consumed = len(buffer) - keep
+                    self._scan = len(buffer)
+                    break
+                self.discarded_bytes += start - consumed
+                consumed = start
+                self._start = start
+                self._start_time = now
+                self._scan = start + 2
+
+            end = buffer.find(EOI, max(self._start + 2, self._scan - 1))
+            if end >= 0:
+                frames.append(bytes(buffer[self._start:end + 2]))
+                start_times.append(self._start_time)
+                self.frames += 1
+                consumed = end + 2
+                self._start = -1
+                self._scan = consumed
+                continue
+
+            self._scan = len(buffer)
+            if len(buffer) - self._start > self.max_frame_bytes:
+                # No end marker in time: drop this frame and look for the next one after its SOI
+                self.oversized += 1
+                self._scan = self._start + 2
+                self._start = -1
+                continue
+            break
+
+        if consumed:
+            # Compact in place; bytearray drops a prefix without reallocating
+            del buffer[:consumed]
+            self._scan -= consumed
+            if self._start >= 0:
+                self._start -= consumed
+        return frames
+
+    def reset(self):
+        self.buffer.clear()
+        self._start = -1
+        self._scan = 0
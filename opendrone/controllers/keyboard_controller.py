@@ -2,33 +2,177 @@ import time
 import threading
 import keyboard
 
+from .coalescer import ARM_CHANNELS, DISARM_CHANNELS, RESET_CHANNELS, ChannelCoalescer
+from .stick_curves import StickShaper, ROLL, PITCH, THROTTLE, YAW
+
+
+class KeyStateTracker:
+    """Pressed-key bitmask kept up to date by keyboard hook events.
+
+    The control loop reads `mask` instead of polling keyboard.is_pressed for
+    every key. Key-down edges are latched separately so a tap shorter than one
+    control tick is never missed.
+    """
+
+    def __init__(self, keys):
+        self.bits = {name: 1 << i for i, name in enumerate(keys)}
+        self.mask = 0
+        self._edges = 0
+        self._lock = threading.Lock()
+        self._hook = None
+
+    def start(self):
+        if self._hook is None:
+            self._hook = keyboard.hook(self.on_event)
+
+    def stop(self):
+        if self._hook is not None:
+            keyboard.unhook(self._hook)
+            self._hook = None
+        self.mask = 0
+
+    def on_event(self, event):
+        """keyboard.hook callback"""
+        bit = self.bits.get((event.name or '').lower())
+        if bit is None:
+            return
+        with self._lock:
+            if event.event_type == keyboard.KEY_DOWN:
+                if not self.mask & bit:  # Ignore OS auto-repeat
+                    self._edges |= bit
+                self.mask |= bit
+            else:
+                self.mask &= ~bit
+
+    def take_edges(self):
+        """Key-down edges since the last call"""
+        with self._lock:
+            edges, self._edges = self._edges, 0
+        return edges
+
 
 class KeyboardController:
-    def __init__(self, client):
+    AXIS_KEYS = ('w', 's', 'a', 'd', 'up', 'down', 'left', 'right')
+    ACTION_KEYS = ('space', 'r', 'q')
+
+    def __init__(self, client, max_send_hz=50, curves=None):
         self.client = client
         self.running = False
         self.keyboard_thread = None
-        
+
         # Control sensitivity settings
         self.STEP_SIZE = 30
         self.THROTTLE_STEP = 40
         self.YAW_STEP = 20
+        self.TICK = 0.01  # 100Hz update rate
+
+        # Minimum seconds between two triggers of the same action key.
+        # Checked per key, so it never delays any other input.
+        self.DEBOUNCE = {'space': 0.3, 'r': 0.2, 'q': 0.0}
+
+        # Raw stick positions moved by the keys; channels are these after shaping.
+        # curves maps axis index -> AxisCurve (expo, rate, deadband, endpoints).
+        self.sticks = list(client.channels[:4])
+        self.shaper = StickShaper(curves)
+
+        self.keys = KeyStateTracker(self.AXIS_KEYS + self.ACTION_KEYS)
+        # One setChannels per tick at most, only when something changed
+        self.updates = ChannelCoalescer(client, max_send_hz)
+        self._last_action = {key: 0.0 for key in self.ACTION_KEYS}
 
     def start(self):
         """Start keyboard control in a separate thread"""
         if self.keyboard_thread and self.keyboard_thread.is_alive():
             return
-            
+
         self.running = True
+        self.keys.start()
         self.keyboard_thread = threading.Thread(target=self._keyboard_control_loop, daemon=True)
         self.keyboard_thread.start()
 
     def stop(self):
         """Stop keyboard control"""
         self.running = False
-        if self.keyboard_thread:
+        self.keys.stop()
+        if self.keyboard_thread and self.keyboard_thread is not threading.current_thread():
             self.keyboard_thread.join(timeout=1.0)
 
+    def _action_ready(self, key, edges, now):
+        """True if key was pressed since the last tick and is outside its debounce window"""
+        if not edges & self.keys.bits[key]:
+            return False
+        if now - self._last_action[key] < self.DEBOUNCE[key]:
+            return False
+        self._last_action[key] = now
+        return True
+
+    def _tick(self, now):
+        """Apply one control tick from the current key state. Returns False to quit."""
+        bits = self.keys.bits
+        mask = self.keys.mask
+        edges = self.keys.take_edges()
+        client = self.client
+
+        # Step the raw stick positions for every held key, shape them through
+        # the per-axis lookup tables, then send once for the whole tick
+        sticks = self.sticks
+
+        # Throttle control (W/S)
+        if mask & bits['w']:
+            sticks[THROTTLE] = min(client.MAX_VALUE, sticks[THROTTLE] + self.THROTTLE_STEP)
+        if mask & bits['s']:
+            sticks[THROTTLE] = max(client.MIN_VALUE, sticks[THROTTLE] - self.THROTTLE_STEP)
+
+        # Roll control (A/D)
+        if mask & bits['a']:
+            sticks[ROLL] = max(client.MIN_VALUE, sticks[ROLL] - self.STEP_SIZE)
+        if mask & bits['d']:
+            sticks[ROLL] = min(client.MAX_VALUE, sticks[ROLL] + self.STEP_SIZE)
+
+        # Pitch control (Up/Down arrows)
+        if mask & bits['up']:
+            sticks[PITCH] = min(client.MAX_VALUE, sticks[PITCH] + self.STEP_SIZE)
+        if mask & bits['down']:
+            sticks[PITCH] = max(client.MIN_VALUE, sticks[PITCH] - self.STEP_SIZE)
+
+        # Yaw control (Left/Right arrows)
+        if mask & bits['left']:
+            sticks[YAW] = max(client.MIN_VALUE, sticks[YAW] - self.YAW_STEP)
+        if mask & bits['right']:
+            sticks[YAW] = min(client.MAX_VALUE, sticks[YAW] + self.YAW_STEP)
+
+        tables = self.shaper.tables
+        channels = client.channels
+        channels[ROLL] = tables[ROLL][sticks[ROLL]]
+        channels[PITCH] = tables[PITCH][sticks[PITCH]]
+        channels[THROTTLE] = tables[THROTTLE][sticks[THROTTLE]]
+        channels[YAW] = tables[YAW][sticks[YAW]]
+
+        self.updates.flush(now)
+
+        # Special functions
+        if self._action_ready('space', edges, now):
+            # The RPC works on the server's vector, so get any deferred change there first
+            self.updates.flush(now, force=True)
+            if client.armed:
+                client.disarm_drone()
+                # disarmDrone zeroed throttle on the server; don't send the old one back
+                self.sticks[THROTTLE] = client.MIN_VALUE
+                client.channels[THROTTLE] = DISARM_CHANNELS[THROTTLE]
+                self.updates.mark_applied(DISARM_CHANNELS)
+            else:
+                client.arm_drone()
+                self.updates.mark_applied(ARM_CHANNELS)
+        if self._action_ready('r', edges, now):
+            self.updates.flush(now, force=True)
+            client.reset_controls()
+            self.sticks[ROLL] = self.sticks[PITCH] = self.sticks[YAW] = client.MID_VALUE
+            self.updates.mark_applied(RESET_CHANNELS)
+        if self._action_ready('q', edges, now):
+            client.stop()
+            return False
+        return True
+
     def _keyboard_control_loop(self):
         """Handle keyboard input and send commands via client"""
         print("Keyboard control active. Use:")
@@ -40,51 +184,17 @@ class KeyboardController:
         print(" R: Reset controls")
         print(" Q: Quit")
 
+        next_tick = time.monotonic()
         while self.running:
-            # Throttle control (W/S)
-            if keyboard.is_pressed("w"):
-                self.client.channels[2] = min(self.client.MAX_VALUE, self.client.channels[2] + self.THROTTLE_STEP)
-                self.client.send_channels()
-            if keyboard.is_pressed("s"):
-                self.client.channels[2] = max(self.client.MIN_VALUE, self.client.channels[2] - self.THROTTLE_STEP)
-                self.client.send_channels()
-            
-            # Roll control (A/D)
-            if keyboard.is_pressed('a'):
-                self.client.channels[0] = max(self.client.MIN_VALUE, self.client.channels[0] - self.STEP_SIZE)
-                self.client.send_channels()
-            if keyboard.is_pressed('d'):
-                self.client.channels[0] = min(self.client.MAX_VALUE, self.client.channels[0] + self.STEP_SIZE)
-                self.client.send_channels()
-            
-            # Pitch control (Up/Down arrows)
-            if keyboard.is_pressed('up'):
-                self.client.channels[1] = min(self.client.MAX_VALUE, self.client.channels[1] + self.STEP_SIZE)
-                self.client.send_channels()
-            if keyboard.is_pressed('down'):
-                self.client.channels[1] = max(self.client.MIN_VALUE, self.client.channels[1] - self.STEP_SIZE)
-                self.client.send_channels()
-            
-            # Yaw control (Left/Right arrows)
-            if keyboard.is_pressed('left'):
-                self.client.channels[3] = max(self.client.MIN_VALUE, self.client.channels[3] - self.YAW_STEP)
-                self.client.send_channels()
-            if keyboard.is_pressed('right'):
-                self.client.channels[3] = min(self.client.MAX_VALUE, self.client.channels[3] + self.YAW_STEP)
-                self.client.send_channels()
-            
-            # Special functions
-            if keyboard.is_pressed('space'):
-                if self.client.armed:
-                    self.client.disarm_drone()
-                else:
-                    self.client.arm_drone()
-                time.sleep(0.3)  # Debounce
-            if keyboard.is_pressed('r'):
-                self.client.reset_controls()
-                time.sleep(0.2)  # Debounce
-            if keyboard.is_pressed('q'):
-                self.client.stop()
+            now = time.monotonic()
+            if not self._tick(now):
+                self.running = False
+                self.keys.stop()
                 break
-            
-            time.sleep(0.01)  # 100Hz update rate
\ No newline at end of file
+
+            next_tick += self.TICK
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
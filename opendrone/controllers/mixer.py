@@ -0,0 +1,202 @@
+import threading
+import time
+
+from .coalescer import ChannelCoalescer
+
+# Channel names usable in the mixer config
+CHANNEL_NAMES = {'roll': 0, 'pitch': 1, 'throttle': 2, 'yaw': 3}
+CHANNEL_NAMES.update({f'aux{i}': 3 + i for i in range(1, 13)})
+
+STICK_AXES = ('roll', 'pitch', 'throttle', 'yaw')
+SOURCES = ('keyboard', 'gamepad', 'radio', 'programatic')
+
+
+def active_sources(active_controllers):
+    """Names of the sources switched on in config.yml's active_controllers"""
+    return [
+        name for name in SOURCES
+        if active_controllers.get(name) not in (None, False, 'none', 'false', '')
+    ]
+
+
+class MixerSource:
+    """One input's latest channel vector, shaped like a DroneClient.
+
+    Controllers are handed a source instead of the client: they change
+    `channels` and call send_channels() as usual, which hands the vector to
+    the mixer instead of the server. Arm/disarm/reset/stop still go straight
+    to the client.
+    """
+
+    def __init__(self, mixer, name, stale_after=None, takeover_deadband=0):
+        self.mixer = mixer
+        self.name = name
+        self.stale_after = stale_after          # Seconds without an update before it is ignored; None = never
+        self.takeover_deadband = takeover_deadband  # Only claims an axis when moved further than this from rest
+        self.channels = list(mixer.client.channels)
+        self.MAX_VALUE = mixer.client.MAX_VALUE
+        self.MIN_VALUE = mixer.client.MIN_VALUE
+        self.MID_VALUE = mixer.client.MID_VALUE
+
+        # Read by the mixer thread; replaced in one assignment so it never sees half an update
+        self.snapshot = None
+        self.updated = 0.0
+        self.updates = 0
+
+    def update(self, channels, now=None):
+        """Hand a full channel vector to the mixer"""
+        self.snapshot = tuple(channels)
+        self.updated = time.monotonic() if now is None else now
+        self.updates += 1
+
+    def send_channels(self):
+        self.update(self.channels)
+        return True
+
+    def is_fresh(self, now):
+        if self.snapshot is None:
+            return False
+        return self.stale_after is None or now - self.updated <= self.stale_after
+
+    @property
+    def armed(self):
+        return self.mixer.client.armed
+
+    def arm_drone(self):
+        self.mixer.client.arm_drone()
+
+    def disarm_drone(self):
+        self.mixer.client.disarm_drone()
+
+    def reset_controls(self):
+        self.mixer.client.reset_controls()
+        self.channels[0] = self.MID_VALUE  # Roll
+        self.channels[1] = self.MID_VALUE  # Pitch
+        self.channels[3] = self.MID_VALUE  # Yaw
+        self.send_channels()
+
+    def stop(self):
+        self.mixer.stop()
+        self.mixer.client.stop()
+
+
+class InputMixer:
+    """
+    Merges several input sources into the one channel vector sent to the drone.
+
+    Every tick, each mixed channel takes its value from the first source in
+    that channel's priority list that is fresh (updated within its
+    stale_after) and, if it has a takeover_deadband, deflected beyond it from
+    rest (center, or zero for throttle). A channel with no such source falls
+    back to rest, so if every controller drops out the drone gets zero
+    throttle and centered sticks rather than whatever it was last sent.
+    Channels without a priority list are left as the client
+    has them (e.g. Aux1 set by arm_drone). The merged vector goes out through
+    a ChannelCoalescer, so at most one setChannels per tick and only on change.
+    """
+
+    def __init__(self, client, sources, priority, axes=None, stale_after=None, takeover_deadband=None,
+                 tick_hz=100, max_send_hz=50):
+        self.client = client
+        self.tick = 1.0 / tick_hz
+        self.running = False
+        self.mixer_thread = None
+
+        stale_after = stale_after or {}
+        takeover_deadband = takeover_deadband or {}
+        self.sources = {
+            name: MixerSource(self, name, stale_after.get(name), takeover_deadband.get(name) or 0)
+            for name in sources
+        }
+
+        # channel index -> sources in priority order (inactive sources dropped)
+        rules = {name: priority for name in STICK_AXES}
+        rules.update(axes or {})
+        self.rules = []
+        for channel_name, order in rules.items():
+            if channel_name not in CHANNEL_NAMES:
+                raise ValueError(f"Unknown mixer channel '{channel_name}', expected one of {sorted(CHANNEL_NAMES)}")
+            chain = tuple(self.sources[name] for name in order if name in self.sources)
+            if chain:
+                self.rules.append((CHANNEL_NAMES[channel_name], chain))
+
+        self.updates = ChannelCoalescer(client, max_send_hz)
+        self.owner = [None] * len(client.channels)  # Source name driving each channel on the last tick
+        self.stale_ticks = 0  # Ticks where some mixed channel had no usable source and fell back to rest
+
+    @classmethod
+    def from_config(cls, client, config):
+        """Build from the loaded config.yml (active_controllers + mixer sections)"""
+        mixer_config = config['mixer']
+        return cls(
+            client,
+            active_sources(config['active_controllers']),
+            mixer_config['priority'],
+            axes=mixer_config['axes'],
+            stale_after=mixer_config['stale_after_s'],
+            takeover_deadband=mixer_config['takeover_deadband'],
+            tick_hz=mixer_config['tick_hz'],
+            max_send_hz=mixer_config['max_send_hz']
+        )
+
+    def source(self, name):
+        return self.sources[name]
+
+    def mix(self, now):
+        """Merge the sources into client.channels. Returns True if the vector changed."""
+        channels = self.client.channels
+        owner = self.owner
+        changed = False
+        stale = False
+        for index, chain in self.rules:
+            rest = 0 if index == 2 else 1024
+            for source in chain:
+                if not source.is_fresh(now):
+                    continue
+                value = source.snapshot[index]
+                if source.takeover_deadband and abs(value - rest) <= source.takeover_deadband:
+                    continue
+                if channels[index] != value:
+                    channels[index] = value
+                    changed = True
+                owner[index] = source.name
+                break
+            else:
+                # Nobody is driving this channel: failsafe to rest
+                if channels[index] != rest:
+                    channels[index] = rest
+                    changed = True
+                owner[index] = None
+                stale = True
+        if stale:
+            self.stale_ticks += 1
+        return changed
+
+    def _tick(self, now):
+        self.mix(now)
+        self.updates.flush(now)
+
+    def start(self):
+        """Start mixing in a separate thread"""
+        if self.mixer_thread and self.mixer_thread.is_alive():
+            return
+        self.running = True
+        self.mixer_thread = threading.Thread(target=self._mixer_loop, daemon=True)
+        self.mixer_thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.mixer_thread and self.mixer_thread is not threading.current_thread():
+            self.mixer_thread.join(timeout=1.0)
+
+    def _mixer_loop(self):
+        next_tick = time.monotonic()
+        while self.running:
+            self._tick(time.monotonic())
+
+            next_tick += self.tick
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
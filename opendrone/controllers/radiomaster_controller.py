@@ -1,4 +1,7 @@
-import hid
+try:
+    import hid
+except ImportError:  # Only needed to open the real device; tests pass their own
+    hid = None
 import serial
 import threading
 import time
@@ -6,10 +9,157 @@ import struct
 from dataclasses import dataclass
 from typing import Optional, Callable, List
 
+# RadioMaster Pocket in USB joystick mode (EdgeTX, pid.codes VID/PID)
+RADIOMASTER_VID = 0x1209
+RADIOMASTER_PID = 0x4F54
+
+# Input report: report id, 16-bit sequence counter, switch bits, 16 signed channels
+REPORT = struct.Struct('<BHI16h')
+NUM_CHANNELS = 16
+AXIS_SCALE = 1.0 / 32767
+
+
 class ControlState:
     """Normalized control state from RadioMaster Pocket"""
-    channels: List[float]  # 16 channels, -1.0 to 1.0 range
-    switches: int          # Button states bitfield
-    timestamp: float
-    sequence: int
+    __slots__ = ('channels', 'switches', 'timestamp', 'sequence')
+
+    def __init__(self):
+        self.channels: List[float] = [0.0] * NUM_CHANNELS  # 16 channels, -1.0 to 1.0 range
+        self.switches: int = 0       # Button states bitfield
+        self.timestamp: float = 0.0  # time.monotonic() when the report was read
+        self.sequence: int = 0
+
+    def copy(self):
+        state = ControlState()
+        state.channels[:] = self.channels
+        state.switches = self.switches
+        state.timestamp = self.timestamp
+        state.sequence = self.sequence
+        return state
+
+
+class RadioMasterReader:
+    """
+    Reads the RadioMaster's HID reports on a dedicated thread.
+
+    The thread sits in a blocking device read, so each report is handled as
+    soon as it arrives, at the device's own rate (500 Hz+). Reports are
+    unpacked into one ControlState that is reused for every report; on_state
+    is called with it on the reader thread, so a consumer that keeps a state
+    beyond the callback must copy() it. Gaps in the report sequence counter
+    are counted as dropped reports.
+
+    device is anything with read(size, timeout_ms) returning the report as
+    bytes or a list of ints (empty on timeout), like hid.device. If it is not
+    given, open() opens the Pocket by VID/PID.
+    """
+
+    READ_TIMEOUT_MS = 100  # Upper bound on how long stop() waits for the read to return
+
+    def __init__(self, device=None, on_state: Optional[Callable[[ControlState], None]] = None,
+                 vendor_id=RADIOMASTER_VID, product_id=RADIOMASTER_PID):
+        self.device = device
+        self.on_state = on_state
+        self.vendor_id = vendor_id
+        self.product_id = product_id
+        self.state = ControlState()
+        self.running = False
+        self.reader_thread = None
+
+        # Counters
+        self.reports = 0
+        self.dropped = 0       # Reports missing from the sequence
+        self.bad_reports = 0   # Short reads
+        self.read_errors = 0
+        self._last_sequence = None
+
+    def open(self):
+        """Open the HID device if one was not passed in"""
+        if self.device is not None:
+            return True
+        if hid is None:
+            print("hid module not installed (pip install hidapi)")
+            return False
+        try:
+            device = hid.device()
+            device.open(self.vendor_id, self.product_id)
+            device.set_nonblocking(0)
+        except (IOError, OSError) as e:
+            print(f"Failed to open RadioMaster {self.vendor_id:04x}:{self.product_id:04x}: {e}")
+            return False
+        self.device = device
+        print(f"Opened RadioMaster {self.vendor_id:04x}:{self.product_id:04x}")
+        return True
+
+    def start(self):
+        """Start reading reports in a separate thread"""
+        if self.reader_thread and self.reader_thread.is_alive():
+            return True
+        if not self.open():
+            return False
+        self.running = True
+        self.reader_thread = threading.Thread(target=self._read_loop, daemon=True)
+        self.reader_thread.start()
+        return True
+
+    def stop(self):
+        """Stop the reader thread and close the device"""
+        self.running = False
+        if self.reader_thread and self.reader_thread is not threading.current_thread():
+            self.reader_thread.join(timeout=1.0)
+        if self.device is not None and hasattr(self.device, 'close'):
+            self.device.close()
+
+    def handle_report(self, report, now):
+        """Unpack one report into self.state. Returns False if it was too short."""
+        if len(report) < REPORT.size:
+            self.bad_reports += 1
+            return False
+        values = REPORT.unpack_from(report)
+        sequence = values[1]
+
+        last = self._last_sequence
+        if last is not None:
+            gap = (sequence - last) & 0xFFFF
+            if gap > 1:
+                self.dropped += gap - 1
+        self._last_sequence = sequence
+
+        state = self.state
+        channels = state.channels
+        for i in range(NUM_CHANNELS):
+            channels[i] = values[3 + i] * AXIS_SCALE
+        state.switches = values[2]
+        state.sequence = sequence
+        state.timestamp = now
+        self.reports += 1
+        return True
+
+    def _read_loop(self):
+        read = self.device.read
+        size = REPORT.size
+        timeout = self.READ_TIMEOUT_MS
+        monotonic = time.monotonic
+        while self.running:
+            try:
+                data = read(size, timeout)
+            except (IOError, OSError) as e:
+                self.read_errors += 1
+                print(f"RadioMaster read error: {e}")
+                time.sleep(0.1)
+                continue
+            if not data:
+                continue  # Timed out; check running and read again
+            if not isinstance(data, (bytes, bytearray)):
+                data = bytes(data)
+            if self.handle_report(data, monotonic()) and self.on_state is not None:
+                self.on_state(self.state)
 
+    def stats(self):
+        return {
+            'reports': self.reports,
+            'dropped': self.dropped,
+            'bad_reports': self.bad_reports,
+            'read_errors': self.read_errors,
+            'sequence': self.state.sequence,
+        }
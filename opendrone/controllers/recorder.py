@@ -0,0 +1,84 @@
+import os
+import struct
+import threading
+
+# One fixed-size index record per frame: frame id, wall-clock timestamp, offset and length in the .mjpeg file.
+# Record n sits at n * INDEX_RECORD.size, so any frame is located without scanning.
+INDEX_RECORD = struct.Struct('<QdQI')
+INDEX_SUFFIX = '.idx'
+
+
+def index_path(path):
+    return path + INDEX_SUFFIX
+
+
+class MjpegRecorder:
+    """
+    Records the video stream as raw JPEG bytes, exactly as they came off the
+    serial link: no decode, no re-encode. The .mjpeg file is the JPEGs back
+    to back (playable by ffplay/VLC as MJPEG); path + '.idx' holds an
+    INDEX_RECORD per frame. Writes are buffered, so recording costs a memcpy
+    per frame on the reader thread.
+    """
+
+    def __init__(self, path, buffer_size=1024 * 1024):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = open(path, 'wb', buffering=buffer_size)
+        self._index = open(index_path(path), 'wb', buffering=64 * 1024)
+        self.offset = 0
+        self.frames = 0
+        self.bytes = 0
+
+    def write(self, frame_id, jpeg_data, timestamp):
+        """Append one JPEG and its index record"""
+        length = len(jpeg_data)
+        with self._lock:
+            if self._data is None:
+                return
+            self._data.write(jpeg_data)
+            self._index.write(INDEX_RECORD.pack(frame_id, timestamp, self.offset, length))
+            self.offset += length
+            self.frames += 1
+            self.bytes += length
+
+    def flush(self):
+        with self._lock:
+            if self._data is not None:
+                self._data.flush()
+                self._index.flush()
+
+    def close(self):
+        with self._lock:
+            if self._data is None:
+                return
+            # Data first, so every index record points at bytes that are on disk
+            self._data.close()
+            self._index.close()
+            self._data = None
+            self._index = None
+
+
+def read_index(path):
+    """All index records of a recording as a list of (frame_id, timestamp, offset, length)"""
+    with open(index_path(path), 'rb') as f:
+        data = f.read()
+    usable = len(data) - len(data) % INDEX_RECORD.size  # Ignore a torn last record
+    return list(INDEX_RECORD.iter_unpack(data[:usable]))
+
+
+def read_frame(path, n):
+    """JPEG bytes of the n-th recorded frame, found through the index in O(1)"""
+    with open(index_path(path), 'rb') as f:
+        f.seek(n * INDEX_RECORD.size)
+        record = f.read(INDEX_RECORD.size)
+    if len(record) < INDEX_RECORD.size:
+        raise IndexError(f"{path} has no frame {n}")
+    _, _, offset, length = INDEX_RECORD.unpack(record)
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def frame_count(path):
+    return os.path.getsize(index_path(path)) // INDEX_RECORD.size
@@ -0,0 +1,124 @@
+import mmap
+import threading
+import time
+
+from .recorder import INDEX_RECORD, index_path
+from .view import VideoStreamOpenCV
+
+
+class ReplayVideoStream(VideoStreamOpenCV):
+    """
+    Plays back an MjpegRecorder recording through the normal video pipeline.
+
+    The .mjpeg file and its index are memory-mapped, and each JPEG is handed
+    to the decoder as a zero-copy slice of the map. Subscribers, read_frame(),
+    the frame ring and video_stats() work as for a live stream, and frames
+    keep their recorded ids.
+
+    realtime=True paces frames by their recorded timestamps (scaled by speed)
+    and decodes on the DecodeWorker, so slow consumers see drops as in flight.
+    realtime=False decodes every selected frame on the playback thread, as
+    fast as possible, with no drops: subscribers see every frame and playback
+    waits for them, so an algorithm run as a subscriber sets the pace.
+    every_nth=N only decodes every Nth recorded frame.
+    """
+
+    def __init__(self, path, realtime=True, speed=1.0, every_nth=1, loop=False, headless=True, **kwargs):
+        super().__init__(serial_port=path, headless=headless, **kwargs)
+        self.path = path
+        self.realtime = realtime
+        self.speed = speed
+        self.every_nth = max(1, every_nth)
+        self.loop = loop
+        self.finished = threading.Event()  # Set when playback reaches the end
+        self.frame_count = 0
+        self.replayed = 0
+        self._id_offset = 0
+        self._data_file = self._index_file = None
+        self._data = self._index = None
+
+    def connect(self):
+        """Memory-map the recording and its index"""
+        try:
+            self._data_file = open(self.path, 'rb')
+            self._index_file = open(index_path(self.path), 'rb')
+            self._data = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            # mmap raises ValueError for an empty file
+            print(f"Failed to open recording {self.path}: {e}")
+            self.disconnect()
+            return False
+        self.frame_count = len(self._index) // INDEX_RECORD.size
+        print(f"Replaying {self.path}: {self.frame_count} frames")
+        return True
+
+    def disconnect(self):
+        for name in ('_data', '_index', '_data_file', '_index_file'):
+            handle = getattr(self, name)
+            if handle is not None:
+                try:
+                    handle.close()
+                except BufferError:
+                    pass  # A consumer still holds a slice; the map goes when it does
+                setattr(self, name, None)
+
+    def record(self, n):
+        """(frame_id, timestamp, offset, length) of the n-th recorded frame"""
+        return INDEX_RECORD.unpack_from(self._index, n * INDEX_RECORD.size)
+
+    def jpeg(self, n):
+        """The n-th recorded JPEG as a zero-copy view of the map"""
+        _, _, offset, length = self.record(n)
+        return memoryview(self._data)[offset:offset + length]
+
+    def start_stream(self):
+        """Start playback in a separate thread"""
+        if self._data is None:
+            print("Recording not opened")
+            return False
+        if self.stream_thread and self.stream_thread.is_alive():
+            return True
+        self.running = True
+        self.finished.clear()
+        if self.realtime:
+            self.decoder.start()
+        if self.display:
+            self.display.start()
+        self.stream_thread = threading.Thread(target=self._stream_loop, daemon=True)
+        self.stream_thread.start()
+        return True
+
+    def _stream_loop(self):
+        """Feed recorded frames into the pipeline"""
+        while self.running:
+            first_timestamp = None
+            started = time.monotonic()
+            last_id = 0
+            for n in range(0, self.frame_count, self.every_nth):
+                if not self.running:
+                    break
+                frame_id, timestamp, offset, length = self.record(n)
+                jpeg_data = memoryview(self._data)[offset:offset + length]
+                # Ids keep increasing across laps and restarts, as read_frame() and the decoder expect
+                last_id = frame_id + self._id_offset
+
+                if self.realtime:
+                    # Sleep until this frame's recorded time, relative to the first
+                    if first_timestamp is None:
+                        first_timestamp = timestamp
+                    delay = started + (timestamp - first_timestamp) / self.speed - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                # The whole frame is at hand at once: first byte and end marker share a stamp
+                now = time.monotonic_ns()
+                if self.realtime:
+                    self.decoder.submit(jpeg_data, last_id, now, now)
+                else:
+                    self.decoder.decode_now(jpeg_data, last_id, now, now)
+                self.replayed += 1
+
+            self._id_offset = max(self._id_offset, last_id)
+            if not self.loop:
+                break
+        self.finished.set()
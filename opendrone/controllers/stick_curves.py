@@ -0,0 +1,72 @@
+from array import array
+from dataclasses import dataclass
+
+TABLE_SIZE = 2048  # One entry per 11-bit CRSF channel value
+CENTER = 1024
+
+ROLL, PITCH, THROTTLE, YAW = 0, 1, 2, 3
+
+
+@dataclass(frozen=True)
+class AxisCurve:
+    """Stick shaping for one axis. The defaults are a straight line (no shaping)."""
+    expo: float = 0.0     # 0 = linear, 1 = fully cubic; softens the response near center
+    rate: float = 1.0     # Output scale at full deflection
+    deadband: int = 0     # Raw ticks around center (or above zero for throttle) treated as zero
+    min_out: int = 0      # Endpoint limits on the output
+    max_out: int = 2047
+    centered: bool = True  # False for throttle: shape 0..2047 instead of around 1024
+
+
+def build_table(curve):
+    """Precompute the shaped output for every raw value 0..2047"""
+    table = array('H', bytes(2 * TABLE_SIZE))
+    for raw in range(TABLE_SIZE):
+        if curve.centered:
+            offset = raw - CENTER
+            span = (TABLE_SIZE - 1 - CENTER) if offset > 0 else CENTER
+            magnitude = abs(offset)
+        else:
+            span = TABLE_SIZE - 1
+            magnitude = raw
+
+        # Deadband, then rescale what is left back to the full 0..1 range
+        if magnitude <= curve.deadband:
+            x = 0.0
+        else:
+            x = (magnitude - curve.deadband) / (span - curve.deadband)
+
+        x = ((1.0 - curve.expo) * x + curve.expo * x ** 3) * curve.rate
+
+        if curve.centered:
+            out = CENTER + x * span if offset > 0 else CENTER - x * span
+        else:
+            out = x * span
+        table[raw] = max(curve.min_out, min(curve.max_out, int(round(out))))
+    return table
+
+
+class StickShaper:
+    """Per-axis lookup tables; shaping a sample is one index operation.
+
+    Tables are rebuilt only when an axis' curve actually changes.
+    """
+
+    def __init__(self, curves=None):
+        self.curves = {}
+        self.tables = {}
+        for axis in (ROLL, PITCH, THROTTLE, YAW):
+            self.configure(axis, AxisCurve(centered=(axis != THROTTLE)))
+        for axis, curve in (curves or {}).items():
+            self.configure(axis, curve)
+
+    def configure(self, axis, curve):
+        """Set an axis' curve; returns True if its table had to be rebuilt"""
+        if self.curves.get(axis) == curve:
+            return False
+        self.curves[axis] = curve
+        self.tables[axis] = build_table(curve)
+        return True
+
+    def shape(self, axis, raw):
+        return self.tables[axis][raw]
@@ -4,20 +4,161 @@ import time
 import serial
 import numpy as np
 
+from latency import VideoLatency
+from tracing import tracer
+from .decode_worker import DecodeWorker, LatestFrameSlot
+from .frame_ring import FrameRing, FrameTimes
+from .decoder_backends import make_decoder
+from .jpeg_extractor import JpegFrameExtractor
+from .recorder import MjpegRecorder
+
+
+class DisplaySink:
+    """
+    Shows frames from a video pipeline in a HighGUI window on its own thread.
+
+    Subscribe it to a pipeline with pipeline.subscribe(sink.show). Frames go
+    through a LatestFrameSlot, so a slow window skips frames instead of
+    slowing the pipeline, and all HighGUI calls stay on the display thread.
+    Keys: 'q' calls on_quit, 's' saves the frame on screen. on_shown(frame_id)
+    is called on the display thread after each frame is drawn.
+    """
+
+    def __init__(self, window_name="Drone Video Feed", on_quit=None, on_shown=None):
+        self.window_name = window_name
+        self.on_quit = on_quit
+        self.on_shown = on_shown
+        self.slot = LatestFrameSlot()
+        self.running = False
+        self.display_thread = None
+        self.shown = 0
+
+    def show(self, frame_id, frame):
+        """Pipeline subscriber callback; never blocks"""
+        self.slot.put((frame_id, frame))
+
+    def start(self):
+        if self.display_thread and self.display_thread.is_alive():
+            return
+        self.running = True
+        self.slot.reopen()
+        self.display_thread = threading.Thread(target=self._display_loop, daemon=True)
+        self.display_thread.start()
+
+    def stop(self):
+        self.running = False
+        self.slot.close()
+        if self.display_thread and self.display_thread is not threading.current_thread():
+            self.display_thread.join(timeout=2.0)
+
+    def _display_loop(self):
+        cv2.namedWindow(self.window_name, cv2.WINDOW_AUTOSIZE)
+        frame = None
+
+        while self.running:
+            item = self.slot.get(timeout=0.01)
+            if item is not None:
+                frame_id, frame = item
+                cv2.imshow(self.window_name, frame)
+                self.shown += 1
+                if self.on_shown:
+                    self.on_shown(frame_id)
+
+            # Handle window events
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                self.running = False
+                if self.on_quit:
+                    self.on_quit()
+                break
+            elif key == ord('s'):
+                # Save current frame
+                if frame is not None:
+                    timestamp = int(time.time())
+                    filename = f"drone_frame_{timestamp}.jpg"
+                    cv2.imwrite(filename, frame)
+                    print(f"Frame saved as {filename}")
+
+        cv2.destroyWindow(self.window_name)
+
 
 class VideoStreamOpenCV:
-    def __init__(self, serial_port='/dev/ttyUSB1', baud_rate=115200, buffer_size=4096):
+    def __init__(self, serial_port='/dev/ttyUSB1', baud_rate=115200, buffer_size=4096, max_frame_bytes=512 * 1024,
+                 decode_workers=1, headless=False, ring_slots=8, frame_width=640, frame_height=480, grayscale=False,
+                 decoder='opencv'):
         self.serial_port = serial_port
         self.baud_rate = baud_rate
         self.buffer_size = buffer_size
+        # Splits the serial byte stream into complete JPEGs
+        self.extractor = JpegFrameExtractor(max_frame_bytes)
+        # Decodes off the reader thread; only the newest frame is kept if it falls behind
+        self.decoder = DecodeWorker(self._decode_frame, self._deliver, decode_workers)
+        self.latest = None  # FrameRef of the newest delivered frame
+        self.latency = VideoLatency()  # Per-stage frame latency from each frame's FrameTimes
+        self.recorder = None  # MjpegRecorder while recording
         self.running = False
         self.serial_connection = None
         self.stream_thread = None
         
-        # Video processing settings
-        self.frame_width = 640
-        self.frame_height = 480
+        # Video processing settings: the size and colour the consumer wants.
+        # The JPEG decode is reduced to match (see jpeg_decode.py) instead of decoding in full and resizing.
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.grayscale = grayscale
         self.window_name = "Drone Video Feed"
+        # JPEG -> image: 'opencv' in-process, or 'ffmpeg' through a subprocess pipe (decoder_backends.py)
+        self.backend = make_decoder(decoder, frame_width, frame_height, grayscale)
+
+        # Frames are decoded into preallocated slots; consumers get read-only views
+        self.ring = FrameRing(self.frame_height, self.frame_width, 1 if grayscale else 3, ring_slots)
+
+        # Decoded frames go to subscribers; the window is just one of them.
+        # Headless, nothing touches HighGUI (companion computer, CI).
+        self.subscribers = []
+        self.headless = headless
+        self.display = None if headless else DisplaySink(self.window_name, on_quit=self.stop, on_shown=self._shown)
+        if self.display:
+            self.subscribe(self.display.show)
+
+    def subscribe(self, callback):
+        """Call callback(frame_id, frame) for every delivered frame.
+
+        Runs on the pipeline's thread, so it should hand the frame off rather
+        than process it inline. frame is a read-only view of a ring slot that
+        is reused ring_slots frames later; copy it to keep it longer.
+        """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def _deliver(self, frame_id, slot, times=None):
+        """Commit a written ring slot and publish it to the subscribers"""
+        delivered = time.monotonic_ns()
+        times = times._replace(delivered=delivered) if times else FrameTimes(0, 0, 0, delivered)
+        ref = self.ring.commit(slot, frame_id, delivered / 1e9, times)
+        self.latest = ref
+        self.latency.record_frame(times)
+        for callback in self.subscribers:
+            callback(frame_id, ref.image)
+
+    def _shown(self, frame_id):
+        ref = self.ring.find(frame_id)
+        if ref is not None:
+            self.latency.record_age('age_at_display', ref.times, time.monotonic_ns())
+
+    @property
+    def latest_frame(self):
+        return self.latest.image if self.latest else None
+
+    def read_frame(self, after_id=0):
+        """Newest FrameRef (frame_id, timestamp, slot, image, times) if newer than after_id, else None"""
+        ref = self.latest
+        if ref is None or ref.frame_id <= after_id:
+            return None
+        self.latency.record_age('age_at_read', ref.times, time.monotonic_ns())
+        return ref
         
     def connect(self):
         """Establish serial connection for video data"""
@@ -53,6 +194,9 @@ class VideoStreamOpenCV:
             return True
             
         self.running = True
+        self.decoder.start()
+        if self.display:
+            self.display.start()
         self.stream_thread = threading.Thread(target=self._stream_loop, daemon=True)
         self.stream_thread.start()
         
@@ -62,47 +206,36 @@ class VideoStreamOpenCV:
     def stop_stream(self):
         """Stop video streaming"""
         self.running = False
-        if self.stream_thread:
+        if self.stream_thread and self.stream_thread is not threading.current_thread():
             self.stream_thread.join(timeout=2.0)
-        
-        cv2.destroyAllWindows()
+        self.decoder.stop()
+        self.backend.close()
+        if self.display:
+            self.display.stop()
+        self.stop_recording()
         print("Video stream stopped")
         
     def _stream_loop(self):
-        """Main video streaming loop"""
-        cv2.namedWindow(self.window_name, cv2.WINDOW_AUTOSIZE)
-        
-        # Buffer for accumulating video data
-        video_buffer = bytearray()
+        """Main video streaming loop: read serial data and hand complete JPEGs to the decoder"""
+        self.extractor.reset()
         
         while self.running:
             try:
-                # Read data from serial port
-                if self.serial_connection.in_waiting > 0:
-                    data = self.serial_connection.read(self.buffer_size)
-                    video_buffer.extend(data)
+                # Block for at least one byte (up to the port timeout), then take whatever else is waiting
+                waiting = self.serial_connection.in_waiting
+                data = self.serial_connection.read(min(waiting, self.buffer_size) or 1)
+                received = time.monotonic_ns()
+                # Bytes already queued were received about their transfer time ago (10 bits a byte)
+                self.latency.record_backlog(waiting * 10_000_000_000 // self.baud_rate, received)
                     
-                    # Try to decode frame from buffer
-                    frame = self._decode_frame(video_buffer)
-                    if frame is not None:
-                        # Display frame
-                        cv2.imshow(self.window_name, frame)
-                        
-                        # Clear processed data from buffer
-                        video_buffer.clear()
-                        
-                # Handle window events
-                key = cv2.waitKey(1) & 0xFF
-                if key == ord('q'):
-                    self.stop()
-                    break
-                elif key == ord('s'):
-                    # Save current frame
-                    if 'frame' in locals():
-                        timestamp = int(time.time())
-                        filename = f"drone_frame_{timestamp}.jpg"
-                        cv2.imwrite(filename, frame)
-                        print(f"Frame saved as {filename}")
+                # Hand every completed JPEG to the decoder without waiting for it
+                frames = self.extractor.feed(data, received)
+                found = time.monotonic_ns()
+                for jpeg_data, first_byte in zip(frames, self.extractor.start_times):
+                    frame_id = self.decoder.submit(jpeg_data, first_byte_ns=first_byte, end_marker_ns=found)
+                    recorder = self.recorder
+                    if recorder is not None:
+                        recorder.write(frame_id, jpeg_data, time.time())
                         
             except serial.SerialException as e:
                 print(f"Serial error: {e}")
@@ -110,38 +243,51 @@ class VideoStreamOpenCV:
             except Exception as e:
                 print(f"Stream error: {e}")
                 time.sleep(0.1)
-                
-        cv2.destroyAllWindows()
         
-    def _decode_frame(self, buffer):
-        """Decode video frame from buffer data"""
+    def _decode_frame(self, jpeg_data):
+        """Decode one complete JPEG (from the extractor) into the next ring slot; returns the slot"""
         try:
-            # Look for JPEG markers (0xFFD8 start, 0xFFD9 end)
-            start_marker = b'\xff\xd8'
-            end_marker = b'\xff\xd9'
-            
-            start_idx = buffer.find(start_marker)
-            end_idx = buffer.find(end_marker)
+            with tracer.span('video.decode'):
+                frame = self.backend.decode(jpeg_data)
             
-            if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-                # Extract JPEG data
-                jpeg_data = buffer[start_idx:end_idx + 2]
+            if frame is not None:
+                slot, target = self.ring.acquire()
+                # Resize straight into the slot if needed, otherwise copy
+                if frame.shape[:2] != (self.frame_height, self.frame_width):
+                    cv2.resize(frame, (self.frame_width, self.frame_height), dst=target)
+                else:
+                    np.copyto(target, frame)
                 
-                # Decode JPEG
-                nparr = np.frombuffer(jpeg_data, np.uint8)
-                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+                return slot
                 
-                if frame is not None:
-                    # Resize if needed
-                    if frame.shape[:2] != (self.frame_height, self.frame_width):
-                        frame = cv2.resize(frame, (self.frame_width, self.frame_height))
-                    
-                    return frame
-                    
         except Exception as e:
             print(f"Frame decode error: {e}")
             
         return None
+
+    def start_recording(self, path):
+        """Append every received JPEG, undecoded, to path with a seek index at path + '.idx'"""
+        self.stop_recording()
+        self.recorder = MjpegRecorder(path)
+        print(f"Recording video to {path}")
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+            print(f"Recorded {recorder.frames} frames ({recorder.bytes} bytes) to {recorder.path}")
+
+    def video_stats(self):
+        """Frame counters: received/decoded/dropped, decode time, extractor losses, and rolling stage latencies"""
+        stats = self.decoder.stats()
+        stats['backend'] = self.backend.name
+        stats['oversized'] = self.extractor.oversized
+        stats['discarded_bytes'] = self.extractor.discarded_bytes
+        stats['latency'] = {
+            stage: {'count': count, 'p50_ms': p50 / 1e6, 'p99_ms': p99 / 1e6, 'max_ms': max_ns / 1e6}
+            for stage, (count, p50, p99, _, max_ns) in self.latency.summary().items()
+        }
+        return stats
         
     def start(self):
         """Start the video stream controller"""
@@ -158,12 +304,17 @@ class VideoStreamOpenCV:
         self.disconnect()
         
 
+# Name used by controllers/__init__.py and the README
+VideoStreamController = VideoStreamOpenCV
+
+
 class MockVideoStreamController(VideoStreamController):
     """Mock controller for testing without hardware"""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, headless=False, fps=30):
+        super().__init__(headless=headless)
         self.frame_counter = 0
+        self.fps = fps
         
     def connect(self):
         """Mock connection - always succeeds"""
@@ -174,13 +325,26 @@ class MockVideoStreamController(VideoStreamController):
         """Mock disconnection"""
         print("Mock video stream disconnected")
         
+    def start_stream(self):
+        """Start generating frames in a separate thread"""
+        if self.stream_thread and self.stream_thread.is_alive():
+            return True
+        self.running = True
+        if self.display:
+            self.display.start()
+        self.stream_thread = threading.Thread(target=self._stream_loop, daemon=True)
+        self.stream_thread.start()
+        return True
+
     def _stream_loop(self):
-        """Generate test pattern frames"""
-        cv2.namedWindow(self.window_name, cv2.WINDOW_AUTOSIZE)
+        """Generate test pattern frames at self.fps"""
+        period = 1.0 / self.fps
+        next_frame = time.monotonic()
         
         while self.running:
-            # Generate test pattern
-            frame = np.zeros((self.frame_height, self.frame_width, 3), dtype=np.uint8)
+            # Generate test pattern straight into the next ring slot
+            slot, frame = self.ring.acquire()
+            frame[:] = 0
             
             # Add moving pattern
             offset = (self.frame_counter * 2) % self.frame_width
@@ -188,12 +352,12 @@ class MockVideoStreamController(VideoStreamController):
             cv2.putText(frame, f"Frame: {self.frame_counter}", (10, 30), 
                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
             
-            cv2.imshow(self.window_name, frame)
-            
-            key = cv2.waitKey(33) & 0xFF  # ~30 FPS
-            if key == ord('q'):
-                break
-                
             self.frame_counter += 1
+            self._deliver(self.frame_counter, slot)
             
-        cv2.destroyAllWindows()
\ No newline at end of file
+            next_frame += period
+            delay = next_frame - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.monotonic()
@@ -19,6 +19,8 @@ from crsf_parser.payloads import (
     PacketsTypes
 )
 
+from tracing import tracer
+
 class CrsfSerial:
     def __init__(self, port: str, baud: int = 420000, timeout: float = 0.02):
         """
@@ -57,14 +59,19 @@ class CrsfSerial:
         Each yielded frame is a tuple: (device_addr, type, payload_bytes).
         """
         t_start = time.time()
+        t0 = 0  # Span start: the first byte read after the previous frame
         while time.time() - t_start < timeout_s:
             # Read one byte, or as many as available
             b = self.ser.read(1)
             if not b:
                 continue
+            if not t0:
+                t0 = tracer.begin()
             # Note: handling.py’s CRSFParser expects int (0-255) input
             frame = self.parser.update(b[0])
             if frame is not None:
+                tracer.end('telemetry.frame', t0)
+                t0 = 0
                 # frame has attributes device_addr, type, payload
                 yield (frame.device_addr, frame.type, frame.payload)
 
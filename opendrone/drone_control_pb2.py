@@ -25,7 +25,7 @@ _sym_db = _symbol_database.Default()
 from google.protobuf import empty_pb2 as google_dot_protobuf_dot_empty__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13\x64rone_control.proto\x12\x0c\x64ronecontrol\x1a\x1bgoogle/protobuf/empty.proto\"/\n\x0cStartLinkReq\x12\x0c\n\x04port\x18\x01 \x01(\t\x12\x11\n\tbaud_rate\x18\x02 \x01(\x05\"1\n\rStartLinkResp\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\"\n\x0eSetChannelsReq\x12\x10\n\x08\x63hannels\x18\x01 \x03(\x05\"S\n\nStatusResp\x12\r\n\x05\x61rmed\x18\x01 \x01(\x08\x12\x11\n\tconnected\x18\x02 \x01(\x08\x12\x10\n\x08\x63hannels\x18\x03 \x03(\x05\x12\x11\n\ttimestamp\x18\x04 \x01(\x03\x32\xd0\x03\n\x0c\x44roneControl\x12\x44\n\tstartLink\x12\x1a.dronecontrol.StartLinkReq\x1a\x1b.dronecontrol.StartLinkResp\x12:\n\x08stopLink\x12\x16.google.protobuf.Empty\x1a\x16.google.protobuf.Empty\x12\x43\n\x0bsetChannels\x12\x1c.dronecontrol.SetChannelsReq\x1a\x16.google.protobuf.Empty\x12:\n\x08\x61rmDrone\x12\x16.google.protobuf.Empty\x1a\x16.google.protobuf.Empty\x12=\n\x0b\x64isarmDrone\x12\x16.google.protobuf.Empty\x1a\x16.google.protobuf.Empty\x12?\n\rresetControls\x12\x16.google.protobuf.Empty\x1a\x16.google.protobuf.Empty\x12=\n\tgetStatus\x12\x16.google.protobuf.Empty\x1a\x18.dronecontrol.StatusRespb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13\x64rone_control.proto\x12\x0c\x64ronecontrol\x1a\x1bgoogle/protobuf/empty.proto\"/\n\x0cStartLinkReq\x12\x0c\n\x04port\x18\x01 \x01(\t\x12\x11\n\tbaud_rate\x18\x02 \x01(\x05\"1\n\rStartLinkResp\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"M\n\x0eSetChannelsReq\x12\x10\n\x08\x63hannels\x18\x01 \x03(\x05\x12\x11\n\tupdate_id\x18\x02 \x01(\x04\x12\x16\n\x0e\x63lient_send_ns\x18\x03 \x01(\x03\"S\n\nStatusResp\x12\r\n\x05\x61rmed\x18\x01 \x01(\x08\x12\x11\n\tconnected\x18\x02 \x01(\x08\x12\x10\n\x08\x63hannels\x18\x03 \x03(\x05\x12\x11\n\ttimestamp\x18\x04 \x01(\x03\"$\n\nMetricsReq\x12\x16\n\x0erecent_updates\x18\x01 \x01(\r\"m\n\x0cLatencyStats\x12\r\n\x05stage\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x04\x12\x0e\n\x06p50_us\x18\x03 \x01(\x01\x12\x0e\n\x06p99_us\x18\x04 \x01(\x01\x12\x0f\n\x07p999_us\x18\x05 \x01(\x01\x12\x0e\n\x06max_us\x18\x06 \x01(\x01\"\x88\x01\n\x0bUpdateTrace\x12\x11\n\tupdate_id\x18\x01 \x01(\x04\x12\x16\n\x0e\x63lient_send_ns\x18\x02 \x01(\x03\x12\x19\n\x11server_receive_ns\x18\x03 \x01(\x03\x12\x18\n\x10\x66rame_encoded_ns\x18\x04 \x01(\x03\x12\x19\n\x11serial_written_ns\x18\x05 \x01(\x03\"z\n\x0bMetricsResp\x12-\n\tlatencies\x18\x01 \x03(\x0b\x32\x1a.dronecontrol.LatencyStats\x12)\n\x06recent\x18\x02 \x03(\x0b\x32\x19.dronecontrol.UpdateTrace\x12\x11\n\ttimestamp\x18\x03 \x01(\x03\x32\x93\x04\n\x0c\x44roneControl\x12\x44\n\tstartLink\x12\x1a.dronecontrol.StartLinkReq\x1a\x1b.dronecontrol.StartLinkResp\x12:\n\x08stopLink\x12\x16.google.protobuf.Empty\x1a\x16.google.protobuf.Empty\x12\x43\n\x0bsetChannels\x12\x1c.dronecontrol.SetChannelsReq\x1a\x16.google.protobuf.Empty\x12:\n\x08\x61rmDrone\x12\x16.google.protobuf.Empty\x1a\x16.google.protobuf.Empty\x12=\n\x0b\x64isarmDrone\x12\x16.google.protobuf.Empty\x1a\x16.google.protobuf.Empty\x12?\n\rresetControls\x12\x16.google.protobuf.Empty\x1a\x16.google.protobuf.Empty\x12=\n\tgetStatus\x12\x16.google.protobuf.Empty\x1a\x18.dronecontrol.StatusResp\x12\x41\n\ngetMetrics\x12\x18.dronecontrol.MetricsReq\x1a\x19.dronecontrol.MetricsRespb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -37,9 +37,17 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_STARTLINKRESP']._serialized_start=115
   _globals['_STARTLINKRESP']._serialized_end=164
   _globals['_SETCHANNELSREQ']._serialized_start=166
-  _globals['_SETCHANNELSREQ']._serialized_end=200
-  _globals['_STATUSRESP']._serialized_start=202
-  _globals['_STATUSRESP']._serialized_end=285
-  _globals['_DRONECONTROL']._serialized_start=288
-  _globals['_DRONECONTROL']._serialized_end=752
+  _globals['_SETCHANNELSREQ']._serialized_end=243
+  _globals['_STATUSRESP']._serialized_start=245
+  _globals['_STATUSRESP']._serialized_end=328
+  _globals['_METRICSREQ']._serialized_start=330
+  _globals['_METRICSREQ']._serialized_end=366
+  _globals['_LATENCYSTATS']._serialized_start=368
+  _globals['_LATENCYSTATS']._serialized_end=477
+  _globals['_UPDATETRACE']._serialized_start=480
+  _globals['_UPDATETRACE']._serialized_end=616
+  _globals['_METRICSRESP']._serialized_start=618
+  _globals['_METRICSRESP']._serialized_end=740
+  _globals['_DRONECONTROL']._serialized_start=743
+  _globals['_DRONECONTROL']._serialized_end=1274
 # @@protoc_insertion_point(module_scope)
@@ -70,6 +70,11 @@ class DroneControlStub(object):
                 request_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
                 response_deserializer=drone__control__pb2.StatusResp.FromString,
                 _registered_method=True)
+        self.getMetrics = channel.unary_unary(
+                '/dronecontrol.DroneControl/getMetrics',
+                request_serializer=drone__control__pb2.MetricsReq.SerializeToString,
+                response_deserializer=drone__control__pb2.MetricsResp.FromString,
+                _registered_method=True)
 
 
 class DroneControlServicer(object):
@@ -117,6 +122,12 @@ class DroneControlServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def getMetrics(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_DroneControlServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -155,6 +166,11 @@ def add_DroneControlServicer_to_server(servicer, server):
                     request_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
                     response_serializer=drone__control__pb2.StatusResp.SerializeToString,
             ),
+            'getMetrics': grpc.unary_unary_rpc_method_handler(
+                    servicer.getMetrics,
+                    request_deserializer=drone__control__pb2.MetricsReq.FromString,
+                    response_serializer=drone__control__pb2.MetricsResp.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'dronecontrol.DroneControl', rpc_method_handlers)
@@ -354,3 +370,30 @@ class DroneControl(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def getMetrics(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/dronecontrol.DroneControl/getMetrics',
+            drone__control__pb2.MetricsReq.SerializeToString,
+            drone__control__pb2.MetricsResp.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
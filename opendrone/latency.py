@@ -0,0 +1,222 @@
+"""
+HDR-style latency histograms for the control path and the video pipeline.
+
+Values are recorded in nanoseconds into log-linear buckets: every power of two
+is split into 64 linear sub-buckets, so any recorded value is reported with at
+most ~1.6% error, from 1 ns up to ~18 minutes, in a fixed 2240-slot array.
+Recording is a couple of integer ops and one list increment; no allocation.
+"""
+
+import threading
+import time
+from collections import deque
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_HALF = 1 << (SUB_BUCKET_BITS - 1)  # 64
+MAX_MAGNITUDE = 40 - SUB_BUCKET_BITS           # Values up to 2^40 ns
+NUM_BUCKETS = (MAX_MAGNITUDE + 2) * SUB_BUCKET_HALF
+MAX_VALUE = (1 << 40) - 1
+
+
+def bucket_index(value):
+    magnitude = value.bit_length() - SUB_BUCKET_BITS
+    if magnitude <= 0:
+        return value
+    return magnitude * SUB_BUCKET_HALF + (value >> magnitude)
+
+
+def bucket_value(index):
+    """Lowest value that maps to bucket index"""
+    if index < 2 * SUB_BUCKET_HALF:
+        return index
+    magnitude = (index >> (SUB_BUCKET_BITS - 1)) - 1
+    return (index - magnitude * SUB_BUCKET_HALF) << magnitude
+
+
+class LatencyHistogram:
+    def __init__(self, name):
+        self.name = name
+        self.counts = [0] * NUM_BUCKETS
+        self.total = 0
+        self.max = 0
+
+    def record(self, value_ns):
+        if value_ns < 0:
+            return
+        if value_ns > MAX_VALUE:
+            value_ns = MAX_VALUE
+        self.counts[bucket_index(value_ns)] += 1
+        self.total += 1
+        if value_ns > self.max:
+            self.max = value_ns
+
+    def percentile(self, pct):
+        """Value (ns) at or below which pct percent of recordings fall"""
+        if self.total == 0:
+            return 0
+        target = max(1, int(round(self.total * pct / 100.0)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                # Report the bucket midpoint, capped at the true maximum
+                low = bucket_value(index)
+                high = bucket_value(index + 1)
+                return min(self.max, (low + high) // 2)
+        return self.max
+
+    def reset(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.total = 0
+        self.max = 0
+
+    def add(self, other):
+        """Merge other's recordings into this histogram"""
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+
+class ControlLatency:
+    """
+    Per-stage latency for channel updates, keyed on monotonic_ns timestamps:
+
+        client_send -> server_receive -> frame_encoded -> serial_write_returned
+
+    client_send comes from the client in SetChannelsReq and is only comparable
+    when client and server share a host (same monotonic clock). Updates are
+    correlated by update_id; the last `history` updates are kept verbatim.
+    """
+
+    STAGES = (
+        'client_to_server',   # client_send -> server_receive
+        'receive_to_encode',  # server_receive -> frame_encoded
+        'encode_to_write',    # frame_encoded -> serial_write_returned
+        'server_total',       # server_receive -> serial_write_returned
+        'end_to_end',         # client_send -> serial_write_returned
+        'shm_to_write',       # shared-memory publish -> serial_write_returned
+        'radio_to_encode',    # HID report read -> frame_encoded (passthrough)
+        'radio_to_write',     # HID report read -> serial_write_returned (passthrough)
+    )
+
+    def __init__(self, history=1024):
+        self.lock = threading.Lock()
+        self.histograms = {stage: LatencyHistogram(stage) for stage in self.STAGES}
+        self.recent = deque(maxlen=history)
+
+    def record_update(self, update_id, client_send_ns, receive_ns, encode_ns, write_ns):
+        """Record one update. encode_ns/write_ns are 0 when no frame was written."""
+        h = self.histograms
+        with self.lock:
+            if client_send_ns:
+                h['client_to_server'].record(receive_ns - client_send_ns)
+            if write_ns:
+                h['receive_to_encode'].record(encode_ns - receive_ns)
+                h['encode_to_write'].record(write_ns - encode_ns)
+                h['server_total'].record(write_ns - receive_ns)
+                if client_send_ns:
+                    h['end_to_end'].record(write_ns - client_send_ns)
+            self.recent.append((update_id, client_send_ns, receive_ns, encode_ns, write_ns))
+
+    def record_shm(self, publish_ns, write_ns):
+        with self.lock:
+            self.histograms['shm_to_write'].record(write_ns - publish_ns)
+
+    def record_radio(self, input_ns, encode_ns, write_ns):
+        h = self.histograms
+        with self.lock:
+            h['radio_to_encode'].record(encode_ns - input_ns)
+            h['radio_to_write'].record(write_ns - input_ns)
+
+    def summary(self):
+        """{stage: (count, p50_ns, p99_ns, p999_ns, max_ns)}"""
+        with self.lock:
+            return {
+                stage: (hist.total, hist.percentile(50), hist.percentile(99), hist.percentile(99.9), hist.max)
+                for stage, hist in self.histograms.items()
+            }
+
+    def recent_updates(self, limit):
+        with self.lock:
+            if limit <= 0:
+                return []
+            return list(self.recent)[-limit:]
+
+
+class VideoLatency:
+    """
+    Per-stage latency of video frames, from their FrameTimes (monotonic_ns):
+
+        first_byte -> end_marker -> decoded -> delivered -> read / displayed
+
+    so feed lag can be pinned on the serial link, decoding or the consumers.
+    Percentiles are rolling: histograms are swapped every window_s seconds
+    and summary() covers the current and the previous window, so a feed that
+    stops recording stops reporting after two windows.
+    """
+
+    STAGES = (
+        'serial_backlog',  # Estimated wait of bytes already queued on the port when read (per read)
+        'receive',         # first byte read -> end marker found (frame transfer)
+        'decode',          # end marker found -> decoded (waiting for a worker + decode)
+        'deliver',         # decoded -> handed to subscribers
+        'end_to_end',      # first byte read -> handed to subscribers
+        'age_at_read',     # first byte read -> returned by read_frame()
+        'age_at_display',  # first byte read -> shown in the window
+    )
+
+    def __init__(self, window_s=10.0):
+        self.lock = threading.Lock()
+        self.window_ns = int(window_s * 1e9)
+        self._window_start = time.monotonic_ns()
+        self.previous = self._histograms()
+        self.histograms = self._histograms()
+
+    def _histograms(self):
+        return {stage: LatencyHistogram(stage) for stage in self.STAGES}
+
+    def _roll(self, now_ns):
+        elapsed = now_ns - self._window_start
+        if elapsed >= self.window_ns:
+            # After a gap of two windows or more, nothing left is recent enough to report
+            self.previous = self.histograms if elapsed < 2 * self.window_ns else self._histograms()
+            self.histograms = self._histograms()
+            self._window_start = now_ns
+
+    def record_frame(self, times):
+        """Record a delivered frame's stage latencies; stages the source did not stamp are skipped"""
+        with self.lock:
+            self._roll(times.delivered)
+            h = self.histograms
+            if times.end_marker:
+                h['receive'].record(times.end_marker - times.first_byte)
+                h['decode'].record(times.decoded - times.end_marker)
+                h['end_to_end'].record(times.delivered - times.first_byte)
+            if times.decoded:
+                h['deliver'].record(times.delivered - times.decoded)
+
+    def record_age(self, stage, times, now_ns):
+        """Age of a frame when a consumer got it, from its first byte (or delivery, for sources without one)"""
+        with self.lock:
+            self._roll(now_ns)
+            self.histograms[stage].record(now_ns - (times.first_byte or times.delivered))
+
+    def record_backlog(self, backlog_ns, now_ns):
+        with self.lock:
+            self._roll(now_ns)
+            self.histograms['serial_backlog'].record(backlog_ns)
+
+    def summary(self, now_ns=None):
+        """{stage: (count, p50_ns, p99_ns, p999_ns, max_ns)} over the last one to two windows"""
+        with self.lock:
+            self._roll(time.monotonic_ns() if now_ns is None else now_ns)
+            result = {}
+            for stage in self.STAGES:
+                hist = LatencyHistogram(stage)
+                hist.add(self.previous[stage])
+                hist.add(self.histograms[stage])
+                result[stage] = (hist.total, hist.percentile(50), hist.percentile(99), hist.percentile(99.9), hist.max)
+            return result
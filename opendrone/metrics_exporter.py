@@ -0,0 +1,200 @@
+"""
+Prometheus text-format exporter for the drone server.
+
+Every metric is created once at startup and updated with a plain attribute
+increment, so collection costs no allocation per RPC or per frame and can be
+left on in flight. Increments are not locked: under the GIL a concurrent
+update can very rarely be lost, which is acceptable for monitoring counters.
+The HTTP endpoint runs on its own daemon thread and only formats text when
+scraped.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import grpc
+
+from tracing import tracer
+
+# Serial writes are sub-millisecond when healthy; stalls go to tens of ms
+WRITE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+RPC_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, 0.5, 1.0)
+
+
+class Counter:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Gauge:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class ServerMetrics:
+    """All server metrics, pre-registered so the hot paths only increment"""
+
+    RPC_METHODS = ('startLink', 'stopLink', 'setChannels', 'armDrone', 'disarmDrone',
+                   'resetControls', 'getStatus', 'getMetrics')
+
+    def __init__(self):
+        self.tx_frames = Counter()
+        self.serial_errors = Counter()
+        self.coalesced_updates = Counter()
+        self.serial_write_seconds = Histogram(WRITE_BUCKETS)
+        self.active_rpcs = Gauge()
+        self.rpc_total = {method: Counter() for method in self.RPC_METHODS}
+        self.rpc_errors = {method: Counter() for method in self.RPC_METHODS}
+        self.rpc_seconds = {method: Histogram(RPC_BUCKETS) for method in self.RPC_METHODS}
+        self.started = time.time()
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+
+        def simple(name, kind, help_text, value):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value}")
+
+        def histogram(name, help_text, series):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, hist in series:
+                prefix = f"{labels}," if labels else ""
+                cumulative = 0
+                for bound, count in zip(hist.bounds, hist.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+                cumulative += hist.counts[-1]
+                lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{name}_sum{suffix} {hist.sum}")
+                lines.append(f"{name}_count{suffix} {hist.count}")
+
+        simple("opendrone_tx_frames_total", "counter", "CRSF frames written to the serial link", self.tx_frames.value)
+        simple("opendrone_serial_errors_total", "counter", "Failed serial writes", self.serial_errors.value)
+        simple("opendrone_coalesced_updates_total", "counter",
+               "Channel updates superseded before they reached the serial link", self.coalesced_updates.value)
+        simple("opendrone_active_rpcs", "gauge", "RPCs currently being handled", self.active_rpcs.value)
+        simple("opendrone_start_time_seconds", "gauge", "Server start time (unix seconds)", self.started)
+        histogram("opendrone_serial_write_seconds", "serial write() + flush() duration",
+                  [("", self.serial_write_seconds)])
+
+        lines.append("# HELP opendrone_rpc_total Handled RPCs by method")
+        lines.append("# TYPE opendrone_rpc_total counter")
+        for method, counter in self.rpc_total.items():
+            lines.append(f'opendrone_rpc_total{{method="{method}"}} {counter.value}')
+        lines.append("# HELP opendrone_rpc_errors_total RPCs that raised, by method")
+        lines.append("# TYPE opendrone_rpc_errors_total counter")
+        for method, counter in self.rpc_errors.items():
+            lines.append(f'opendrone_rpc_errors_total{{method="{method}"}} {counter.value}')
+        histogram("opendrone_rpc_duration_seconds", "RPC handler duration by method",
+                  [(f'method="{method}"', hist) for method, hist in self.rpc_seconds.items()])
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """Counts, times and traces unary RPCs. Wrapped handlers are built once per method and cached."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self._wrapped = {}
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None or handler.unary_unary is None:
+            return handler
+        wrapped = self._wrapped.get(handler_call_details.method)
+        if wrapped is None or wrapped[0] is not handler:
+            wrapped = (handler, self._wrap(handler, handler_call_details.method.rsplit('/', 1)[-1]))
+            self._wrapped[handler_call_details.method] = wrapped
+        return wrapped[1]
+
+    def _wrap(self, handler, method):
+        metrics = self.metrics
+        if method not in metrics.rpc_total:
+            return handler
+        total = metrics.rpc_total[method]
+        errors = metrics.rpc_errors[method]
+        seconds = metrics.rpc_seconds[method]
+        active = metrics.active_rpcs
+        behavior = handler.unary_unary
+        span_name = f'rpc.{method}'
+
+        def timed(request, context):
+            active.inc()
+            span_start = tracer.begin()
+            start = time.perf_counter()
+            try:
+                return behavior(request, context)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                seconds.observe(time.perf_counter() - start)
+                tracer.end(span_name, span_start)
+                total.inc()
+                active.dec()
+
+        return grpc.unary_unary_rpc_method_handler(
+            timed,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer
+        )
+
+
+def start_metrics_server(metrics, host='127.0.0.1', port=9108):
+    """Serve metrics.render() at http://host:port/metrics on a daemon thread"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Don't print a line per scrape
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    return httpd
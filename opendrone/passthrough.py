@@ -0,0 +1,82 @@
+"""
+Zero-hop RadioMaster -> CRSF passthrough.
+
+The RadioMaster reader thread calls straight into the servicer's frame
+writer: each HID report is mapped to CRSF ticks, encoded and written on the
+reader thread, with no gRPC or shared-memory hop. The servicer state is
+still published on every report, so remote observers keep seeing live
+channels through getStatus/getMetrics.
+
+Input-to-wire latency is recorded per report (radio_to_encode and
+radio_to_write in getMetrics); bench_passthrough_latency.py measures the
+budget against a pseudo-terminal serial port.
+"""
+
+from array import array
+
+TICK_INDEX_SCALE = 2048  # Table entries per unit of stick travel
+CENTER = 1024
+MAX_TICK = 2047
+
+
+def build_tick_table():
+    """CRSF ticks for -1.0..1.0 in 1/2048 steps, -1 -> 0, 0 -> 1024, 1 -> 2047"""
+    table = array('H', bytes(2 * (2 * TICK_INDEX_SCALE + 1)))
+    for i in range(len(table)):
+        value = i / TICK_INDEX_SCALE - 1.0
+        span = MAX_TICK - CENTER if value > 0 else CENTER
+        table[i] = max(0, min(MAX_TICK, int(round(CENTER + value * span))))
+    return table
+
+
+TICK_TABLE = build_tick_table()
+
+
+def to_ticks(channels, table=TICK_TABLE):
+    """Map normalized channels to a CRSF tick tuple with one table lookup each.
+
+    RadioMasterReader values lie in [-1.00003, 1.0], so the rounded index is
+    always inside the table.
+    """
+    return tuple([table[int((value + 1.0) * TICK_INDEX_SCALE + 0.5)] for value in channels])
+
+
+class RadioPassthrough:
+    """Writes every RadioMaster report to the servicer's serial link in-process"""
+
+    def __init__(self, servicer, reader, arm_channel=4, arm_threshold=1536):
+        self.servicer = servicer
+        self.reader = reader
+        self.arm_channel = arm_channel      # Aux1, as set by armDrone
+        self.arm_threshold = arm_threshold  # Published as armed above this tick value
+        self.frames = 0
+        self.unwritten = 0  # Reports received while the link was down
+
+    def start(self):
+        """Route reader reports to the serial link. Client RPCs and shared-memory updates are ignored while active."""
+        self.reader.on_state = self.on_state
+        self.servicer.passthrough = True
+        if not self.reader.start():
+            self.servicer.passthrough = False
+            return False
+        print("RadioMaster passthrough active")
+        return True
+
+    def stop(self):
+        self.reader.stop()
+        self.reader.on_state = None
+        self.servicer.passthrough = False
+
+    def on_state(self, state):
+        """RadioMasterReader callback, runs on the reader thread"""
+        input_ns = int(state.timestamp * 1e9)  # time.monotonic() from the reader
+        channels = to_ticks(state.channels)
+        servicer = self.servicer
+        with servicer.lock:
+            servicer._publish(channels=channels, armed=channels[self.arm_channel] >= self.arm_threshold)
+            encoded_ns, written_ns = servicer._write_frame(channels, "passthrough frame", log=False, radio=True)
+        if written_ns:
+            servicer.latency.record_radio(input_ns, encoded_ns, written_ns)
+            self.frames += 1
+        else:
+            self.unwritten += 1
@@ -1,12 +1,20 @@
+import argparse
 import grpc
+import signal
 import time
 import threading
 from concurrent import futures
+from typing import NamedTuple, Tuple
 import serial
 from google.protobuf import empty_pb2
 
 import drone_control_pb2
 import drone_control_pb2_grpc
+from config import DEFAULT_CONFIG_PATH, load_config, dump_config
+from latency import ControlLatency
+from metrics_exporter import ServerMetrics, MetricsInterceptor, start_metrics_server
+from shm_control import ControlBlock
+from tracing import tracer
 
 class CRSFProtocol:
     """CRSF Protocol implementation for ExpressLRS/TBS Crossfire"""
@@ -73,24 +81,158 @@ class CRSFProtocol:
         
         return frame
 
+class DroneState(NamedTuple):
+    """Immutable snapshot of the servicer state.
+
+    Writers build a new snapshot and swap it in with a single attribute
+    assignment, so readers never need the serial lock.
+    """
+    version: int
+    channels: Tuple[int, ...]
+    armed: bool
+    connected: bool
+    last_write_ns: int  # time.monotonic_ns() when the last frame was written, 0 if never
+
+
+DEFAULT_CHANNELS = (1024, 1024, 0, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024)  # 16 channels
+
+
 class DroneControlServicer(drone_control_pb2_grpc.DroneControlServicer):
-    def __init__(self):
-        self.armed = False
-        self.connected = False
-        self.channels = [1024, 1024, 0, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024, 1024]  # 16 channels
+    def __init__(self, control_block=None, tx_rate_hz=1000, metrics=None):
         self.serial_connection = None
+        # Serializes writers and serial I/O. Readers use self.state instead.
         self.lock = threading.Lock()
+
+        # Optional shared-memory input, drained by the TX loop while the link is up
+        self.control_reader = control_block.reader() if control_block else None
+        self.tx_rate_hz = tx_rate_hz
+        self.tx_running = False
+        self.tx_thread = None
+
+        # Set while a RadioPassthrough owns the channels; only its frames reach the serial link
+        self.passthrough = False
+
+        # Per-stage control latency, served by getMetrics
+        self.latency = ControlLatency()
+        # Pre-registered counters for the Prometheus exporter
+        self.metrics = metrics or ServerMetrics()
+
+        self.state = DroneState(
+            version=0,
+            channels=DEFAULT_CHANNELS,
+            armed=False,
+            connected=False,
+            last_write_ns=0
+        )
+
+    @property
+    def armed(self):
+        return self.state.armed
+
+    @property
+    def connected(self):
+        return self.state.connected
+
+    @property
+    def channels(self):
+        return list(self.state.channels)
+
+    def _publish(self, **changes):
+        """Swap in a new snapshot. Must be called with self.lock held."""
+        state = self.state
+        self.state = state._replace(version=state.version + 1, **changes)
+        return self.state
+
+    def _write_frame(self, channels, label, log=True, radio=False):
+        """Encode and write a CRSF frame. Must be called with self.lock held.
+
+        While passthrough is active only the RadioPassthrough's frames (radio=True) are written.
+        Returns (encoded_ns, written_ns) monotonic timestamps, or (0, 0) if nothing was written.
+        """
+        if self.passthrough and not radio:
+            return 0, 0
+        if self.serial_connection and self.serial_connection.is_open:
+            try:
+                t0 = tracer.begin()
+                crsf_frame = CRSFProtocol.create_crsf_frame(channels)
+                tracer.end('frame.encode', t0)
+                encoded_ns = time.monotonic_ns()
+                t0 = tracer.begin()
+                self.serial_connection.write(crsf_frame)
+                self.serial_connection.flush()
+                tracer.end('serial.write', t0)
+                written_ns = time.monotonic_ns()
+                self._publish(last_write_ns=written_ns)
+                self.metrics.tx_frames.inc()
+                self.metrics.serial_write_seconds.observe((written_ns - encoded_ns) / 1e9)
+                if log:
+                    print(f"Sent {label}: {' '.join(f'{b:02X}' for b in crsf_frame)}")
+                return encoded_ns, written_ns
+            except Exception as e:
+                self.metrics.serial_errors.inc()
+                print(f"Error sending {label}: {e}")
+        return 0, 0
+
+    def _start_tx_loop(self):
+        if self.control_reader is None or (self.tx_thread and self.tx_thread.is_alive()):
+            return
+        self.tx_running = True
+        self.tx_thread = threading.Thread(target=self._tx_loop, daemon=True)
+        self.tx_thread.start()
+
+    def _stop_tx_loop(self):
+        self.tx_running = False
+        if self.tx_thread and self.tx_thread is not threading.current_thread():
+            self.tx_thread.join(timeout=1.0)
+        self.tx_thread = None
+
+    def _tx_loop(self):
+        """Forward shared-memory channel updates to the serial link at tx_rate_hz"""
+        period = 1.0 / self.tx_rate_hz
+        reader = self.control_reader
+        next_tick = time.perf_counter()
+        while self.tx_running:
+            last_seq = reader.last_seq
+            update = reader.poll()
+            if update is not None and not self.passthrough:  # Drained but dropped while the radio flies
+                if last_seq:
+                    # seq advances by 2 per publish; anything beyond one publish was overwritten unsent
+                    skipped = (update[0] - last_seq) // 2 - 1
+                    if skipped > 0:
+                        self.metrics.coalesced_updates.inc(skipped)
+                with self.lock:
+                    state = self._publish(channels=update[2])
+                    _, written_ns = self._write_frame(state.channels, "shared-memory frame", log=False)
+                if written_ns:
+                    self.latency.record_shm(update[1], written_ns)
+
+            next_tick += period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()  # Fell behind; don't try to catch up
         
     def startLink(self, request, context):
+        if self.passthrough:
+            # The radio owns the link; a remote client must not reopen it under it
+            return drone_control_pb2.StartLinkResp(
+                success=self.state.connected,
+                message="Radio passthrough active, link left as is"
+            )
         with self.lock:
             try:
+                if self.serial_connection:
+                    self.serial_connection.close()  # Don't leak the old handle on the same port
+                    self.serial_connection = None
                 # Try to open serial connection
                 self.serial_connection = serial.Serial(
                     port=request.port,
                     baudrate=request.baud_rate,
                     timeout=1
                 )
-                self.connected = True
+                self._publish(connected=True)
+                self._start_tx_loop()
                 print(f"Started drone link on {request.port} at {request.baud_rate} baud")
                 return drone_control_pb2.StartLinkResp(
                     success=True,
@@ -104,105 +246,230 @@ class DroneControlServicer(drone_control_pb2_grpc.DroneControlServicer):
                 )
     
     def stopLink(self, request, context):
+        if self.passthrough:
+            return empty_pb2.Empty()  # Observers exiting must not close the radio's link
+        self._stop_tx_loop()
         with self.lock:
             if self.serial_connection:
                 self.serial_connection.close()
                 self.serial_connection = None
-            self.connected = False
+            self._publish(connected=False)
             print("Stopped drone link")
         return empty_pb2.Empty()
     
     def setChannels(self, request, context):
+        received_ns = time.monotonic_ns()
+        if self.passthrough:
+            return empty_pb2.Empty()  # The radio is flying; remote clients only observe
+        # Ensure we have exactly 16 channels
+        channels = list(request.channels)
+        while len(channels) < 16:
+            channels.append(1024)  # Fill missing channels with center value
+        channels = tuple(channels[:16])  # Take only first 16 channels
+
         with self.lock:
-            # Ensure we have exactly 16 channels
-            channels = list(request.channels)
-            while len(channels) < 16:
-                channels.append(1024)  # Fill missing channels with center value
-            self.channels = channels[:16]  # Take only first 16 channels
-            
-            print(f"Updated channels: {self.channels}")
+            self._publish(channels=channels)
+            print(f"Updated channels: {list(channels)}")
             
             # Send to drone via serial using CRSF protocol
-            if self.serial_connection and self.serial_connection.is_open:
-                try:
-                    crsf_frame = CRSFProtocol.create_crsf_frame(self.channels)
-                    self.serial_connection.write(crsf_frame)
-                    self.serial_connection.flush()
-                    print(f"Sent CRSF frame: {' '.join(f'{b:02X}' for b in crsf_frame)}")
-                except Exception as e:
-                    print(f"Error sending CRSF frame to serial: {e}")
-        
+            encoded_ns, written_ns = self._write_frame(channels, "CRSF frame")
+
+        self.latency.record_update(request.update_id, request.client_send_ns, received_ns, encoded_ns, written_ns)
         return empty_pb2.Empty()
     
     def armDrone(self, request, context):
+        if self.passthrough:
+            return empty_pb2.Empty()  # Arming is on the radio's switch
         with self.lock:
-            self.armed = True
-            self.channels[4] = 2047  # Set Aux1 high for arming
+            channels = list(self.state.channels)
+            channels[4] = 2047  # Set Aux1 high for arming
+            state = self._publish(armed=True, channels=tuple(channels))
             print("Drone ARMED")
             
             # Send updated channels to drone immediately
-            if self.serial_connection and self.serial_connection.is_open:
-                try:
-                    crsf_frame = CRSFProtocol.create_crsf_frame(self.channels)
-                    self.serial_connection.write(crsf_frame)
-                    self.serial_connection.flush()
-                    print(f"Sent ARM command via CRSF: {' '.join(f'{b:02X}' for b in crsf_frame)}")
-                except Exception as e:
-                    print(f"Error sending ARM command: {e}")
+            self._write_frame(state.channels, "ARM command via CRSF")
         return empty_pb2.Empty()
     
     def disarmDrone(self, request, context):
+        if self.passthrough:
+            return empty_pb2.Empty()
         with self.lock:
-            self.armed = False
-            self.channels[4] = 1024  # Set Aux1 low for disarming
-            self.channels[2] = 0     # Set throttle to 0
+            channels = list(self.state.channels)
+            channels[4] = 1024  # Set Aux1 low for disarming
+            channels[2] = 0     # Set throttle to 0
+            state = self._publish(armed=False, channels=tuple(channels))
             print("Drone DISARMED")
             
             # Send updated channels to drone immediately
-            if self.serial_connection and self.serial_connection.is_open:
-                try:
-                    crsf_frame = CRSFProtocol.create_crsf_frame(self.channels)
-                    self.serial_connection.write(crsf_frame)
-                    self.serial_connection.flush()
-                    print(f"Sent DISARM command via CRSF: {' '.join(f'{b:02X}' for b in crsf_frame)}")
-                except Exception as e:
-                    print(f"Error sending DISARM command: {e}")
+            self._write_frame(state.channels, "DISARM command via CRSF")
         return empty_pb2.Empty()
     
     def resetControls(self, request, context):
+        if self.passthrough:
+            return empty_pb2.Empty()
         with self.lock:
-            self.channels[0] = 1024  # Roll center
-            self.channels[1] = 1024  # Pitch center  
-            self.channels[3] = 1024  # Yaw center
+            channels = list(self.state.channels)
+            channels[0] = 1024  # Roll center
+            channels[1] = 1024  # Pitch center  
+            channels[3] = 1024  # Yaw center
+            self._publish(channels=tuple(channels))
             print("Controls reset to center")
         return empty_pb2.Empty()
     
     def getStatus(self, request, context):
-        with self.lock:
-            return drone_control_pb2.StatusResp(
-                armed=self.armed,
-                connected=self.connected,
-                channels=self.channels,
-                timestamp=int(time.time() * 1000)
+        # Lock-free: a single read of self.state gives a consistent snapshot
+        state = self.state
+        return drone_control_pb2.StatusResp(
+            armed=state.armed,
+            connected=state.connected,
+            channels=state.channels,
+            timestamp=int(time.time() * 1000)
+        )
+
+    def getMetrics(self, request, context):
+        latencies = [
+            drone_control_pb2.LatencyStats(
+                stage=stage,
+                count=count,
+                p50_us=p50 / 1e3,
+                p99_us=p99 / 1e3,
+                p999_us=p999 / 1e3,
+                max_us=max_ns / 1e3
             )
+            for stage, (count, p50, p99, p999, max_ns) in self.latency.summary().items()
+        ]
+        recent = [
+            drone_control_pb2.UpdateTrace(
+                update_id=update_id,
+                client_send_ns=client_send_ns,
+                server_receive_ns=receive_ns,
+                frame_encoded_ns=encode_ns,
+                serial_written_ns=write_ns
+            )
+            for update_id, client_send_ns, receive_ns, encode_ns, write_ns in self.latency.recent_updates(request.recent_updates)
+        ]
+        return drone_control_pb2.MetricsResp(
+            latencies=latencies,
+            recent=recent,
+            timestamp=int(time.time() * 1000)
+        )
+
+COMPRESSION = {
+    'none': grpc.Compression.NoCompression,
+    'gzip': grpc.Compression.Gzip,
+    'deflate': grpc.Compression.Deflate,
+}
 
-def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    drone_control_pb2_grpc.add_DroneControlServicer_to_server(
-        DroneControlServicer(), server
+
+def server_options(server_config):
+    """Translate the config.yml server section into gRPC channel arguments"""
+    keepalive = server_config['keepalive']
+    http2 = server_config['http2']
+    options = [
+        ('grpc.max_concurrent_streams', server_config['max_concurrent_streams']),
+        ('grpc.max_send_message_length', server_config['max_message_bytes']),
+        ('grpc.max_receive_message_length', server_config['max_message_bytes']),
+        ('grpc.keepalive_time_ms', keepalive['time_ms']),
+        ('grpc.keepalive_timeout_ms', keepalive['timeout_ms']),
+        ('grpc.keepalive_permit_without_calls', int(keepalive['permit_without_calls'])),
+        ('grpc.http2.min_ping_interval_without_data_ms', keepalive['min_ping_interval_ms']),
+        ('grpc.http2.max_pings_without_data', keepalive['max_pings_without_data']),
+        ('grpc.http2.bdp_probe', int(http2['bdp_probe'])),
+        ('grpc.http2.lookahead_bytes', http2['lookahead_bytes']),
+        ('grpc.http2.max_frame_size', http2['max_frame_bytes']),
+    ]
+    if http2['write_buffer_bytes']:
+        options.append(('grpc.http2.write_buffer_size', http2['write_buffer_bytes']))
+    return options
+
+
+def _dump_trace(path):
+    count = tracer.dump(path)
+    print(f"Wrote {count} trace spans to {path}")
+
+
+def _enable_tracing(tracing_config):
+    """Start recording spans; SIGUSR1 dumps them"""
+    tracer.enable(tracing_config['capacity'])
+    if hasattr(signal, 'SIGUSR1'):
+        # kill -USR1 <pid> dumps the trace ring mid-flight without stopping the server
+        signal.signal(signal.SIGUSR1, lambda signum, frame: _dump_trace(tracing_config['dump_path']))
+    print(f"Tracing enabled ({tracing_config['capacity']} spans), dump to {tracing_config['dump_path']}")
+
+
+def serve(config=None):
+    server_config = (config or load_config())['server']
+    compression = server_config['compression']
+    if compression not in COMPRESSION:
+        raise ValueError(f"Unknown compression '{compression}', expected one of {sorted(COMPRESSION)}")
+
+    metrics = ServerMetrics()
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=server_config['max_workers']),
+        interceptors=[MetricsInterceptor(metrics)],
+        options=server_options(server_config),
+        maximum_concurrent_rpcs=server_config['max_concurrent_rpcs'],
+        compression=COMPRESSION[compression]
     )
+    control_block = None
+    if server_config['shm_control']:
+        control_block = ControlBlock(server_config['shm_control'])
+        print(f"Shared-memory control block: {control_block.name}")
+    servicer = DroneControlServicer(control_block, server_config['tx_rate_hz'], metrics)
+    drone_control_pb2_grpc.add_DroneControlServicer_to_server(servicer, server)
+    tracing_config = server_config['tracing']
+    if tracing_config['enabled']:
+        _enable_tracing(tracing_config)
+    metrics_config = server_config['metrics']
+    if metrics_config['enabled']:
+        start_metrics_server(metrics, metrics_config['host'], metrics_config['port'])
+        print(f"Metrics exporter on http://{metrics_config['host']}:{metrics_config['port']}/metrics")
     
-    listen_addr = '[::]:50051'
+    listen_addr = server_config['bind_address']
     server.add_insecure_port(listen_addr)
+    if server_config['unix_socket']:
+        # Co-located clients skip the TCP stack entirely
+        server.add_insecure_port(f"unix:{server_config['unix_socket']}")
     server.start()
     
     print(f"Drone control server started on {listen_addr}")
+    if server_config['unix_socket']:
+        print(f"Also listening on unix:{server_config['unix_socket']}")
+
+    passthrough = None
+    passthrough_config = server_config['radio_passthrough']
+    if passthrough_config['enabled']:
+        # Imported here so servers without a radio don't need the controllers package
+        from controllers.radiomaster_controller import RadioMasterReader
+        from passthrough import RadioPassthrough
+        servicer.startLink(drone_control_pb2.StartLinkReq(
+            port=passthrough_config['port'],
+            baud_rate=passthrough_config['baud_rate']
+        ), None)
+        passthrough = RadioPassthrough(servicer, RadioMasterReader())
+        passthrough.start()
     
     try:
         server.wait_for_termination()
     except KeyboardInterrupt:
         print("\nShutting down server...")
         server.stop(0)
+    finally:
+        if passthrough:
+            passthrough.stop()
+        if control_block:
+            control_block.close()
+        if tracer.enabled:
+            _dump_trace(tracing_config['dump_path'])
 
 if __name__ == '__main__':
-    serve()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="OpenDrone gRPC control server")
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH, help="Path to config.yml")
+    parser.add_argument('--print-config', action='store_true', help="Print the effective configuration and exit")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if args.print_config:
+        print(dump_config(config), end='')
+    else:
+        serve(config)
@@ -0,0 +1,134 @@
+"""
+Shared-memory control block for algorithms running on the same host as server.py.
+
+Skips protobuf serialization and the HTTP/2 hop entirely: a writer process
+publishes a 16-channel vector into a multiprocessing.shared_memory segment and
+the server's TX loop picks it up at its next tick.
+
+Layout (little endian, 48 bytes):
+    [seq: u64] [timestamp_ns: u64] [channels: 16 x u16]
+
+The block is protected by a seqlock. The writer bumps seq to an odd value,
+writes the payload, then bumps it to the next even value. A reader copies the
+payload between two reads of seq and retries if they differ or are odd, so it
+never sees a torn vector and never blocks the writer. There is a single writer
+per block.
+"""
+
+import struct
+import time
+from multiprocessing import shared_memory, resource_tracker
+
+NUM_CHANNELS = 16
+MAX_CHANNEL_VALUE = 2047
+
+_SEQ = struct.Struct('<Q')
+_PAYLOAD = struct.Struct(f'<Q{NUM_CHANNELS}H')
+_PAYLOAD_OFFSET = _SEQ.size
+BLOCK_SIZE = _SEQ.size + _PAYLOAD.size
+
+DEFAULT_BLOCK_NAME = 'opendrone_control'
+
+
+def _attach(name):
+    """Open an existing block without letting this process unlink it on exit"""
+    shm = shared_memory.SharedMemory(name=name)
+    # Before Python 3.13 every attaching process registers the segment with the
+    # resource tracker, which would destroy it when that process exits.
+    try:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+    return shm
+
+
+class ControlBlock:
+    """Owner of the shared segment. Created by the server, unlinked on close()."""
+
+    def __init__(self, name=DEFAULT_BLOCK_NAME):
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=BLOCK_SIZE)
+        except FileExistsError:
+            # Left behind by a server that did not shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=BLOCK_SIZE)
+        self.name = name
+        self.shm.buf[:BLOCK_SIZE] = bytes(BLOCK_SIZE)
+
+    def reader(self):
+        return ControlBlockReader(self.name, shm=self.shm)
+
+    def close(self):
+        self.shm.close()
+        try:
+            # A writer or reader attached from this same process has already
+            # dropped the tracker entry; restore it so unlink() stays balanced.
+            resource_tracker.register(self.shm._name, 'shared_memory')
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ControlBlockWriter:
+    """Publishes channel vectors into an existing control block"""
+
+    def __init__(self, name=DEFAULT_BLOCK_NAME):
+        self.shm = _attach(name)
+        self.buf = self.shm.buf
+        self.seq = _SEQ.unpack_from(self.buf, 0)[0] & ~1
+
+    def publish(self, channels):
+        """Publish up to 16 channel values (0-2047). Missing channels are centered."""
+        values = [min(MAX_CHANNEL_VALUE, max(0, int(c))) for c in channels[:NUM_CHANNELS]]
+        if len(values) < NUM_CHANNELS:
+            values.extend([1024] * (NUM_CHANNELS - len(values)))
+        buf = self.buf
+        seq = self.seq
+        _SEQ.pack_into(buf, 0, seq + 1)  # odd: write in progress
+        _PAYLOAD.pack_into(buf, _PAYLOAD_OFFSET, time.monotonic_ns(), *values)
+        _SEQ.pack_into(buf, 0, seq + 2)  # even: payload consistent
+        self.seq = seq + 2
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+
+class ControlBlockReader:
+    """Lock-free reader for a control block"""
+
+    def __init__(self, name=DEFAULT_BLOCK_NAME, shm=None, max_retries=100):
+        self.shm = shm or _attach(name)
+        self._owns_shm = shm is None
+        self.buf = self.shm.buf
+        self.max_retries = max_retries
+        self.last_seq = 0
+
+    def read(self):
+        """Return (seq, timestamp_ns, channels) from a consistent copy, or None if the writer kept it busy"""
+        buf = self.buf
+        for _ in range(self.max_retries):
+            seq_before = _SEQ.unpack_from(buf, 0)[0]
+            if seq_before & 1:
+                continue
+            payload = _PAYLOAD.unpack_from(buf, _PAYLOAD_OFFSET)
+            if _SEQ.unpack_from(buf, 0)[0] == seq_before:
+                return seq_before, payload[0], payload[1:]
+        return None
+
+    def poll(self):
+        """Return (seq, timestamp_ns, channels) if a new vector was published since the last poll, else None"""
+        if _SEQ.unpack_from(self.buf, 0)[0] == self.last_seq:
+            return None
+        snapshot = self.read()
+        if snapshot is None or snapshot[0] == 0:
+            return None
+        self.last_seq = snapshot[0]
+        return snapshot
+
+    def close(self):
+        self.buf = None
+        if self._owns_shm:
+            self.shm.close()
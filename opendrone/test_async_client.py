@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test AsyncDroneClient against an in-process server: coroutine RPCs and
+fire-and-forget channel updates that are applied in order, newest last.
+"""
+
+import sys
+import os
+import asyncio
+from concurrent import futures
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import grpc
+
+import drone_control_pb2_grpc
+from async_client import AsyncDroneClient
+from server import DroneControlServicer
+
+
+def _start_server():
+    servicer = DroneControlServicer()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    drone_control_pb2_grpc.add_DroneControlServicer_to_server(servicer, server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    return server, servicer, port
+
+
+def test_nowait_updates_are_ordered_and_newest_wins():
+    server, servicer, port = _start_server()
+
+    async def run():
+        async with AsyncDroneClient(host='127.0.0.1', port=port) as client:
+            max_seen = 0
+            for i in range(200):
+                client.channels[0] = 1000 + i
+                client.send_channels_nowait()
+                max_seen = max(max_seen, client.in_flight)
+            await client.flush()
+
+            assert max_seen == 1, "one setChannels call at a time"
+            assert client.send_errors == 0
+            assert client.sent + client.superseded == 200
+            assert servicer.state.channels[0] == 1199, "the newest vector must always be delivered"
+
+            await client.arm_drone()
+            status = await client.get_status()
+            assert status['armed']
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.stop(0)
+
+
+if __name__ == "__main__":
+    test_nowait_updates_are_ordered_and_newest_wins()
+    print("ASYNC CLIENT TEST PASSED")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test DroneClient deadlines, fast-fail while disconnected, automatic
+reconnection after the server restarts, and preferring the unix socket
+named in config.yml.
+"""
+
+import sys
+import os
+import time
+import socket
+import tempfile
+from concurrent import futures
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import grpc
+
+import drone_control_pb2_grpc
+from client import DroneClient
+from config import load_config
+from server import DroneControlServicer
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _start_server(port, unix_socket=None):
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    drone_control_pb2_grpc.add_DroneControlServicer_to_server(DroneControlServicer(), server)
+    server.add_insecure_port(f'127.0.0.1:{port}')
+    if unix_socket:
+        server.add_insecure_port(f'unix:{unix_socket}')
+    server.start()
+    return server
+
+
+def _wait_for(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_fast_fail_and_reconnect():
+    port = _free_port()
+    server = _start_server(port)
+    transitions = []
+    client = DroneClient(host='127.0.0.1', port=port, backoff_initial=0.05, backoff_max=0.2,
+                         on_state_change=lambda old, new: transitions.append(new))
+    try:
+        assert client.connect()
+        assert client.get_status() is not None
+
+        server.stop(0).wait()
+        client.send_channels()  # Either UNAVAILABLE or the connectivity callback flips us offline
+        assert _wait_for(lambda: not client.connected, 2.0)
+
+        t0 = time.monotonic()
+        for _ in range(100):
+            client.send_channels()
+        assert time.monotonic() - t0 < 0.1, "calls must fail fast while disconnected"
+        assert client.metrics['fast_failed'] >= 100
+
+        server = _start_server(port)
+        assert _wait_for(lambda: client.connected, 5.0), "client did not reconnect"
+        assert client.get_status() is not None
+
+        metrics = client.connection_metrics()
+        assert metrics['state'] == 'READY'
+        assert metrics['disconnects'] == 1
+        assert metrics['reconnects'] == 1
+        assert metrics['last_reconnect_s'] > 0
+        assert 'TRANSIENT_FAILURE' in transitions and transitions[-1] == 'READY'
+    finally:
+        client.disconnect()
+        server.stop(0)
+
+
+def test_unix_socket_from_config():
+    port = _free_port()
+    path = os.path.join(tempfile.mkdtemp(), 'opendrone.sock')
+    config = load_config()
+    config['server']['bind_address'] = f'[::]:{port}'
+    config['server']['unix_socket'] = path
+
+    # No socket yet: only TCP is tried
+    client = DroneClient.from_config(config, host='127.0.0.1', auto_reconnect=False)
+    assert (client.port, client.unix_socket) == (port, path)
+    assert client._targets() == [f'127.0.0.1:{port}']
+
+    server = _start_server(port, unix_socket=path)
+    try:
+        assert client._targets() == [f'unix:{path}', f'127.0.0.1:{port}']
+        assert client.connect()
+        assert client.target == f'unix:{path}'
+        assert client.get_status() is not None
+    finally:
+        client.disconnect()
+        server.stop(0)
+
+
+if __name__ == "__main__":
+    test_fast_fail_and_reconnect()
+    test_unix_socket_from_config()
+    print("CLIENT RECONNECT TEST PASSED")
@@ -5,7 +5,7 @@ Test CRSF protocol implementation by generating and validating CRSF frames
 
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from server import CRSFProtocol
 
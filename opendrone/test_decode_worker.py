@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test off-thread decoding: submit() never waits on a slow decoder, stale
+frames are dropped in favour of the newest, delivered ids only increase,
+and the counters add up.
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from controllers.decode_worker import DecodeWorker, LatestFrameSlot
+
+
+def test_latest_frame_slot():
+    slot = LatestFrameSlot()
+    assert slot.get(timeout=0.01) is None
+    slot.put(1)
+    slot.put(2)
+    assert slot.get() == 2 and slot.dropped == 1
+    slot.close()
+    assert slot.get() is None, "closed slot does not block"
+
+
+def _run(workers):
+    delivered = []
+    last = threading.Event()
+
+    def decode(data):
+        time.sleep(0.005)  # Slower than frames arrive
+        return None if data == b'bad' else data
+
+    def on_frame(frame_id, frame, times):
+        assert times.decoded > 0
+        delivered.append(frame_id)
+        if frame == b'frame 199':
+            last.set()
+
+    worker = DecodeWorker(decode, on_frame, workers=workers)
+    worker.start()
+    start = time.perf_counter()
+    for i in range(200):
+        worker.submit(b'bad' if i == 100 else f'frame {i}'.encode())
+        time.sleep(0.0005)
+    submit_time = time.perf_counter() - start
+    assert last.wait(2.0), "newest frame is always decoded"
+    worker.stop()
+    return worker, delivered, submit_time
+
+
+def test_slow_decoder_drops_stale_frames():
+    for workers in (1, 3):
+        worker, delivered, submit_time = _run(workers)
+        stats = worker.stats()
+        assert submit_time < 0.5, "reader never waits for the decoder"
+        assert delivered == sorted(delivered) and len(set(delivered)) == len(delivered)
+        assert delivered[-1] == 200
+        assert stats['received'] == 200
+        assert stats['dropped'] > 0
+        assert stats['decoded'] == len(delivered)
+        assert stats['decoded'] + stats['dropped'] + stats['failed'] == 200
+        assert stats['decode_p50_ms'] >= 4.0
+
+
+if __name__ == "__main__":
+    test_latest_frame_slot()
+    test_slow_decoder_drops_stale_frames()
+    print("DECODE WORKER TEST PASSED")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test the video decoder backends: backends are picked by name, 'ffmpeg'
+falls back to OpenCV without the binary, and (where ffmpeg is installed)
+the pipe backend returns each frame from its own call, in the requested
+size and colour, and recovers from bad and truncated JPEGs.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+import numpy as np
+
+from controllers import decoder_backends
+from controllers.decoder_backends import make_decoder, OpenCVDecoder, FFmpegPipeDecoder
+from controllers.view import VideoStreamOpenCV
+
+
+def _jpeg(value, width=1280, height=960):
+    return cv2.imencode('.jpg', np.full((height, width, 3), value, dtype=np.uint8))[1].tobytes()
+
+
+def test_backend_selection():
+    assert isinstance(make_decoder('opencv', 640, 480), OpenCVDecoder)
+    try:
+        make_decoder('gstreamer', 640, 480)
+        assert False, "unknown backends are rejected"
+    except ValueError:
+        pass
+
+    which = decoder_backends.shutil.which
+    decoder_backends.shutil.which = lambda binary: None
+    try:
+        assert isinstance(make_decoder('ffmpeg', 640, 480), OpenCVDecoder)
+    finally:
+        decoder_backends.shutil.which = which
+
+    video = VideoStreamOpenCV(headless=True, decoder='opencv')
+    assert video.video_stats()['backend'] == 'opencv'
+
+
+def test_flush_frame_detection():
+    flush = cv2.imdecode(np.frombuffer(decoder_backends.FLUSH_JPEG, np.uint8), cv2.IMREAD_COLOR)
+    for width, height, grayscale in ((320, 240, False), (640, 480, False), (160, 120, True)):
+        decoder = FFmpegPipeDecoder(width, height, grayscale)
+        # Scaled up from as little as the 2x2 that -lowres 3 leaves of it
+        for size in (16, 2):
+            image = cv2.resize(cv2.resize(flush, (size, size), interpolation=cv2.INTER_AREA), (width, height))
+            if grayscale:
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            assert decoder.is_flush(image)
+        frame = cv2.imdecode(np.frombuffer(_jpeg((255, 255, 255), width, height), np.uint8),
+                             cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR)
+        assert not decoder.is_flush(frame)
+        assert not decoder.is_flush(np.zeros_like(frame))
+
+
+def test_ffmpeg_pipe_decoder():
+    if not FFmpegPipeDecoder.available():
+        print("ffmpeg not installed, pipe decoder not exercised")
+        return
+    decoder = FFmpegPipeDecoder(320, 240)
+    try:
+        # Every call returns its own frame, not the previous one
+        for value in (10, 90, 170, 250):
+            frame = decoder.decode(_jpeg((value, 60, 200)))
+            assert frame.shape == (240, 320, 3)
+            assert abs(int(frame[100, 100, 0]) - value) <= 3
+
+        assert decoder.decode(b'\xff\xd8not a jpeg\xff\xd9') is None
+        assert decoder.restarts == 1
+
+        # A JPEG cut off mid-scan and run into the next one comes out as two frames;
+        # the extra one is dropped and the calls after it stay in step
+        cut = _jpeg((90, 60, 200))
+        cut = cut[:len(cut) // 2] + _jpeg((130, 60, 200))
+        assert decoder.decode(cut) is not None
+        for value in (20, 220, 60):
+            frame = decoder.decode(_jpeg((value, 60, 200)))
+            assert abs(int(frame[100, 100, 0]) - value) <= 3
+        assert decoder.discarded == 1 and decoder.restarts == 1
+
+        # A camera frame that looks like the flush pattern is still returned, and the calls after it stay in step
+        lookalike = cv2.resize(decoder_backends._flush_image(), (1280, 960), interpolation=cv2.INTER_NEAREST)
+        frame = decoder.decode(cv2.imencode('.jpg', lookalike)[1].tobytes())
+        assert frame is not None and decoder.is_flush(frame)
+        for value in (40, 200):
+            frame = decoder.decode(_jpeg((value, 60, 200)))
+            assert abs(int(frame[100, 100, 0]) - value) <= 3
+        assert decoder.restarts == 1
+        # A new resolution restarts ffmpeg with a different -lowres
+        frame = decoder.decode(_jpeg((30, 60, 200), 640, 480))
+        assert abs(int(frame[100, 100, 0]) - 30) <= 3
+    finally:
+        decoder.close()
+
+    gray = VideoStreamOpenCV(headless=True, frame_width=160, frame_height=120, grayscale=True, decoder='ffmpeg')
+    try:
+        slot = gray._decode_frame(_jpeg((0, 0, 200)))
+        assert gray.ring.frames[slot].shape == (120, 160)
+        assert abs(int(gray.ring.frames[slot][50, 50]) - 60) <= 3
+    finally:
+        gray.backend.close()
+
+
+if __name__ == "__main__":
+    test_backend_selection()
+    test_flush_frame_detection()
+    test_ffmpeg_pipe_decoder()
+    print("DECODER BACKENDS TEST PASSED")
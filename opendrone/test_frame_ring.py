@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test the preallocated frame ring: consumers get read-only views of the ring
+slots with ids and timestamps, slots are reused in order, and delivering
+frames allocates no new frame buffers.
+"""
+
+import sys
+import os
+import time
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from algorithms.algorithm import Algorithm
+from controllers.frame_ring import FrameRing
+from controllers.view import MockVideoStreamController
+
+
+def test_ring_views_and_reuse():
+    ring = FrameRing(4, 6, 3, slots=3)
+    refs = []
+    for frame_id in range(1, 5):
+        slot, image = ring.acquire()
+        image[:] = frame_id
+        refs.append(ring.commit(slot, frame_id, float(frame_id)))
+
+    latest = ring.latest()
+    assert latest.frame_id == 4 and latest.timestamp == 4.0
+    assert np.shares_memory(latest.image, ring.frames)
+    assert not latest.image.flags.writeable
+    try:
+        latest.image[0, 0, 0] = 0
+        assert False, "consumer views are read-only"
+    except ValueError:
+        pass
+
+    # Slot of frame 1 was reused by frame 4
+    assert refs[0].slot == refs[3].slot
+    assert not ring.is_current(refs[0])
+    assert ring.is_current(refs[1]) and ring.is_current(refs[3])
+    assert int(refs[1].image[0, 0, 0]) == 2
+
+
+def test_algorithm_reads_ring_without_allocating():
+    video = MockVideoStreamController(headless=True, fps=120)
+    algorithm = Algorithm(video=video)
+    assert algorithm.read_stream() is None
+    video.start()
+
+    tracemalloc.start()
+    seen = []
+    deadline = time.monotonic() + 2.0
+    while len(seen) < 30 and time.monotonic() < deadline:
+        ref = algorithm.read_stream()
+        if ref is not None:
+            seen.append(ref.frame_id)
+            assert ref.image.shape == (480, 640, 3)
+            assert np.shares_memory(ref.image, video.ring.frames)
+        time.sleep(0.002)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    video.stop()
+
+    assert len(seen) == 30
+    assert seen == sorted(set(seen)), "each frame read at most once, in order"
+    assert peak < 640 * 480 * 3 // 2, "no frame-sized allocation per frame"
+
+
+if __name__ == "__main__":
+    test_ring_views_and_reuse()
+    test_algorithm_reads_ring_without_allocating()
+    print("FRAME RING TEST PASSED")
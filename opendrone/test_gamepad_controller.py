@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test the evdev gamepad controller against a recorded input_event stream:
+axis scaling, one send per SYN_REPORT, split reads, SYN_DROPPED handling,
+the selector loop reading from a FIFO in place of /dev/input/event*, and
+the sticks going to rest when the pad is unplugged.
+"""
+
+import sys
+import os
+import errno
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from control_fakes import FakeClient
+from controllers import gamepad_controller
+from controllers.gamepad_controller import (GamepadController, INPUT_EVENT, EV_SYN, EV_KEY, EV_ABS,
+                                            SYN_REPORT, SYN_DROPPED, ABS_X, ABS_RX, ABS_RY, ABS_RZ, BTN_START)
+from controllers.stick_curves import THROTTLE, YAW
+
+
+def _events(*events):
+    return b''.join(INPUT_EVENT.pack(0, 0, ev_type, code, value) for ev_type, code, value in events)
+
+
+SYN = (EV_SYN, SYN_REPORT, 0)
+
+# Recorded session: trigger half way, right stick full right and up, left stick left, START pressed
+RECORDING = _events(
+    (EV_ABS, ABS_RZ, 128), (EV_ABS, ABS_RX, 32767), SYN,
+    (EV_ABS, ABS_RY, -32768), (EV_ABS, ABS_X, -32768), SYN,
+    (EV_KEY, BTN_START, 1), SYN,
+    (EV_KEY, BTN_START, 2), (EV_KEY, BTN_START, 0), SYN,
+)
+
+
+def _opened(client, **kwargs):
+    controller = GamepadController(client, device=os.devnull, **kwargs)
+    assert controller.open()  # Not evdev: falls back to the default axis ranges
+    return controller
+
+
+def test_recorded_stream():
+    client = FakeClient()
+    controller = _opened(client, max_send_hz=0)
+
+    # Split mid-event to check partial reads are reassembled
+    controller.handle_events(RECORDING[:37], 1.0)
+    controller.handle_events(RECORDING[37:], 1.0)
+    controller.close()
+
+    assert controller.reports == 4
+    assert client.channels[:4] == [2047, 2047, 1028, 0]
+    assert len(client.sent) == 2, "one send per changed report"
+    assert client.sent[0][:4] == [2047, 1024, 1028, 1024]
+    assert client.armed, "START press arms, repeat and release do not toggle"
+
+
+def test_dropped_events_are_skipped():
+    client = FakeClient()
+    controller = _opened(client, max_send_hz=0)
+    controller.handle_events(_events(
+        (EV_ABS, ABS_RX, 32767), (EV_SYN, SYN_DROPPED, 0),
+        (EV_ABS, ABS_RX, -32768), SYN,  # Incomplete report: ignored
+        (EV_ABS, ABS_RY, 32767), SYN,
+    ), 1.0)
+    controller.close()
+    assert controller.resyncs == 1
+    assert client.channels[0] == 2047
+    assert client.channels[1] == 0
+
+
+def test_disarm_drops_throttle():
+    client = FakeClient()
+    controller = _opened(client, max_send_hz=0)
+    controller.handle_events(_events((EV_ABS, ABS_RZ, 200), SYN, (EV_KEY, BTN_START, 1), SYN), 1.0)
+    assert client.armed and client.channels[THROTTLE] > 0
+
+    # Disarm with the trigger still held: the zeroed throttle is not sent back on the next report
+    controller.handle_events(_events((EV_KEY, BTN_START, 0), SYN, (EV_KEY, BTN_START, 1), SYN,
+                                     (EV_ABS, ABS_X, 32767), SYN), 1.1)
+    assert not client.armed
+    assert controller.sticks[THROTTLE] == 0
+    assert client.sent[-1][THROTTLE] == 0 and client.sent[-1][YAW] == 2047
+
+    # Throttle only comes back when the trigger moves
+    controller.handle_events(_events((EV_ABS, ABS_RZ, 100), SYN), 1.2)
+    controller.close()
+    assert client.sent[-1][THROTTLE] > 0
+
+
+def test_selector_loop_reads_fifo():
+    path = os.path.join(tempfile.mkdtemp(), 'event0')
+    os.mkfifo(path)
+    client = FakeClient()
+    controller = GamepadController(client, device=path, max_send_hz=0)
+    assert controller.open()
+    writer = os.open(path, os.O_WRONLY)
+    assert controller.start()
+
+    os.write(writer, RECORDING)
+    os.close(writer)  # End of recording stops the loop
+    controller.gamepad_thread.join(timeout=2.0)
+    assert not controller.gamepad_thread.is_alive()
+    controller.stop()
+
+    assert controller.reports == 4
+    assert client.sent[-2][:4] == [2047, 2047, 1028, 0]
+    assert client.channels[:4] == [1024, 1024, 0, 1024], "end of input leaves the sticks at rest"
+    assert client.armed
+    os.unlink(path)
+
+
+def test_unplugged_pad_releases_sticks():
+    path = os.path.join(tempfile.mkdtemp(), 'event0')
+    os.mkfifo(path)
+    client = FakeClient()
+    controller = GamepadController(client, device=path, max_send_hz=10)
+    assert controller.open()
+    writer = os.open(path, os.O_WRONLY)
+
+    read = gamepad_controller.os.read
+    unplugged = []
+
+    def read_until_unplugged(fd, size):
+        if unplugged:
+            raise OSError(errno.ENODEV, "No such device")
+        unplugged.append(True)
+        return read(fd, size)
+
+    gamepad_controller.os.read = read_until_unplugged
+    try:
+        assert controller.start()
+        os.write(writer, _events((EV_ABS, ABS_RZ, 200), (EV_ABS, ABS_RX, 32767), SYN))
+        controller.gamepad_thread.join(timeout=2.0)
+        assert not controller.gamepad_thread.is_alive()
+    finally:
+        gamepad_controller.os.read = read
+        os.close(writer)
+        controller.stop()
+        os.unlink(path)
+
+    assert client.sent[0][:4] == [2047, 1024, 1605, 1024]
+    # Sent straight away, inside the 100 ms rate cap
+    assert client.sent[-1][:4] == [1024, 1024, 0, 1024]
+
+
+if __name__ == "__main__":
+    test_recorded_stream()
+    test_dropped_events_are_skipped()
+    test_disarm_drops_throttle()
+    test_selector_loop_reads_fifo()
+    test_unplugged_pad_releases_sticks()
+    print("GAMEPAD CONTROLLER TEST PASSED")
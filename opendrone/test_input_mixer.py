@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test the input mixer: per-axis priority, stale-input timeouts, takeover
+deadband, one coalesced send per tick, and building it from config.yml.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import load_config
+from control_fakes import FakeClient
+from controllers.keyboard_controller import KeyboardController
+from controllers.mixer import InputMixer, active_sources
+
+
+def _vector(roll, pitch, throttle, yaw):
+    return [roll, pitch, throttle, yaw] + [1024] * 12
+
+
+def test_priority_and_stale_timeout():
+    client = FakeClient()
+    mixer = InputMixer(client, ['radio', 'programatic'], ['radio', 'programatic'],
+                       axes={'throttle': ['programatic', 'radio']},
+                       stale_after={'radio': 0.1, 'programatic': 0.5}, max_send_hz=0)
+    radio = mixer.source('radio')
+    program = mixer.source('programatic')
+
+    program.update(_vector(900, 900, 500, 900), now=0.0)
+    radio.update(_vector(1500, 1500, 1500, 1500), now=0.0)
+    mixer._tick(0.01)
+    assert client.channels[:4] == [1500, 1500, 500, 1500], "radio wins sticks, programatic wins throttle"
+    assert mixer.owner[:4] == ['radio', 'radio', 'programatic', 'radio']
+    assert len(client.sent) == 1
+
+    # Radio goes quiet: the programatic source takes over its axes
+    mixer._tick(0.2)
+    assert client.channels[:4] == [900, 900, 500, 900]
+    assert len(client.sent) == 2
+
+    # Both stale: sticks center and throttle drops to zero instead of holding
+    mixer._tick(1.0)
+    assert client.channels[:4] == [1024, 1024, 0, 1024]
+    assert mixer.owner[:4] == [None] * 4
+    assert mixer.stale_ticks == 1
+    assert len(client.sent) == 3
+    mixer._tick(1.01)
+    assert len(client.sent) == 3, "unchanged merged vector is not resent"
+
+
+def test_all_sources_stale_failsafe():
+    client = FakeClient()
+    mixer = InputMixer(client, ['keyboard', 'gamepad', 'radio'], ['radio', 'gamepad', 'keyboard'],
+                       axes={'aux2': ['radio']},
+                       stale_after={'keyboard': 0.2, 'gamepad': 0.2, 'radio': 0.1}, max_send_hz=0)
+    for name in ('keyboard', 'gamepad', 'radio'):
+        vector = _vector(1800, 300, 1700, 1400)
+        vector[5] = 2000  # aux2
+        mixer.source(name).update(vector, now=0.0)
+    mixer._tick(0.05)
+    assert client.channels[:6] == [1800, 300, 1700, 1400, 1024, 2000]
+
+    # Every controller drops out mid-flight
+    mixer._tick(0.5)
+    assert client.channels[:6] == [1024, 1024, 0, 1024, 1024, 1024]
+    assert mixer.owner[:4] == [None] * 4 and mixer.owner[5] is None
+    assert client.sent[-1][:4] == [1024, 1024, 0, 1024], "the failsafe vector is sent"
+
+    # A source coming back takes over again
+    mixer.source('keyboard').update(_vector(1100, 1024, 400, 1024), now=0.6)
+    mixer._tick(0.6)
+    assert client.channels[:4] == [1100, 1024, 400, 1024]
+
+
+def test_keyboard_takeover_and_aux_passthrough():
+    client = FakeClient()
+    mixer = InputMixer(client, ['keyboard', 'programatic'], ['keyboard', 'programatic'],
+                       takeover_deadband={'keyboard': 50}, max_send_hz=0)
+    keyboard = mixer.source('keyboard')
+    program = mixer.source('programatic')
+
+    # The keyboard controller drives its source exactly like a client
+    controller = KeyboardController(keyboard, max_send_hz=0)
+    controller._tick(0.0)
+    program.update(_vector(1100, 1100, 800, 1100), now=0.0)
+    mixer._tick(0.0)
+    assert client.channels[:4] == [1100, 1100, 800, 1100], "keyboard at rest does not take over"
+
+    keyboard.channels[0] = 1300
+    keyboard.send_channels()
+    mixer._tick(0.01)
+    assert client.channels[0] == 1300 and mixer.owner[0] == 'keyboard'
+
+    # Arming goes straight to the client and Aux1 is not mixed
+    keyboard.arm_drone()
+    mixer._tick(0.02)
+    assert client.armed and client.channels[4] == 2047
+
+
+def test_from_config():
+    config = load_config()
+    config['active_controllers'] = {'keyboard': True, 'radio': True, 'programatic': 'none'}
+    assert active_sources(config['active_controllers']) == ['keyboard', 'radio']
+
+    mixer = InputMixer.from_config(FakeClient(), config)
+    assert sorted(mixer.sources) == ['keyboard', 'radio']
+    assert [index for index, chain in mixer.rules] == [0, 1, 2, 3]
+    assert [source.name for source in mixer.rules[0][1]] == ['radio', 'keyboard']
+
+
+if __name__ == "__main__":
+    test_priority_and_stale_timeout()
+    test_all_sources_stale_failsafe()
+    test_keyboard_takeover_and_aux_passthrough()
+    test_from_config()
+    print("INPUT MIXER TEST PASSED")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test reduced-resolution decoding: the JPEG size is read from the header,
+the largest DCT scale that still covers the consumer's size is chosen, and
+the pipeline delivers frames in the requested size and colour.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+import numpy as np
+
+from controllers.jpeg_decode import jpeg_size, reduced_scale, decode_flag
+from controllers.view import VideoStreamOpenCV
+
+
+def _jpeg(width, height):
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    image[:, :, 2] = 200  # Red
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+def test_jpeg_size_from_header():
+    assert jpeg_size(_jpeg(1280, 720)) == (1280, 720)
+    assert jpeg_size(_jpeg(321, 241)) == (321, 241)
+    progressive = cv2.imencode('.jpg', np.zeros((90, 160, 3), np.uint8), [cv2.IMWRITE_JPEG_PROGRESSIVE, 1])[1]
+    assert jpeg_size(progressive.tobytes()) == (160, 90)
+    assert jpeg_size(b'\xff\xd8\xff\xd9') is None
+    assert jpeg_size(b'\xff\xd8garbage-not-a-segment') is None
+
+
+def test_scale_choice():
+    assert reduced_scale((1280, 960), (640, 480)) == 2
+    assert reduced_scale((1280, 720), (640, 480)) == 1  # 1/2 would be 360 rows, below the target
+    assert reduced_scale((1920, 1080), (320, 240)) == 4
+    assert reduced_scale((2560, 1920), (320, 240)) == 8
+    assert reduced_scale((640, 480), (640, 480)) == 1
+    assert decode_flag((1280, 960), (640, 480)) == cv2.IMREAD_REDUCED_COLOR_2
+    assert decode_flag((1280, 960), (320, 240), grayscale=True) == cv2.IMREAD_REDUCED_GRAYSCALE_4
+    assert decode_flag(None, (320, 240), grayscale=True) == cv2.IMREAD_GRAYSCALE
+
+
+def test_pipeline_decodes_at_consumer_size():
+    color = VideoStreamOpenCV(headless=True)
+    slot = color._decode_frame(_jpeg(1280, 960))
+    assert color.backend.flag_for((1280, 960)) == cv2.IMREAD_REDUCED_COLOR_2
+    frame = color.ring.frames[slot]
+    assert frame.shape == (480, 640, 3)
+    assert abs(int(frame[100, 100, 2]) - 200) <= 3
+
+    gray = VideoStreamOpenCV(headless=True, frame_width=160, frame_height=120, grayscale=True)
+    delivered = []
+    gray.subscribe(lambda frame_id, frame: delivered.append((frame_id, frame.shape, int(frame[50, 50]))))
+    gray._deliver(1, gray._decode_frame(_jpeg(1280, 960)))
+    assert gray.backend.flag_for((1280, 960)) == cv2.IMREAD_REDUCED_GRAYSCALE_8
+    frame_id, shape, value = delivered[0]
+    assert (frame_id, shape) == (1, (120, 160))
+    assert abs(value - 60) <= 3  # Luma of pure red 200
+
+    # Camera switches resolution mid-stream: the scale follows, per frame
+    slot = gray._decode_frame(_jpeg(320, 240))
+    assert gray.ring.frames[slot].shape == (120, 160)
+    assert gray.backend.flags == {(1280, 960): cv2.IMREAD_REDUCED_GRAYSCALE_8,
+                                  (320, 240): cv2.IMREAD_REDUCED_GRAYSCALE_2}
+
+
+if __name__ == "__main__":
+    test_jpeg_size_from_header()
+    test_scale_choice()
+    test_pipeline_decodes_at_consumer_size()
+    print("JPEG DECODE TEST PASSED")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test the event-driven keyboard controller with synthetic key events:
+held keys act every tick, action keys fire once per press and debounce
+per key without blocking other input.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import keyboard
+
+from control_fakes import FakeClient
+from controllers.keyboard_controller import KeyboardController
+from controllers.stick_curves import AxisCurve, StickShaper, build_table, ROLL, THROTTLE
+
+
+def _event(name, down):
+    return keyboard.KeyboardEvent(keyboard.KEY_DOWN if down else keyboard.KEY_UP, 0, name=name)
+
+
+def test_held_keys_and_per_key_debounce():
+    client = FakeClient()
+    controller = KeyboardController(client, max_send_hz=0)
+    keys = controller.keys
+
+    keys.on_event(_event('w', True))
+    keys.on_event(_event('space', True))
+    keys.on_event(_event('space', True))  # OS auto-repeat: not a new press
+    controller._tick(10.0)
+    assert client.channels[2] == controller.THROTTLE_STEP
+    assert client.armed
+
+    # Space still held: no re-trigger, but throttle keeps climbing
+    controller._tick(10.01)
+    assert client.channels[2] == 2 * controller.THROTTLE_STEP
+    assert client.armed
+
+    # Quick re-press inside the debounce window is ignored, throttle unaffected
+    keys.on_event(_event('space', False))
+    keys.on_event(_event('space', True))
+    controller._tick(10.1)
+    assert client.armed
+    assert client.channels[2] == 3 * controller.THROTTLE_STEP
+
+    # A tap shorter than a tick is still seen once the window has passed
+    keys.on_event(_event('space', False))
+    keys.on_event(_event('space', True))
+    keys.on_event(_event('space', False))
+    keys.on_event(_event('w', False))
+    controller._tick(10.5)
+    assert not client.armed
+    assert client.channels[2] == 0, "disarming drops the throttle"
+    assert keys.mask == 0
+
+
+def test_one_coalesced_send_per_tick():
+    client = FakeClient()
+    controller = KeyboardController(client, max_send_hz=50)
+    keys = controller.keys
+
+    for key in ('w', 'd', 'up', 'right'):
+        keys.on_event(_event(key, True))
+    controller._tick(1.0)
+    assert len(client.sent) == 1, "four axes must produce one update"
+    assert client.channels[:4] == [1024 + controller.STEP_SIZE, 1024 + controller.STEP_SIZE,
+                                   controller.THROTTLE_STEP, 1024 + controller.YAW_STEP]
+
+    controller._tick(1.01)  # Inside the 20 ms rate cap: held back
+    assert len(client.sent) == 1
+    controller._tick(1.02)  # Deferred change goes out once allowed
+    assert len(client.sent) == 2
+
+    for key in ('w', 'd', 'up', 'right'):
+        keys.on_event(_event(key, False))
+    controller._tick(1.1)
+    controller._tick(1.2)
+    assert len(client.sent) == 2, "unchanged vector must not be resent"
+
+
+def test_arm_sends_deferred_channels_first():
+    client = FakeClient()
+    controller = KeyboardController(client, max_send_hz=50)
+    keys = controller.keys
+
+    keys.on_event(_event('w', True))
+    controller._tick(1.0)
+    assert len(client.sent) == 1
+    # Throttle change held back by the rate cap, then space in the same window
+    keys.on_event(_event('space', True))
+    controller._tick(1.01)
+    assert client.armed
+    assert len(client.sent) == 2 and client.sent[-1][2] == 2 * controller.THROTTLE_STEP, "deferred change sent before arming"
+
+    # disarmDrone zeroes throttle on the server; the local stick follows instead of resending the old throttle
+    keys.on_event(_event('w', False))
+    keys.on_event(_event('space', False))
+    keys.on_event(_event('space', True))
+    controller._tick(1.5)
+    assert not client.armed
+    assert controller.sticks[THROTTLE] == 0 and client.channels[THROTTLE] == 0
+    controller._tick(1.6)
+    controller._tick(1.7)
+    assert len(client.sent) == 2, "nothing to send: the server already has throttle 0"
+
+    # Re-arming does not bring the old throttle back
+    keys.on_event(_event('space', False))
+    keys.on_event(_event('space', True))
+    controller._tick(2.0)
+    assert client.armed and client.channels[THROTTLE] == 0
+    keys.on_event(_event('w', True))
+    controller._tick(2.1)
+    assert client.sent[-1][THROTTLE] == controller.THROTTLE_STEP
+
+
+def test_stick_curve_tables():
+    # Default curves are a straight line
+    shaper = StickShaper()
+    assert [shaper.shape(ROLL, raw) for raw in (0, 512, 1024, 2047)] == [0, 512, 1024, 2047]
+    assert [shaper.shape(THROTTLE, raw) for raw in (0, 1000, 2047)] == [0, 1000, 2047]
+
+    table = build_table(AxisCurve(expo=0.5, deadband=20, min_out=100, max_out=1900))
+    assert len(table) == 2048
+    assert table[1024 - 20] == table[1024 + 20] == 1024, "deadband maps to center"
+    assert table[0] == 100 and table[2047] == 1900, "endpoints clamp the output"
+    assert table[1524] - 1024 < 500, "expo softens the response near center"
+    assert all(a <= b for a, b in zip(table, table[1:])), "curve must be monotonic"
+
+    # Tables are rebuilt only when the curve actually changes
+    curve = AxisCurve(expo=0.3)
+    assert shaper.configure(ROLL, curve)
+    assert not shaper.configure(ROLL, AxisCurve(expo=0.3))
+    assert shaper.configure(ROLL, AxisCurve(expo=0.4))
+
+
+def test_controller_shapes_sticks():
+    client = FakeClient()
+    controller = KeyboardController(client, max_send_hz=0, curves={ROLL: AxisCurve(rate=0.5)})
+    controller.keys.on_event(_event('d', True))
+    for i in range(40):
+        controller._tick(1.0 + i * 0.01)
+    assert controller.sticks[ROLL] == 2047
+    assert client.channels[ROLL] == 1024 + 512, "full stick at half rate"
+
+
+if __name__ == "__main__":
+    test_held_keys_and_per_key_debounce()
+    test_one_coalesced_send_per_tick()
+    test_arm_sends_deferred_channels_first()
+    test_stick_curve_tables()
+    test_controller_shapes_sticks()
+    print("KEYBOARD CONTROLLER TEST PASSED")
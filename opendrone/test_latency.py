@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the HDR-style latency histogram and the getMetrics RPC.
+"""
+
+import sys
+import os
+import random
+from concurrent import futures
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import grpc
+
+import drone_control_pb2_grpc
+from client import DroneClient
+from control_fakes import RecordingSerial
+from latency import LatencyHistogram, bucket_index, bucket_value
+from server import DroneControlServicer
+
+
+def test_bucket_round_trip():
+    for value in [0, 1, 63, 127, 128, 129, 1000, 123456, 10 ** 9, 2 ** 39]:
+        low = bucket_value(bucket_index(value))
+        high = bucket_value(bucket_index(value) + 1)
+        assert low <= value < high
+        assert high - low <= max(1, value // 64)
+
+
+def test_percentiles_within_precision():
+    random.seed(1)
+    samples = [random.randint(1_000, 5_000_000) for _ in range(20000)]
+    hist = LatencyHistogram('test')
+    for s in samples:
+        hist.record(s)
+    ordered = sorted(samples)
+    for pct in (50, 99, 99.9):
+        exact = ordered[int(len(ordered) * pct / 100.0) - 1]
+        assert abs(hist.percentile(pct) - exact) / exact < 0.02
+    assert hist.max == ordered[-1]
+
+
+def test_get_metrics_rpc():
+    servicer = DroneControlServicer()
+    servicer.serial_connection = RecordingSerial()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+    drone_control_pb2_grpc.add_DroneControlServicer_to_server(servicer, server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    client = DroneClient(host='127.0.0.1', port=port)
+    try:
+        assert client.connect()
+        for _ in range(50):
+            client.send_channels()
+        metrics = client.get_metrics(recent_updates=5)
+
+        end_to_end = metrics['latencies']['end_to_end']
+        assert end_to_end['count'] == 50
+        assert 0 < end_to_end['p50_us'] <= end_to_end['p99_us'] <= end_to_end['max_us']
+
+        update_ids = [trace[0] for trace in metrics['recent']]
+        assert update_ids == [46, 47, 48, 49, 50]
+        _, sent, received, encoded, written = metrics['recent'][-1]
+        assert sent <= received <= encoded <= written
+    finally:
+        client.disconnect()
+        server.stop(0)
+
+
+if __name__ == "__main__":
+    test_bucket_round_trip()
+    test_percentiles_within_precision()
+    test_get_metrics_rpc()
+    print("LATENCY TEST PASSED")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test the Prometheus exporter: RPCs through the interceptor and frames on the
+serial link show up when /metrics is scraped, in the text exposition format.
+"""
+
+import sys
+import os
+import urllib.error
+import urllib.request
+from concurrent import futures
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import grpc
+
+import drone_control_pb2_grpc
+from client import DroneClient
+from control_fakes import RecordingSerial
+from metrics_exporter import MetricsInterceptor, ServerMetrics, start_metrics_server
+from server import DroneControlServicer
+
+
+def _parse(text):
+    """{sample name with labels: value}, checking every sample follows its HELP and TYPE lines"""
+    samples = {}
+    types = {}
+    for line in text.splitlines():
+        if line.startswith('# HELP '):
+            continue
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            assert kind in ('counter', 'gauge', 'histogram')
+            types[name] = kind
+            continue
+        name, value = line.rsplit(' ', 1)
+        family = name.split('{', 1)[0]
+        if types.get(family) is None:
+            for suffix in ('_bucket', '_sum', '_count'):
+                if family.endswith(suffix) and types.get(family[:-len(suffix)]) == 'histogram':
+                    break
+            else:
+                assert False, f"{name} has no TYPE line"
+        samples[name] = float(value)
+    return samples
+
+
+def test_scrape_after_rpcs():
+    metrics = ServerMetrics()
+    servicer = DroneControlServicer(metrics=metrics)
+    servicer.serial_connection = RecordingSerial()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2), interceptors=[MetricsInterceptor(metrics)])
+    drone_control_pb2_grpc.add_DroneControlServicer_to_server(servicer, server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    httpd = start_metrics_server(metrics, '127.0.0.1', 0)
+    url = f'http://127.0.0.1:{httpd.server_address[1]}'
+    client = DroneClient(host='127.0.0.1', port=port)
+    try:
+        assert client.connect()
+        for _ in range(5):
+            client.send_channels()
+        client.arm_drone()
+
+        with urllib.request.urlopen(f'{url}/metrics', timeout=5) as response:
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            text = response.read().decode()
+        try:
+            urllib.request.urlopen(f'{url}/other', timeout=5)
+            assert False, "only /metrics is served"
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+    finally:
+        client.disconnect()
+        server.stop(0)
+        httpd.shutdown()
+        httpd.server_close()
+
+    assert text.endswith('\n')
+    samples = _parse(text)
+    assert samples['opendrone_rpc_total{method="setChannels"}'] == 5
+    assert samples['opendrone_rpc_total{method="armDrone"}'] == 1
+    assert samples['opendrone_rpc_errors_total{method="setChannels"}'] == 0
+    assert samples['opendrone_tx_frames_total'] == 6
+    assert samples['opendrone_serial_errors_total'] == 0
+    assert samples['opendrone_active_rpcs'] == 0
+
+    # Buckets are cumulative and end in +Inf == _count
+    buckets = [value for name, value in samples.items()
+               if name.startswith('opendrone_rpc_duration_seconds_bucket{method="setChannels",')]
+    assert len(buckets) == len(metrics.rpc_seconds['setChannels'].bounds) + 1
+    assert buckets == sorted(buckets)
+    assert samples['opendrone_rpc_duration_seconds_bucket{method="setChannels",le="+Inf"}'] == 5
+    assert samples['opendrone_rpc_duration_seconds_count{method="setChannels"}'] == 5
+    assert samples['opendrone_rpc_duration_seconds_sum{method="setChannels"}'] > 0
+    assert samples['opendrone_serial_write_seconds_bucket{le="+Inf"}'] == 6
+    assert samples['opendrone_serial_write_seconds_count'] == 6
+
+
+if __name__ == "__main__":
+    test_scrape_after_rpcs()
+    print("METRICS EXPORTER TEST PASSED")
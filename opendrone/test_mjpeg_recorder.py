@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test the MJPEG passthrough recorder: frames are stored byte-for-byte as
+received, the index locates any frame directly, and the headless pipeline
+records while it streams.
+"""
+
+import sys
+import os
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from controllers.recorder import MjpegRecorder, read_index, read_frame, frame_count
+from controllers.view import VideoStreamOpenCV
+from video_fakes import FakeVideoSerial, jpeg_frames
+
+
+def test_recorder_and_index():
+    path = os.path.join(tempfile.mkdtemp(), 'flight.mjpeg')
+    jpegs = jpeg_frames(10, 80, 60, noise=False)
+    recorder = MjpegRecorder(path)
+    for i, jpeg in enumerate(jpegs):
+        recorder.write(i + 1, jpeg, 1000.0 + i / 30)
+    recorder.close()
+
+    with open(path, 'rb') as f:
+        assert f.read() == b''.join(jpegs), "raw bytes, no re-encode"
+    index = read_index(path)
+    assert frame_count(path) == 10
+    assert [record[0] for record in index] == list(range(1, 11))
+    assert index[3][1] == 1000.0 + 3 / 30
+    offset = 0
+    for (_, _, record_offset, length), jpeg in zip(index, jpegs):
+        assert (record_offset, length) == (offset, len(jpeg))
+        offset += length
+    assert read_frame(path, 7) == jpegs[7]
+
+
+def test_pipeline_records_while_streaming():
+    path = os.path.join(tempfile.mkdtemp(), 'stream.mjpeg')
+    jpegs = jpeg_frames(5, 80, 60, noise=False)
+    stream = VideoStreamOpenCV(headless=True)
+    stream.serial_connection = FakeVideoSerial(b'noise' + b''.join(jpegs), chunk=700)
+    done = threading.Event()
+    stream.subscribe(lambda frame_id, frame: done.set() if frame_id == 5 else None)
+
+    stream.start_recording(path)
+    assert stream.start_stream()
+    assert done.wait(5.0)
+    stream.stop_stream()  # Also closes the recording
+
+    assert stream.recorder is None
+    assert [read_frame(path, n) for n in range(5)] == jpegs
+    assert [record[0] for record in read_index(path)] == [1, 2, 3, 4, 5]
+
+
+if __name__ == "__main__":
+    test_recorder_and_index()
+    test_pipeline_records_while_streaming()
+    print("MJPEG RECORDER TEST PASSED")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the RadioMaster -> CRSF passthrough: tick mapping, frames written on the
+reader thread, live state for observers, and client RPCs (startLink and
+stopLink included) and shared-memory updates kept off the serial link while
+active.
+"""
+
+import sys
+import os
+import time
+import uuid
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import drone_control_pb2
+from control_fakes import FakeHidDevice, RecordingSerial
+from controllers.radiomaster_controller import RadioMasterReader, ControlState, REPORT
+from passthrough import RadioPassthrough, to_ticks
+from server import CRSFProtocol, DroneControlServicer
+from shm_control import ControlBlock, ControlBlockWriter
+
+
+def test_tick_mapping():
+    assert to_ticks([-1.0, -0.5, 0.0, 0.5, 1.0]) == (0, 512, 1024, 1536, 2047)
+    assert to_ticks([-32768 / 32767]) == (0,), "most negative HID value stays in the table"
+
+
+def test_passthrough_writes_and_publishes():
+    servicer = DroneControlServicer()
+    servicer.serial_connection = RecordingSerial()
+    sticks = [0, 0, -32767, 0, 32767] + [0] * 11  # Aux1 high: armed
+    device = FakeHidDevice([REPORT.pack(1, seq, 0, *sticks) for seq in range(1, 6)])
+    passthrough = RadioPassthrough(servicer, RadioMasterReader(device=device))
+
+    assert passthrough.start()
+    assert device.done.wait(5.0)
+    passthrough.stop()
+
+    expected = (1024, 1024, 0, 1024, 2047) + (1024,) * 11
+    assert passthrough.frames == 5
+    assert servicer.serial_connection.frames == [bytes(CRSFProtocol.create_crsf_frame(expected))] * 5
+    assert servicer.state.channels == expected
+    assert servicer.armed
+    assert servicer.latency.summary()['radio_to_write'][0] == 5
+    assert not servicer.passthrough
+
+
+def test_client_writes_ignored_while_active():
+    block = ControlBlock(f"opendrone_test_{uuid.uuid4().hex[:8]}")
+    writer = ControlBlockWriter(block.name)
+    servicer = DroneControlServicer(block)
+    servicer.serial_connection = RecordingSerial()
+    passthrough = RadioPassthrough(servicer, RadioMasterReader(device=FakeHidDevice([])))
+    servicer.passthrough = True
+    servicer._start_tx_loop()
+    try:
+        state = ControlState()
+        state.channels[0] = 1.0
+        passthrough.on_state(state)
+        servicer.setChannels(drone_control_pb2.SetChannelsReq(channels=[0] * 16), None)
+        servicer.armDrone(None, None)
+        servicer.disarmDrone(None, None)
+        servicer.resetControls(None, None)
+        writer.publish([100] * 16)
+        time.sleep(0.05)  # Several TX loop ticks
+    finally:
+        servicer._stop_tx_loop()
+        writer.close()
+        block.close()
+    assert servicer.state.channels[:5] == (2047, 1024, 1024, 1024, 1024)
+    assert not servicer.state.armed
+    assert servicer.serial_connection.frames == [CRSFProtocol.create_crsf_frame(servicer.state.channels)]
+
+
+def test_link_rpcs_ignored_while_active():
+    servicer = DroneControlServicer()
+    link = servicer.serial_connection = RecordingSerial()
+    with servicer.lock:
+        servicer._publish(connected=True)
+    passthrough = RadioPassthrough(servicer, RadioMasterReader(device=FakeHidDevice([])))
+    servicer.passthrough = True
+
+    # An observer exiting (DroneClient.stop) or starting up must leave the radio's link alone
+    servicer.stopLink(None, None)
+    response = servicer.startLink(drone_control_pb2.StartLinkReq(port='/dev/does-not-exist', baud_rate=420000), None)
+    assert response.success
+    assert servicer.serial_connection is link and link.is_open
+    assert servicer.connected
+
+    passthrough.on_state(ControlState())
+    assert passthrough.frames == 1 and passthrough.unwritten == 0
+
+
+if __name__ == "__main__":
+    test_tick_mapping()
+    test_passthrough_writes_and_publishes()
+    test_client_writes_ignored_while_active()
+    test_link_rpcs_ignored_while_active()
+    print("PASSTHROUGH TEST PASSED")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test the RadioMaster HID reader against a fake device: reports are unpacked
+into the reused ControlState, delivered from the reader thread, and gaps in
+the sequence counter are counted as drops.
+"""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from control_fakes import FakeHidDevice
+from controllers.radiomaster_controller import RadioMasterReader, ControlState, REPORT
+
+
+def _report(sequence, channels=None, switches=0):
+    channels = channels or [0] * 16
+    return REPORT.pack(1, sequence & 0xFFFF, switches, *channels)
+
+
+def test_unpack_and_sequence_gaps():
+    reader = RadioMasterReader(device=FakeHidDevice([]))
+    state = reader.state
+
+    assert reader.handle_report(_report(10, [32767, -32767] + [0] * 14, switches=0b101), 1.0)
+    assert state.channels[0] == 1.0 and state.channels[1] == -1.0 and state.channels[2] == 0.0
+    assert state.switches == 0b101 and state.sequence == 10 and state.timestamp == 1.0
+
+    assert reader.handle_report(_report(11), 1.002)
+    assert reader.state is state, "state object is reused"
+    assert reader.dropped == 0
+
+    reader.handle_report(_report(15), 1.004)
+    assert reader.dropped == 3
+
+    # Counter wraps at 16 bits
+    reader.handle_report(_report(0xFFFF), 1.006)
+    reader.handle_report(_report(0x10000 + 1), 1.008)
+    assert reader.dropped == 3 + (0xFFFF - 15 - 1) + 1
+
+    assert not reader.handle_report(b'\x01\x00', 1.01)
+    assert reader.bad_reports == 1
+    assert reader.reports == 5
+
+
+def test_reader_thread_delivers_every_report():
+    reports = [_report(seq, [seq] * 16) for seq in range(200)]
+    del reports[50]  # One lost on the way
+    device = FakeHidDevice(reports, interval=0.0005)
+
+    seen = []
+    done = threading.Event()
+
+    def on_state(state):
+        seen.append(state.sequence)
+        if state.sequence == 199:
+            done.set()
+
+    reader = RadioMasterReader(device=device, on_state=on_state)
+    assert reader.start()
+    assert done.wait(5.0)
+    reader.stop()
+
+    assert seen == [seq for seq in range(200) if seq != 50]
+    assert reader.dropped == 1
+    assert reader.state.channels[0] == 199 / 32767
+    assert device.closed
+    assert not reader.reader_thread.is_alive()
+    assert isinstance(reader.state.copy(), ControlState)
+
+
+if __name__ == "__main__":
+    test_unpack_and_sequence_gaps()
+    test_reader_thread_delivers_every_report()
+    print("RADIOMASTER READER TEST PASSED")
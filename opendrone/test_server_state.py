@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test the snapshot-based servicer state: getStatus must not wait on the
+serial lock, and every writer must publish a new, consistent snapshot.
+"""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from google.protobuf import empty_pb2
+
+import drone_control_pb2
+from server import DroneControlServicer
+
+
+def test_get_status_does_not_block_on_writer():
+    servicer = DroneControlServicer()
+    result = {}
+
+    with servicer.lock:  # Simulate a writer stuck in serial.write()
+        reader = threading.Thread(
+            target=lambda: result.update(status=servicer.getStatus(empty_pb2.Empty(), None))
+        )
+        reader.start()
+        reader.join(timeout=1.0)
+        assert not reader.is_alive(), "getStatus blocked on the serial lock"
+
+    assert list(result['status'].channels) == servicer.channels
+
+
+def test_writers_publish_new_snapshots():
+    servicer = DroneControlServicer()
+    initial = servicer.state
+
+    servicer.setChannels(drone_control_pb2.SetChannelsReq(channels=[1500] * 4), None)
+    after_set = servicer.state
+    assert after_set.version > initial.version
+    assert after_set.channels == (1500,) * 4 + (1024,) * 12
+    assert initial.channels[0] == 1024, "old snapshot must not be mutated"
+
+    servicer.armDrone(empty_pb2.Empty(), None)
+    status = servicer.getStatus(empty_pb2.Empty(), None)
+    assert status.armed
+    assert status.channels[4] == 2047
+    assert servicer.state.version > after_set.version
+
+
+if __name__ == "__main__":
+    test_get_status_does_not_block_on_writer()
+    test_writers_publish_new_snapshots()
+    print("SERVER STATE TEST PASSED")
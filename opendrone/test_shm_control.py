@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test the shared-memory control block: seqlock round trip, change detection
+and torn-write rejection.
+"""
+
+import sys
+import os
+import uuid
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from shm_control import ControlBlock, ControlBlockWriter, ControlBlockReader, _SEQ
+
+
+def _block():
+    return ControlBlock(f"opendrone_test_{uuid.uuid4().hex[:8]}")
+
+
+def test_publish_and_poll():
+    block = _block()
+    try:
+        writer = ControlBlockWriter(block.name)
+        reader = ControlBlockReader(block.name)
+
+        assert reader.poll() is None, "nothing published yet"
+
+        writer.publish([1500, 1400, 200, 1024])
+        seq, timestamp_ns, channels = reader.poll()
+        assert seq == 2
+        assert timestamp_ns > 0
+        assert channels == (1500, 1400, 200, 1024) + (1024,) * 12
+
+        assert reader.poll() is None, "same vector must not be reported twice"
+
+        writer.publish([5000, -3] + [1024] * 14)
+        _, _, channels = reader.poll()
+        assert channels[:2] == (2047, 0), "values are clamped to 11 bits"
+
+        writer.close()
+        reader.close()
+    finally:
+        block.close()
+
+
+def test_reader_rejects_write_in_progress():
+    block = _block()
+    try:
+        writer = ControlBlockWriter(block.name)
+        writer.publish([1200] * 16)
+        reader = ControlBlockReader(block.name, max_retries=5)
+
+        _SEQ.pack_into(block.shm.buf, 0, writer.seq + 1)  # Writer stalled mid-update
+        assert reader.read() is None
+        assert reader.poll() is None
+
+        _SEQ.pack_into(block.shm.buf, 0, writer.seq)
+        assert reader.poll()[2] == (1200,) * 16
+
+        writer.close()
+        reader.close()
+    finally:
+        block.close()
+
+
+if __name__ == "__main__":
+    test_publish_and_poll()
+    test_reader_rejects_write_in_progress()
+    print("SHARED-MEMORY CONTROL TEST PASSED")
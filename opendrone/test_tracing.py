@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test span tracing: the ring buffer keeps the newest spans in order, the
+disabled tracer records nothing, spans export as Chrome trace events, and
+SIGUSR1 dumps the ring from a running server.
+"""
+
+import sys
+import os
+import json
+import signal
+import tempfile
+import threading
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import server
+from tracing import Tracer, tracer
+
+
+def test_ring_buffer_keeps_newest():
+    t = Tracer()
+    assert t.spans() == []
+    t.enable(capacity=4)
+    for i in range(3):
+        t.end(f'span.{i}', t.begin())
+    assert [name for name, _, _, _ in t.spans()] == ['span.0', 'span.1', 'span.2']
+
+    t = Tracer()
+    t.enable(capacity=4)
+    for i in range(10):
+        t.end(f'span.{i}', t.begin())
+    spans = t.spans()
+    # Oldest first; the slot spans() reserves for itself costs the oldest survivor
+    assert [name for name, _, _, _ in spans] == ['span.7', 'span.8', 'span.9']
+    assert all(duration >= 0 and thread_id == threading.get_ident() for _, _, duration, thread_id in spans)
+    assert [start for _, start, _, _ in spans] == sorted(start for _, start, _, _ in spans)
+
+
+def test_disabled_records_nothing():
+    t = Tracer()
+    assert t.begin() == 0
+    with t.span('serial.write') as span:
+        pass
+    assert span is t.span('other'), "disabled spans share one no-op object"
+    t.end('frame.encode', 0)
+    assert t.spans() == []
+
+    t.enable(capacity=8)
+    t.disable()
+    t.end('frame.encode', time.perf_counter_ns())
+    assert t.spans() == []
+
+
+def test_chrome_trace():
+    t = Tracer()
+    t.enable(capacity=16)
+    with t.span('serial.write'):
+        time.sleep(0.002)
+    start = t.begin()
+    t.end('rpc.setChannels', start)
+
+    trace = json.loads(json.dumps(t.chrome_trace()))
+    assert trace['displayTimeUnit'] == 'ms'
+    first, second = trace['traceEvents']
+    assert first['name'] == 'serial.write' and first['cat'] == 'serial'
+    assert second['name'] == 'rpc.setChannels' and second['cat'] == 'rpc'
+    assert second['ts'] == start / 1e3, "timestamps are in microseconds"
+    assert first['ph'] == 'X' and first['dur'] >= 2000
+    assert first['pid'] == os.getpid() and first['tid'] == threading.get_ident()
+    assert first['ts'] + first['dur'] <= second['ts']
+
+
+def test_sigusr1_dump():
+    if not hasattr(signal, 'SIGUSR1'):
+        print("No SIGUSR1 on this platform, dump signal not exercised")
+        return
+    path = os.path.join(tempfile.mkdtemp(), 'trace.json')
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        server._enable_tracing({'capacity': 64, 'dump_path': path})
+        for _ in range(5):
+            tracer.end('frame.encode', tracer.begin())
+        os.kill(os.getpid(), signal.SIGUSR1)
+        deadline = time.monotonic() + 2.0
+        while not os.path.exists(path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with open(path) as f:
+            events = json.load(f)['traceEvents']
+        assert [event['name'] for event in events] == ['frame.encode'] * 5
+    finally:
+        tracer.disable()
+        signal.signal(signal.SIGUSR1, previous)
+
+
+if __name__ == "__main__":
+    test_ring_buffer_keeps_newest()
+    test_disabled_records_nothing()
+    test_chrome_trace()
+    test_sigusr1_dump()
+    print("TRACING TEST PASSED")
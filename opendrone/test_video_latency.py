@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test video latency stamps: each frame carries first-byte, end-marker,
+decode-done and delivered times through the pipeline, consumers record the
+frame's age, and the stage percentiles roll over with the window.
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from controllers import view
+from controllers.frame_ring import FrameTimes
+from controllers.jpeg_extractor import JpegFrameExtractor
+from controllers.view import VideoStreamOpenCV
+from latency import VideoLatency
+from video_fakes import FakeVideoSerial, jpeg_frames
+
+
+def test_extractor_start_times():
+    first, second = jpeg_frames(2)
+    extractor = JpegFrameExtractor()
+    stream = b'noise' + first + second
+    split = len(first) // 2
+    assert extractor.feed(stream[:split], now=100) == []
+    frames = extractor.feed(stream[split:len(first) + 5 + 10], now=200)
+    assert frames == [first] and extractor.start_times == [100]
+    frames = extractor.feed(stream[len(first) + 5 + 10:], now=300)
+    assert frames == [second] and extractor.start_times == [200]  # Its SOI came in the read at 200
+
+
+def test_rolling_window():
+    latency = VideoLatency(window_s=0.05)
+    now = time.monotonic_ns()
+    latency.record_frame(FrameTimes(now, now + 2_000_000, now + 5_000_000, now + 6_000_000))
+    summary = latency.summary()
+    assert summary['receive'][0] == 1 and abs(summary['receive'][1] - 2_000_000) < 40_000
+    assert abs(summary['decode'][1] - 3_000_000) < 60_000
+    assert abs(summary['end_to_end'][1] - 6_000_000) < 100_000
+
+    # A source without receive stamps (mock) only records delivery-side stages
+    latency.record_frame(FrameTimes(0, 0, 0, now + 7_000_000))
+    assert latency.summary()['receive'][0] == 1
+
+    # Still counted one window later, gone after two
+    latency.record_age('age_at_read', FrameTimes(now, 0, 0, 0), now + 60_000_000)
+    assert latency.summary(now + 60_000_000)['receive'][0] == 1
+    latency.record_age('age_at_read', FrameTimes(now, 0, 0, 0), now + 120_000_000)
+    assert latency.summary(now + 120_000_000)['receive'][0] == 0
+    assert latency.summary(now + 120_000_000)['age_at_read'][0] == 2
+
+    # Windows also roll when nothing is recorded: a stalled feed stops reporting old percentiles
+    assert latency.summary(now + 200_000_000)['age_at_read'][0] == 1
+    assert latency.summary(now + 300_000_000)['age_at_read'][0] == 0
+
+    # A gap of two windows or more clears both at once
+    latency.record_age('age_at_read', FrameTimes(now, 0, 0, 0), now + 310_000_000)
+    assert latency.summary(now + 420_000_000)['age_at_read'][0] == 0
+
+
+def test_pipeline_stamps_every_stage():
+    stream = VideoStreamOpenCV(headless=True, baud_rate=1_000_000)
+    stream.serial_connection = FakeVideoSerial(b''.join(jpeg_frames(5)), chunk=2000, interval=0.005)
+    done = threading.Event()
+    stream.subscribe(lambda frame_id, frame: done.set() if frame_id == 5 else None)
+    assert stream.start_stream()
+    assert done.wait(5.0)
+    ref = stream.read_frame()
+    stats = stream.video_stats()
+    stream.stop_stream()
+
+    times = ref.times
+    assert ref.frame_id == 5
+    assert 0 < times.first_byte < times.end_marker <= times.decoded <= times.delivered
+    assert ref.timestamp == times.delivered / 1e9
+    latency = stats['latency']
+    assert latency['receive']['count'] == 5 and latency['decode']['count'] == 5
+    assert latency['receive']['p50_ms'] >= 5.0, "frames span several 5 ms reads"
+    assert latency['age_at_read']['count'] == 1
+    assert latency['serial_backlog']['count'] > 0
+    # 2000 bytes waiting at 1 Mbaud were queued for about 20 ms
+    assert 15.0 < latency['serial_backlog']['max_ms'] < 25.0
+
+
+def test_display_age():
+    calls = {}
+    patched = {name: getattr(view.cv2, name) for name in ('namedWindow', 'imshow', 'waitKey', 'destroyWindow')}
+    view.cv2.namedWindow = lambda *args: None
+    view.cv2.imshow = lambda name, frame: calls.setdefault('imshow', frame.shape)
+    view.cv2.waitKey = lambda delay: -1
+    view.cv2.destroyWindow = lambda *args: None
+    try:
+        stream = VideoStreamOpenCV()
+        stream.serial_connection = FakeVideoSerial(b''.join(jpeg_frames(3)), chunk=4000, interval=0.005)
+        assert stream.start_stream()
+        deadline = time.monotonic() + 5.0
+        while stream.display.shown < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        stream.stop_stream()
+    finally:
+        for name, func in patched.items():
+            setattr(view.cv2, name, func)
+
+    assert calls['imshow'] == (480, 640, 3)
+    age = stream.video_stats()['latency']['age_at_display']
+    assert age['count'] >= 1 and age['p50_ms'] > 0
+
+
+if __name__ == "__main__":
+    test_extractor_start_times()
+    test_rolling_window()
+    test_pipeline_stamps_every_stage()
+    test_display_age()
+    print("VIDEO LATENCY TEST PASSED")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test the headless video pipeline: frames reach subscribers from the serial
+reader (through extraction and decode) and from the mock source, with no
+HighGUI calls, so it runs without a display.
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+import numpy as np
+
+from controllers.view import VideoStreamOpenCV, MockVideoStreamController
+from video_fakes import FakeVideoSerial
+
+
+def _no_gui(*args, **kwargs):
+    raise AssertionError("HighGUI called in headless mode")
+
+
+def _collect(stream, count, timeout=5.0):
+    frames = []
+    done = threading.Event()
+
+    def on_frame(frame_id, frame):
+        frames.append((frame_id, frame.shape))
+        if len(frames) >= count:
+            done.set()
+
+    stream.subscribe(on_frame)
+    assert done.wait(timeout)
+    return frames
+
+
+def test_headless_serial_pipeline():
+    image = np.zeros((240, 320, 3), dtype=np.uint8)
+    jpeg = cv2.imencode('.jpg', image)[1].tobytes()
+    saved = cv2.namedWindow, cv2.imshow, cv2.waitKey
+    cv2.namedWindow = cv2.imshow = cv2.waitKey = _no_gui
+    try:
+        stream = VideoStreamOpenCV(headless=True)
+        assert stream.display is None
+        # One frame every 20 ms: slow enough that the latest-frame slot drops none
+        stream.serial_connection = FakeVideoSerial(jpeg * 5, chunk=len(jpeg), interval=0.02)
+        assert stream.start_stream()
+        frames = _collect(stream, 5)
+        stream.stop_stream()
+    finally:
+        cv2.namedWindow, cv2.imshow, cv2.waitKey = saved
+
+    assert [frame_id for frame_id, _ in frames] == [1, 2, 3, 4, 5]
+    assert all(shape == (480, 640, 3) for _, shape in frames)
+    assert stream.video_stats()['decoded'] == 5
+
+
+def test_headless_mock_source():
+    saved = cv2.namedWindow, cv2.imshow, cv2.waitKey
+    cv2.namedWindow = cv2.imshow = cv2.waitKey = _no_gui
+    try:
+        mock = MockVideoStreamController(headless=True, fps=200)
+        assert mock.start()
+        start = time.monotonic()
+        frames = _collect(mock, 20)
+        elapsed = time.monotonic() - start
+        mock.stop()
+    finally:
+        cv2.namedWindow, cv2.imshow, cv2.waitKey = saved
+
+    ids = [frame_id for frame_id, _ in frames]
+    assert ids[:20] == list(range(1, 21))
+    assert elapsed < 1.0, "paced by fps, not by waitKey"
+    assert mock.latest_frame is not None
+
+
+if __name__ == "__main__":
+    test_headless_serial_pipeline()
+    test_headless_mock_source()
+    print("VIDEO PIPELINE TEST PASSED")
@@ -0,0 +1,140 @@
+"""
+Opt-in span tracing for hot paths, dumpable as Chrome trace JSON.
+
+Spans go into a ring buffer preallocated when tracing is enabled; once full,
+the oldest spans are overwritten. Open the dump in chrome://tracing or
+https://ui.perfetto.dev.
+
+Two ways to record a span:
+
+    with tracer.span('serial.write'):
+        ...
+
+    t0 = tracer.begin()          # 0 when tracing is disabled
+    ...
+    tracer.end('frame.encode', t0)
+
+When disabled, span() returns a shared no-op context manager and begin()
+returns 0, so the cost is one attribute check and no allocation. Use
+begin()/end() on the hottest paths.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from array import array
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'start')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.end(self.name, self.start)
+        return False
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.capacity = 0
+
+    def enable(self, capacity=65536):
+        """Allocate the ring buffer and start recording"""
+        self.capacity = capacity
+        self._names = [None] * capacity
+        self._starts = array('q', bytes(8 * capacity))
+        self._durations = array('q', bytes(8 * capacity))
+        self._threads = array('q', bytes(8 * capacity))
+        self._counter = itertools.count()  # next() is atomic under the GIL
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def begin(self):
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def end(self, name, start):
+        if not start or not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        slot = next(self._counter) % self.capacity
+        self._names[slot] = name
+        self._starts[slot] = start
+        self._durations[slot] = now - start
+        self._threads[slot] = threading.get_ident()
+
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def spans(self):
+        """Recorded spans, oldest first, as (name, start_ns, duration_ns, thread_id)"""
+        if not self.capacity:
+            return []
+        count = next(self._counter)  # Reserves a slot; blank it so it is skipped below
+        self._names[count % self.capacity] = None
+        if count <= self.capacity:
+            slots = range(count)
+        else:
+            first = count % self.capacity
+            slots = itertools.chain(range(first, self.capacity), range(first))
+        return [
+            (self._names[i], self._starts[i], self._durations[i], self._threads[i])
+            for i in slots if self._names[i] is not None
+        ]
+
+    def chrome_trace(self):
+        """Spans as a Chrome trace-event document ('X' complete events, microseconds)"""
+        pid = os.getpid()
+        events = [
+            {
+                'name': name,
+                'cat': name.split('.', 1)[0],
+                'ph': 'X',
+                'ts': start / 1e3,
+                'dur': duration / 1e3,
+                'pid': pid,
+                'tid': thread_id,
+            }
+            for name, start, duration, thread_id in self.spans()
+        ]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, path):
+        """Write the ring buffer to path as Chrome trace JSON; returns the span count"""
+        trace = self.chrome_trace()
+        with open(path, 'w') as f:
+            json.dump(trace, f)
+        return len(trace['traceEvents'])
+
+
+# Process-wide tracer. Enabled by the server from config.yml, or by setting
+# OPENDRONE_TRACE=1 (optionally OPENDRONE_TRACE_CAPACITY) in any process.
+tracer = Tracer()
+if os.environ.get('OPENDRONE_TRACE') == '1':
+    tracer.enable(int(os.environ.get('OPENDRONE_TRACE_CAPACITY', 65536)))
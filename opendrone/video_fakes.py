@@ -0,0 +1,42 @@
+"""
+Stand-ins for the camera link, shared by the video pipeline tests.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+class FakeVideoSerial:
+    """Serves a byte stream in chunks arriving every interval seconds, then blocks like an idle port"""
+
+    def __init__(self, data, chunk=1000, interval=0.0):
+        self.data = data
+        self.chunk = chunk
+        self.interval = interval
+        self.is_open = True
+
+    @property
+    def in_waiting(self):
+        return min(len(self.data), self.chunk)
+
+    def read(self, size):
+        if not self.data:
+            time.sleep(0.01)  # Port timeout
+            return b''
+        time.sleep(self.interval)
+        out, self.data = self.data[:size], self.data[size:]
+        return out
+
+    def close(self):
+        self.is_open = False
+
+
+def jpeg_frames(count, width=160, height=120, noise=True):
+    """count distinct JPEGs: seeded noise (large, like camera frames) or flat grey levels (small)"""
+    if noise:
+        images = (np.random.default_rng(i).integers(0, 256, (height, width, 3), dtype=np.uint8) for i in range(count))
+    else:
+        images = (np.full((height, width, 3), i * 20, dtype=np.uint8) for i in range(count))
+    return [cv2.imencode('.jpg', image)[1].tobytes() for image in images]